@@ -24,11 +24,13 @@ import random # Generate random values
 import items # Items/Inventories
 import rooms # Maps/Rooms
 import characters # Player/Enemies
+import scheduler # Roaming enemies
 
 # - Classes
 
 # - Game
 # The game object, controls all aspects of a game
+# The game runs without a GUI, the GUI is only updated if gui() has been called
 class Game:
 
     # Game Constants
@@ -37,6 +39,29 @@ class Game:
     HARD = 1.5
     COLUMN = 100 # Column height
     ROW = 100 # Row height
+    TICK = 500 # Milliseconds between roaming enemy updates when there is a GUI
+    INVENTORY_ROWS = 4 # Rows shown by each inventory browser
+
+    # Game states
+    PLAYING = 0
+    WON = 1
+    LOST = 2
+
+    # Directions the player can move in, as arguments to characters.Player.move()
+    DIRECTIONS = {
+        "n": (-1, 0),
+        "s": (1, 0),
+        "e": (0, -1),
+        "w": (0, 1)
+    }
+
+    # Keys and the directions they move the player in
+    KEYS = {
+        "w": "n",
+        "s": "s",
+        "a": "w",
+        "d": "e"
+    }
 
     # - __init__()
     # Initialise the game object
@@ -46,24 +71,43 @@ class Game:
     # boss_room_key (items.Key) - The key object that will unlock the boss room
     # enemies (list) - List containing enemy objects to be placed through the map
     # castle_items (list) - List containing item objects to be placed through the map
-    def __init__(self, game_map, boss_room_key, enemies = None, castle_items = None):
+    # roaming (bool) - Whether the enemies move between rooms as the game is ticked, see tick()
+    def __init__(self, game_map, boss_room_key, enemies = None, castle_items = None, roaming = False):
+
+        # Check for empty lists
+        if(enemies == None):
+            enemies = []
+        if(castle_items == None):
+            castle_items = []
 
         # Set attributes
         self._map = game_map
         self._boss_room_key = boss_room_key # Store key of boss room
         self._parent = None # Stores tkinter parent object
         self._gui = None # Stores GUI object
-        self._player_name = tk.StringVar()
-        self._player_age = tk.IntVar()
         self._player = characters.Player("Player", game_map) # Initialise the player
         self._control_state = True # Stores the state of the controls
+        self._current_room = self._player.room() # The room the player is in
+        self._previous_room = self._current_room # The room the player was in before the current room
+        # Keep the current and previous rooms in memory
+        self._map.pin(self._current_room)
+        self._map.pin(self._previous_room)
+        self._enemy = None # The enemy currently being battled
+        self._state = Game.PLAYING # Whether the game is being played, won or lost
+        self._log_history = [] # Every message that has been logged
+        self._deaths = [] # Names of the enemies that have incapacitated the player
+        self._roaming = roaming # Whether enemies roam
+        # Moves roaming enemies, they stay out of the boss room and don't move while being battled
+        # Only made when enemies roam, it is an enemy source of the map for as long as the map lives
+        self._scheduler = None
+        if(roaming):
+            self._scheduler = scheduler.Scheduler(game_map, on_move = self.enemy_moved, busy = self.in_battle, avoid = [game_map.boss_room()])
 
         # Set boss room key callback
         self._boss_room_key.set_callback(self.unlock_boss_room)
 
-        # Default values for player name/age
-        self._player_name.set("Player")
-        self._player_age.set(18)
+        # Set room use function to add item to player invent
+        self._current_room.inventory().set_use_command(self.give_player_item)
 
         # Add boss room key to items
         castle_items.append(self._boss_room_key)
@@ -81,6 +125,81 @@ class Game:
             row = random.choice(self._map.grid())
             room = random.choice(row)
             room.add_enemy(enemy)
+            # Start it roaming
+            if(self._roaming):
+                self._scheduler.add(enemy, room)
+
+    # - player()
+    # Returns the player object
+    #
+    # self
+    def player(self):
+
+        return(self._player)
+
+    # - game_map()
+    # Returns the map the game is played in
+    #
+    # self
+    def game_map(self):
+
+        return(self._map)
+
+    # - current_room()
+    # Returns the room the player is currently in
+    #
+    # self
+    def current_room(self):
+
+        return(self._current_room)
+
+    # - previous_room()
+    # Returns the room the player was in before the current room
+    #
+    # self
+    def previous_room(self):
+
+        return(self._previous_room)
+
+    # - enemy()
+    # Returns the enemy currently being battled, None if there is no battle
+    #
+    # self
+    def enemy(self):
+
+        return(self._enemy)
+
+    # - state()
+    # Returns the state of the game, e.g. Game.PLAYING
+    #
+    # self
+    def state(self):
+
+        return(self._state)
+
+    # - deaths()
+    # Returns a list of the names of enemies that have incapacitated the player
+    #
+    # self
+    def deaths(self):
+
+        return(self._deaths)
+
+    # - scheduler()
+    # Returns the scheduler that moves roaming enemies, None if enemies don't roam
+    #
+    # self
+    def scheduler(self):
+
+        return(self._scheduler)
+
+    # - log_history()
+    # Returns a list of every message that has been logged
+    #
+    # self
+    def log_history(self):
+
+        return(self._log_history)
 
     # - gui()
     # Initialises the GUI aspect of the game
@@ -95,6 +214,14 @@ class Game:
         self._height = height
         self._width = width
 
+        # Player creation variables
+        self._player_name = tk.StringVar()
+        self._player_age = tk.IntVar()
+
+        # Default values for player name/age
+        self._player_name.set("Player")
+        self._player_age.set(18)
+
         # Add keystroke listeners
         self._parent.bind("w", self.move)
         self._parent.bind("s", self.move)
@@ -134,18 +261,17 @@ class Game:
         self._room_invent_frame = tk.Frame(self._gui, height = Game.COLUMN, width = 2 * Game.ROW)
         self._room_invent_frame.grid(row = 4, column = 2, columnspan = 2)
 
-        # Store current room
-        self._current_room = self._player.room()
-        # Set room use function to add item to player invent
-        self._current_room.inventory().set_use_command(self._player.inventory().add_item)
+        # Store the room that is drawn
+        self._drawn_room = self._current_room
+
+        # Draw map, the same view is used for every room
+        self._room_view = rooms.RoomView(self._map_frame)
+        self._room_view.show(self._current_room)
 
-        # Draw map
-        self._current_room.gui(self._map_frame)
-        
         # Setup player inventory
-        self._player.inventory().gui(self._player_invent_frame)
+        items.InventoryBrowser(self._player_invent_frame, self._player.inventory(), rows = Game.INVENTORY_ROWS)
         # Setup room inventory
-        self._current_room.inventory().gui(self._room_invent_frame)
+        items.InventoryBrowser(self._room_invent_frame, self._current_room.inventory(), rows = Game.INVENTORY_ROWS)
 
         # Setup player stat frame
         self._player.gui(self._player_stat_frame)
@@ -183,6 +309,16 @@ class Game:
         # Refresh the GUI
         self.gui_refresh()
 
+    # - gui_tick()
+    # Ticks the game by Game.TICK and schedules the next tick, while the game is being played
+    #
+    # self
+    def gui_tick(self):
+
+        if(self._state == Game.PLAYING):
+            self.tick(Game.TICK / 1000)
+            self._parent.after(Game.TICK, self.gui_tick)
+
     # - gui_refresh()
     # Refreshes the GUI
     #
@@ -192,47 +328,97 @@ class Game:
         # Check if the GUI is initialised
         if(self._gui != None):
 
-             # Check if the room has changed
-            if(self._current_room != self._player.room()):
-
-                # Frames that will need cleared
-                frames = [
-                    self._map_frame,
-                    self._room_invent_frame
-                ]
-
-                # Clear all frames
-                for frame in frames:
-                    # For every frame clear every widget that is a child of the frame
-                    for widget in frame.winfo_children():
-                        widget.destroy() # Destroy the child widget
-
-                # Store previous room
-                self._previous_room = self._current_room
-                # Update current room
-                self._current_room = self._player.room()
-                # Set room use function to add item to player invent
-                self._current_room.inventory().set_use_command(self.give_player_item)
-
-                # Draw new map
-                self._current_room.gui(self._map_frame)
-                # Draw new inventory
-                self._current_room.inventory().gui(self._room_invent_frame)
+             # Check if the room has changed since it was last drawn
+            if(self._drawn_room != self._current_room):
+
+                # Clear every widget that is a child of the room inventory frame
+                for widget in self._room_invent_frame.winfo_children():
+                    widget.destroy() # Destroy the child widget
 
-                # Room has changed so we should check if there are any enemies
-                if(self._current_room.enemies() != []):
-                    # BATTLE! (first enemy only):
-                    self.battle(self._current_room.enemies()[0])
+                # Update drawn room
+                self._drawn_room = self._current_room
+
+                # Show new map
+                self._room_view.show(self._current_room)
+                # Draw new inventory
+                items.InventoryBrowser(self._room_invent_frame, self._current_room.inventory(), rows = Game.INVENTORY_ROWS)
 
             # Draw player on map GUI
-            self._current_room.draw_player(self._player)
+            self._room_view.draw_player(self._player)
+
+    # - update()
+    # Updates the game after the player has moved, starting a battle if a new room has enemies
+    #
+    # self
+    def update(self):
+
+        # Flag for if the room has changed
+        room_changed = False
+
+        # Check if the room has changed
+        if(self._current_room != self._player.room()):
+
+            # Store previous room, keeping the new rooms in memory before letting the old one go
+            self._map.pin(self._player.room())
+            self._map.unpin(self._previous_room)
+            self._previous_room = self._current_room
+            # Update current room
+            self._current_room = self._player.room()
+            # Set room use function to add item to player invent
+            self._current_room.inventory().set_use_command(self.give_player_item)
+
+            room_changed = True
+
+        # Refresh the GUI
+        self.gui_refresh()
+
+        # Room has changed so we should check if there are any enemies
+        if(room_changed and (self._current_room.enemies() != [])):
+            # BATTLE! (first enemy only):
+            self.battle(self._current_room.enemies()[0])
+
+    # - tick()
+    # Moves the roaming enemies that are due to move in the next amount of time
+    #
+    # self
+    # elapsed (float) - Seconds of game time that have passed
+    def tick(self, elapsed):
+
+        if(self._scheduler != None):
+            self._scheduler.run(self._scheduler.time() + elapsed)
+
+    # - in_battle()
+    # Returns whether an enemy is being battled
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy to check
+    def in_battle(self, enemy):
+
+        return(enemy is self._enemy)
+
+    # - enemy_moved()
+    # Called by the scheduler after a roaming enemy moves, an enemy entering the player's room attacks
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy that moved
+    # old_room (rooms.Room) - The room it left
+    # new_room (rooms.Room) - The room it entered
+    def enemy_moved(self, enemy, old_room, new_room):
+
+        if(new_room is self._current_room):
+            self.log(f"{enemy.name()} wandered in!")
+            # BATTLE! (unless one is already going)
+            if((self._enemy == None) and (self._state == Game.PLAYING)):
+                self.battle(enemy)
+        elif(old_room is self._current_room):
+            self.log(f"{enemy.name()} wandered off.")
 
     # - update_player()
     # Updates the player info from character selection
     #
     # self
     def update_player(self):
-            
+
         # Flag for errors
         error = False
 
@@ -263,7 +449,7 @@ class Game:
             # Name is unreasonably long
             messagebox.showerror("ERROR", f"Name must be no longer than 15 characters (It is currently {len(name)})!")
             error = True
-            
+
         # Only run these if there are no errors
         if(not error):
             # Send values to player object
@@ -290,7 +476,11 @@ class Game:
             # For every message add a dely before printing
             for i in range(len(tutorial)):
                 self._parent.after(1500*i, lambda i = i: self.log(tutorial[i]))
-            
+
+            # Start moving roaming enemies now the player is ready
+            if(self._roaming):
+                self._parent.after(Game.TICK, self.gui_tick)
+
 
     # - give_player_item()
     # Give the player an item
@@ -310,6 +500,24 @@ class Game:
         # Add to inventory
         self._player.inventory().add_item(item)
 
+    # - pick_up()
+    # Pick up an item from the current room and give it to the player
+    #
+    # self
+    # item (items.Item) - The item in the current room to pick up
+    def pick_up(self, item):
+
+        self._current_room.inventory().use_item(item)
+
+    # - use_item()
+    # Use an item in the player's inventory
+    #
+    # self
+    # item (items.Item) - The item in the player's inventory to use
+    def use_item(self, item):
+
+        self._player.inventory().use_item(item)
+
     # - move()
     # Move the player as specified by key
     #
@@ -317,30 +525,28 @@ class Game:
     # event (tkinter key event)
     def move(self, event):
 
+        # Get representation of the event
+        event = event.char
+
+        # Interpret input
+        if(event in Game.KEYS):
+            self.move_player(Game.KEYS[event])
+
+    # - move_player()
+    # Move the player one step in a direction
+    #
+    # self
+    # direction (str) - The direction to move in, e.g. "n"
+    def move_player(self, direction):
+
         # Check control state
         if(self._control_state == True):
 
             # Only runs if controls enabled
+            self._player.move(*Game.DIRECTIONS[direction])
 
-            # Get representation of the event
-            event = event.char
-
-            # Interpret input
-            if(event == "w"):
-                # Move up
-                self._player.move(-1, 0)
-            elif(event == "s"):
-                # Move down
-                self._player.move(1, 0)
-            elif(event == "a"):
-                # Move left
-                self._player.move(0, 1)
-            elif(event == "d"):
-                # Move right
-                self._player.move(0, -1)
-
-            # Refresh the GUI
-            self.gui_refresh()
+            # Update the game
+            self.update()
 
     # - set_control_state()
     # Sets the control state
@@ -358,53 +564,61 @@ class Game:
     # text (str) - The text to log to the log
     def log(self, text):
 
-        # Unlock log
-        self._log.configure(state = tk.NORMAL)
-        # Write to log
-        self._log.insert(tk.END, f"{text}\n\n")
-        # Scroll to bottom
-        self._log.see(tk.END)
-        # Lock log
-        self._log.configure(state = tk.DISABLED)
+        # Store in the log history
+        self._log_history.append(text)
+
+        # Only write to the text log if the GUI is initialised
+        if(self._gui != None):
+            # Unlock log
+            self._log.configure(state = tk.NORMAL)
+            # Write to log
+            self._log.insert(tk.END, f"{text}\n\n")
+            # Scroll to bottom
+            self._log.see(tk.END)
+            # Lock log
+            self._log.configure(state = tk.DISABLED)
 
     # - attack()
     # Player attack enemy
     #
     # self
-    # enemy (characters.Enemy) - The enemy to battle with
-    def attack(self, enemy):
+    # enemy (characters.Enemy) - The enemy to battle with, defaults to the enemy being battled
+    def attack(self, enemy = None):
+
+        # Default to the current enemy
+        if(enemy == None):
+            enemy = self._enemy
 
         # Attack the enemy
         attack_dam = self._player.attack(enemy)
 
         # Log the attack
         self.log(f"You did {attack_dam} damage to {enemy.name()}.")
-        
+
         # Check if enemy is still alive
         if(enemy.is_alive() != True):
             # Enemy is dead and you have killed them
             self.log(f"{enemy.name()} is dead and you have killed them.")
             # Drop their inventory into the room
-            self._current_room.inventory().add_items(enemy.drop_inventory())
+            enemy.drop_inventory(self._current_room.inventory())
             # Refresh the GUI
             self.gui_refresh()
-            # Remove enemy from room
+            # Remove enemy from room, it stops roaming
             self._current_room.enemies().remove(enemy)
-            # Unlock controls
-            self.set_control_state(True)
-            # Lock log controls
-            self._attack.configure(state = tk.DISABLED)
-            self._retreat.configure(state = tk.DISABLED)
-            # Remove enemy GUI
-            for widget in self._enemy_stat_frame.winfo_children():
-                widget.destroy()
+            if(self._scheduler != None):
+                self._scheduler.remove(enemy)
+            # End the battle
+            self.end_battle()
 
             # Check if in the boss room
             if(self._current_room == self._map.boss_room()):
                 # This means the boss is dead!
-                messagebox.showinfo("CONGRATULATIONS!", f"You killed {enemy.name()}!")
-                # Remove GUI
-                self._parent.destroy()
+                self._state = Game.WON
+                # Tell the user if there is a GUI
+                if(self._gui != None):
+                    messagebox.showinfo("CONGRATULATIONS!", f"You killed {enemy.name()}!")
+                    # Remove GUI
+                    self._parent.destroy()
         else:
             # Else the enemy attacks you
             attack_dam = enemy.attack(self._player)
@@ -414,28 +628,29 @@ class Game:
 
             # Check if you're still alive
             if(self._player.is_alive() != True):
-                
+
+                # Record the death
+                self._deaths.append(enemy.name())
+
                 # Check if fighting boss
                 if(self._current_room == self._map.boss_room()):
                     # You are dead forever now
-                    # Tell the user
-                    messagebox.showinfo("DEFEAT!", f"{enemy.name()} killed you! This is the end.")
-                    # Remove GUI
-                    self._parent.destroy()
+                    self._state = Game.LOST
+                    self.set_control_state(False)
+                    # Tell the user if there is a GUI
+                    if(self._gui != None):
+                        messagebox.showinfo("DEFEAT!", f"{enemy.name()} killed you! This is the end.")
+                        # Remove GUI
+                        self._parent.destroy()
                 else:
                     # Not fighting boss, revive
                     # YOU DIED!
                     self.log(f"You were incapacitated by {enemy.name()}!")
-                    # Retreat
-                    self.retreat()
                     # Give the player some health back
                     self._player.take_damage(-10)
-                    # Unlock controls
-                    self.set_control_state(True)
-                    # Lock log controls
-                    self._attack.configure(state = tk.DISABLED)
-                    self._retreat.configure(state = tk.DISABLED)
-                
+                    # Retreat
+                    self.retreat()
+
     # - retreat()
     # Retreat from an enemy
     #
@@ -446,16 +661,10 @@ class Game:
         self.log("You retreated!")
         # Move the player back one room
         self._player.change_room(self._previous_room, "m")
-        # Turn on map controls
-        self.set_control_state(True)
-        # Disable log control buttons
-        self._attack.configure(state = tk.DISABLED)
-        self._retreat.configure(state = tk.DISABLED)
-        # Refresh GUI
-        self.gui_refresh()
-        # Remove enemy GUI
-        for widget in self._enemy_stat_frame.winfo_children():
-            widget.destroy()
+        # End the battle
+        self.end_battle()
+        # Update the game
+        self.update()
 
     # - battle()
     # Battle the player and an enemy
@@ -464,16 +673,40 @@ class Game:
     # enemy (characters.Enemy) - The enemy the player will do battle with
     def battle(self, enemy):
 
+        # Store the enemy
+        self._enemy = enemy
         # Turn off map controls
         self.set_control_state(False)
-        # Turn on log control buttons
-        self._attack.configure(state = tk.NORMAL, command = lambda e = enemy : self.attack(e))
-        self._retreat.configure(state = tk.NORMAL)
         # Tell the user they have been attacked
         self.log(f"You are attacked by {enemy.name()}!")
 
-        # Initiate enemy gui
-        enemy.gui(self._enemy_stat_frame)
+        # Check if the GUI is initialised
+        if(self._gui != None):
+            # Turn on log control buttons
+            self._attack.configure(state = tk.NORMAL, command = lambda e = enemy : self.attack(e))
+            self._retreat.configure(state = tk.NORMAL)
+            # Initiate enemy gui
+            enemy.gui(self._enemy_stat_frame)
+
+    # - end_battle()
+    # Ends the current battle, returning control of the map to the player
+    #
+    # self
+    def end_battle(self):
+
+        # Forget the enemy
+        self._enemy = None
+        # Turn on map controls
+        self.set_control_state(True)
+
+        # Check if the GUI is initialised
+        if(self._gui != None):
+            # Disable log control buttons
+            self._attack.configure(state = tk.DISABLED)
+            self._retreat.configure(state = tk.DISABLED)
+            # Remove enemy GUI
+            for widget in self._enemy_stat_frame.winfo_children():
+                widget.destroy()
 
     # - unlock_boss_room()
     # Unlocks the boss room
@@ -481,178 +714,180 @@ class Game:
     # self
     def unlock_boss_room(self):
 
-        # Flag for if an entrance has been added
-        entrance_added = False
+        # Pick a free entrance of any room
+        free = self._map.random_free_entrance()
 
-        self.log("THE CRYPT HAS BEEN UNLOCKED!")
+        # Every entrance is in use
+        if(free == None):
+            self.log("The key fits no door, there is no way into the crypt!")
+            return
 
-        # Add entrance to the crypt to a random room
-        while(entrance_added != True):
-
-            # Pick a random room from the set of rooms
-            row = random.choice(self._map.grid())
-            room = random.choice(row)
+        self.log("THE CRYPT HAS BEEN UNLOCKED!")
 
-            # Check if there are any free entrances
-            for entrance_name, entrance_val in room.entrances().items():
-                # Entrance value will be false if no entrance exists there
-                if(entrance_val == False):
-                    # Add the entrance
-                    room.add_entrance(entrance_name, self._map.boss_room())
-                    # Set flag true to exit loop
-                    entrance_added = True
-                    break # Break for loop
+        # Add the entrance to the crypt
+        room, entrance_name = free
+        room.add_entrance(entrance_name, self._map.boss_room())
+
+# - Functions
+
+# - create_castle()
+# Creates a fresh copy of Dracula's castle
+# Returns (castle_map, boss_room_key, enemies, castle_items) ready to be passed to Game
+def create_castle():
+
+    # -- Items
+
+    # --- Keys
+
+    # Key to Dracula's crypt
+    draculas_key = items.Key("THE KEY TO THE CRYPT")
+
+    # --- Weapons
+
+    weapons = [
+            items.Weapon("Pointy Stick", 2, 5),
+            items.Weapon("Crowbar", 3, 8),
+            items.Weapon("Molten Cheese", 5, 9),
+            items.Weapon("Boomerang", 10, 15),
+            items.Weapon("Laser Jet Printer", 12, 18),
+            items.Weapon("Red Syringe", 10, 25)
+        ]
+
+    # --- Armour
+
+    armour = [
+            items.Armour("MDF Shield", 5),
+            items.Armour("Sheet Metal Shield", 6),
+            items.Armour("Wooden Breastplate", 7),
+            items.Armour("Sheet Metal Breastplate", 10),
+            items.Armour("Shin Pads", 15)
+        ]
+
+    # --- Potions
+
+    potions = [
+            items.Potion("Water", 5),
+            items.Potion("Fresh Mountain Water", 20),
+            items.Potion("Hot Chocolate", 10),
+            items.Potion("Sustenance Bar", 30),
+            items.Potion("Green Syringe", 50)
+        ]
+
+    # --- Collection of all items
+
+    castle_items = weapons
+    castle_items.extend(armour)
+    castle_items.extend(potions)
+
+    # -- Enemies
+
+    # Dracula
+    dracula = characters.Enemy("COUNT DRACULA",
+                               1000,
+                               100,
+                               items.Weapon("DRACULA'S STAFF", 30, 50),
+                               items.Armour("DRACULA'S SHIELD", 20))
+
+    # Other enemies that can be found in the castle
+    castle_enemies = [
+            characters.Enemy("The Goose",
+                             2,
+                             40,
+                             items.Weapon("HONK", 10, 15),
+                             items.Armour("Goose Feathers", 10)),
+            characters.Enemy("Thousands of Bees",
+                             1,
+                             100,
+                             items.Weapon("Sting", 1, 3),
+                             items.Armour("Exoskeleton", 1),
+                             [items.Weapon("Bee Sting Sword", 20, 30),
+                              items.Potion("Honey", 20)]),
+            characters.Enemy("John",
+                             32,
+                             20,
+                             items.Weapon("Steak Knife", 5, 10),
+                             items.Armour("Torn Jeans", 3),
+                             [items.Potion("Homebrew", 10)]),
+            characters.Enemy("SyntaxError",
+                             1,
+                             5,
+                             items.Weapon("Inconvenience", 1, 10)),
+            characters.Enemy("The Beekeeper",
+                             48,
+                             20,
+                             items.Weapon("Smoker", 1, 15),
+                             items.Armour("Beekeeping Suit", 3),
+                             [items.Potion("Honeycomb", 30), items.Weapon("Pry Tool", 5, 20)]),
+            characters.Enemy("Larry",
+                             10,
+                             15,
+                             items.Weapon("Advice", -10, 10),
+                             None),
+            characters.Enemy("Imaginos",
+                             100,
+                             30,
+                             items.Weapon("Staff of the Ether", 10, 20),
+                             None,
+                             [items.Potion("Ether", 50)])
+        ]
+
+    # -- Map/Rooms
+
+    # Special rooms
+    toilet = rooms.Room("Toilet", s = True)
+    cellar = rooms.Room("Cellar", n = True, w = toilet)
+    entrance_hall = rooms.Room("Entrance Hall", n = True)
+    crypt = rooms.Room("THE CRYPT")
+    crypt.add_enemy(dracula) # Add dracula to the crypt
+
+    # Create Map of rooms
+    castle_map = rooms.Map([
+        [
+            rooms.Room("Dressing Room", e = True, s = True),
+            rooms.Room("Bathroom", w = True),
+            rooms.Room("Sun Room", s = True),
+            rooms.Room("Kitchen", s = True, e = True),
+            rooms.Room("Pantry", w = True)
+        ],
+        [
+            rooms.Room("Bedroom", n = True, s = True),
+            toilet,
+            rooms.Room("Back Hall", n = True, s = True, e = True),
+            rooms.Room("Passage", n = True, w = True, e = True),
+            rooms.Room("Scullery", s = True, w = True)
+        ],
+        [
+            rooms.Room("West Tower", n = True, s = True, e = True),
+            rooms.Room("West Hallway", n = True, e = True, w = True),
+            rooms.Room("Main Hall", n = True, s = True, e = True, w = True),
+            rooms.Room("Corridor", s = True, w = True),
+            cellar
+        ],
+        [
+            rooms.Room("Drawing Room", n = True, e = True),
+            rooms.Room("Library", w = True),
+            entrance_hall,
+            rooms.Room("Lounge", n = True, e = True),
+            rooms.Room("East Tower", w = True)
+        ]
+    ], entrance_hall, crypt)
+
+    return(castle_map, draculas_key, castle_enemies, castle_items)
 
 # - Main
 
-root = tk.Tk() # Tkinter root object
-
-# -- Items
-
-# --- Keys
-
-# Key to Dracula's crypt
-draculas_key = items.Key("THE KEY TO THE CRYPT")
-
-# --- Weapons
-
-weapons = [
-        items.Weapon("Pointy Stick", 2, 5),
-        items.Weapon("Crowbar", 3, 8),
-        items.Weapon("Molten Cheese", 5, 9),
-        items.Weapon("Boomerang", 10, 15),
-        items.Weapon("Laser Jet Printer", 12, 18),
-        items.Weapon("Red Syringe", 10, 25)
-    ]
-
-# --- Armour
-
-armour = [
-        items.Armour("MDF Shield", 5),
-        items.Armour("Sheet Metal Shield", 6),
-        items.Armour("Wooden Breastplate", 7),
-        items.Armour("Sheet Metal Breastplate", 10),
-        items.Armour("Shin Pads", 15)
-    ]
-
-# --- Potions
-
-potions = [
-        items.Potion("Water", 5),
-        items.Potion("Fresh Mountain Water", 20),
-        items.Potion("Hot Chocolate", 10),
-        items.Potion("Sustenance Bar", 30),
-        items.Potion("Green Syringe", 50)
-    ]
-
-# --- Collection of all items
-
-castle_items = weapons
-castle_items.extend(armour)
-castle_items.extend(potions)
-
-# -- Enemies
-
-# Dracula
-dracula = characters.Enemy("COUNT DRACULA",
-                           1000,
-                           100,
-                           items.Weapon("DRACULA'S STAFF", 30, 50),
-                           items.Armour("DRACULA'S SHIELD", 20))
-
-# Other enemies that can be found in the castle
-castle_enemies = [
-        characters.Enemy("The Goose",
-                         2,
-                         40,
-                         items.Weapon("HONK", 10, 15),
-                         items.Armour("Goose Feathers", 10)),
-        characters.Enemy("Thousands of Bees",
-                         1,
-                         100,
-                         items.Weapon("Sting", 1, 3),
-                         items.Armour("Exoskeleton", 1),
-                         [items.Weapon("Bee Sting Sword", 20, 30),
-                          items.Potion("Honey", 20)]),
-        characters.Enemy("John",
-                         32,
-                         20,
-                         items.Weapon("Steak Knife", 5, 10),
-                         items.Armour("Torn Jeans", 3),
-                         [items.Potion("Homebrew", 10)]),
-        characters.Enemy("SyntaxError",
-                         1,
-                         5,
-                         items.Weapon("Inconvenience", 1, 10)),
-        characters.Enemy("The Beekeeper",
-                         48,
-                         20,
-                         items.Weapon("Smoker", 1, 15),
-                         items.Armour("Beekeeping Suit", 3),
-                         [items.Potion("Honeycomb", 30), items.Weapon("Pry Tool", 5, 20)]),
-        characters.Enemy("Larry",
-                         10,
-                         15,
-                         items.Weapon("Advice", -10, 10),
-                         None),
-        characters.Enemy("Imaginos",
-                         100,
-                         30,
-                         items.Weapon("Staff of the Ether", 10, 20),
-                         None,
-                         [items.Potion("Ether", 50)])
-    ]
-
-# -- Map/Rooms
-
-# Special rooms
-toilet = rooms.Room("Toilet", s = True)
-cellar = rooms.Room("Cellar", n = True, w = toilet)
-entrance_hall = rooms.Room("Entrance Hall", n = True)
-crypt = rooms.Room("THE CRYPT")
-crypt.add_enemy(dracula) # Add dracula to the crypt
-
-# Create Map of rooms
-castle_map = rooms.Map([
-    [
-        rooms.Room("Dressing Room", e = True, s = True), 
-        rooms.Room("Bathroom", w = True), 
-        rooms.Room("Sun Room", s = True), 
-        rooms.Room("Kitchen", s = True, e = True), 
-        rooms.Room("Pantry", w = True)
-    ],
-    [
-        rooms.Room("Bedroom", n = True, s = True), 
-        toilet, 
-        rooms.Room("Back Hall", n = True, s = True, e = True), 
-        rooms.Room("Passage", n = True, w = True, e = True),
-        rooms.Room("Scullery", s = True, w = True)
-    ],
-    [
-        rooms.Room("West Tower", n = True, s = True, e = True),
-        rooms.Room("West Hallway", n = True, e = True, w = True),
-        rooms.Room("Main Hall", n = True, s = True, e = True, w = True),
-        rooms.Room("Corridor", s = True, w = True),
-        cellar
-    ],
-    [
-        rooms.Room("Drawing Room", n = True, e = True),
-        rooms.Room("Library", w = True),
-        entrance_hall,
-        rooms.Room("Lounge", n = True, e = True),
-        rooms.Room("East Tower", w = True)
-    ]
-], entrance_hall, crypt)
-
 # Main check
 if __name__ == "__main__":
 
+    root = tk.Tk() # Tkinter root object
+
     # Tkinter setup
     root.geometry("600x500+100+100")
     root.title("Dracula's Castle")
 
     # Game setup
-    game = Game(castle_map, draculas_key, castle_enemies, castle_items) # Create game object
+    castle_map, draculas_key, castle_enemies, castle_items = create_castle()
+    game = Game(castle_map, draculas_key, castle_enemies, castle_items, roaming = True) # Create game object
     game.gui(root, 600, 600)
 
     # Tkinter mainloop
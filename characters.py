@@ -13,9 +13,18 @@
 
 import items # Create items
 import rooms # Manage rooms
+import refresh # Coalesce GUI refreshes
+import weakref # Forget enemy views no longer in use
+from array import array # Compact arrays of enemy data
 import tkinter as tk # GUI
 from tkinter import ttk # Refined GUI elements
 
+# NumPy is optional, without it pooled enemies are updated one at a time
+try:
+    import numpy as np
+except(ImportError):
+    np = None
+
 # - Classes
 
 # - Character
@@ -64,7 +73,7 @@ class Character:
         self._name = new_name
 
         # Refresh GUI if applicable
-        self.gui_refresh()
+        self.request_refresh()
 
     # - age()
     # Returns the age of the character
@@ -84,7 +93,7 @@ class Character:
         self._age = new_age
 
         # Refresh GUI if applicable
-        self.gui_refresh()
+        self.request_refresh()
 
     # - weapon()
     # Returns the weapon object the enemy uses
@@ -110,6 +119,14 @@ class Character:
 
         return(self._inventory)
 
+    # - health()
+    # Returns the health of the character
+    #
+    # self
+    def health(self):
+
+        return(self._health)
+
     # - is_alive()
     # Returns whether the character is still alive
     #
@@ -125,25 +142,25 @@ class Character:
             return(True)
 
     # - drop_inventory()
-    # Returns all items in player, intended for on the character's death
+    # Moves all items in player, with their weapon and armour, into another inventory, intended for on the character's death
+    # Whole stacks are moved, see items.Inventory.transfer()
     #
     # self
-    def drop_inventory(self):
+    # inventory (items.Inventory) - The inventory to drop the items into, e.g. the room's
+    def drop_inventory(self, inventory):
 
-        # Get armour and weapon and put in inventory
-        # Check that they're not none first
-        if(self._weapon != None):
-            self._inventory.add_item(self._weapon)
-        if(self._armour != None):
-            self._inventory.add_item(self._armour)
-
-        # Get list of items in inventory
-        invent_items = self._inventory.items()
+        # Refresh the inventory once
+        with self._inventory.batch():
 
-        # Wipe inventory
-        self._inventory.drop_all()
+            # Get armour and weapon and put in inventory
+            # Check that they're not none first
+            if(self._weapon != None):
+                self._inventory.add_item(self._weapon)
+            if(self._armour != None):
+                self._inventory.add_item(self._armour)
 
-        return(invent_items)
+            # Move the stacks, wiping the inventory
+            self._inventory.transfer(inventory)
 
     # - take_damage()
     # Applies an amount of damage to the character
@@ -159,7 +176,7 @@ class Character:
             self._health = 0
 
         # Refresh GUI if applicable
-        self.gui_refresh()
+        self.request_refresh()
 
     # - attack()
     # Attack another character
@@ -189,7 +206,7 @@ class Character:
         enemy.take_damage(attack_dam)
 
         # Refresh GUI if applicable
-        self.gui_refresh()
+        self.request_refresh()
 
         # Return the attack damage
         return(attack_dam)
@@ -221,6 +238,14 @@ class Character:
         # Refresh GUI
         self.gui_refresh()
         
+    # - request_refresh()
+    # Asks for the GUI to be refreshed once the Tk event loop is idle, see refresh.request()
+    #
+    # self
+    def request_refresh(self):
+
+        refresh.request(self, self._gui)
+
     # - gui_refresh()
     # Update text variable with new values
     #
@@ -249,6 +274,14 @@ class Character:
 # Child of Character
 class Player(Character):
 
+    # Name of the method use() calls for each type of item
+    USES = {
+        items.Weapon: "equip_weapon",
+        items.Armour: "equip_armour",
+        items.Potion: "drink",
+        items.Key: "use_key"
+    }
+
     # - __init__()
     #
     # self
@@ -263,6 +296,9 @@ class Player(Character):
         self._room = self._map.start_room()
         self._position = self._room.find_entrance("m")
 
+        # Keep the room the player is in in memory
+        self._map.pin(self._room)
+
         # Set attributes associated with Character object
         super().__init__(name, weapon = weapon, armour = armour)
 
@@ -292,34 +328,59 @@ class Player(Character):
     # item (items.Item) -  The item to be "used"
     def use(self, item):
 
-        # Check item type to determine action
-
-        if(type(item) == items.Weapon):
-            # If the item is a weapon
-            # Check if a weapon is equipped by the player
-            if(self._weapon != None):
-                # If it is then add it the inventory
-                self._inventory.add_item(self._weapon)
-            # Put the new weapon into the slot
-            self._weapon = item
-        elif(type(item) == items.Armour):
-            # If item is a piece of armour
-            # Check if armour is equipped by the player
-            if(self._armour != None):
-                # If it is then add it to the inventory
-                self._inventory.add_item(self._armour)
-            # Equip the new piece of armour
-            self._armour = item
-        elif(type(item) == items.Potion):
-            # If the item is a potion
-            # Add the health effect to our health
-            self._health += item.health_effect()
-        elif(type(item) == items.Key):
-            # If the item is a key, use it
-            item.use()
+        # Look up the action for the item type
+        action = Player.USES.get(type(item))
+        if(action != None):
+            getattr(self, action)(item)
 
         # Refresh GUI if applicable
-        self.gui_refresh()
+        self.request_refresh()
+
+    # - equip_weapon()
+    # Equips a weapon, putting the equipped weapon into the inventory
+    #
+    # self
+    # weapon (items.Weapon) - The weapon to equip
+    def equip_weapon(self, weapon):
+
+        # Check if a weapon is equipped by the player
+        if(self._weapon != None):
+            # If it is then add it the inventory
+            self._inventory.add_item(self._weapon)
+        # Put the new weapon into the slot
+        self._weapon = weapon
+
+    # - equip_armour()
+    # Equips armour, putting the equipped armour into the inventory
+    #
+    # self
+    # armour (items.Armour) - The armour to equip
+    def equip_armour(self, armour):
+
+        # Check if armour is equipped by the player
+        if(self._armour != None):
+            # If it is then add it to the inventory
+            self._inventory.add_item(self._armour)
+        # Equip the new piece of armour
+        self._armour = armour
+
+    # - drink()
+    # Drinks a potion, adding the health effect to our health
+    #
+    # self
+    # potion (items.Potion) - The potion to drink
+    def drink(self, potion):
+
+        self._health += potion.health_effect()
+
+    # - use_key()
+    # Uses a key
+    #
+    # self
+    # key (items.Key) - The key to use
+    def use_key(self, key):
+
+        key.use()
 
     # - move()
     # Move the player by an amount x/y in the room
@@ -329,46 +390,21 @@ class Player(Character):
     # column (int): The amount to move the player in y
     def move(self, row, column):
 
-        # Calculate the new row and colum
-        new_row = self._position[0] + row
-        new_column = self._position[1] - column
-
-        # Get room grid and feed in new x and y vals
-        try:
-            grid_value = self._room.grid()[new_row][new_column]
-        except(IndexError):
-            # Tried to access an area outside of the grid
-            self.move(0, 0) # Checking no move in case this is a door
-            return
+        # Look up where the move takes the player in the map's transition table
+        room, self._position = self._map.move(self._room, self._position, row, column)
+        self.set_room(room)
 
-        # If the move makes a negative Index
-        if((new_row < 0) or (new_column < 0)):
-            # Tried to access an area outside of the grid
-            self.move(0, 0) # Checking no move in case this is a door
-            return
+    # - set_room()
+    # Sets the room the player is in, keeping it in memory in place of the old room
+    #
+    # self
+    # room (rooms.Room) - The new room
+    def set_room(self, room):
 
-        if((grid_value == 0) or (grid_value == "m")):
-            # If grid value is zero or m, not wall, thus move
-            self._position[0] = new_row
-            self._position[1] = new_column      
-        elif(type(grid_value) == rooms.Room):
-            # If the grid value is a room object then we are jumping rooms
-            self.change_room(grid_value, "m")
-        elif(type(grid_value) == str):
-            # Grid value is string (that is not m) so must be at entrance, we need to move rooms
-            if(grid_value == "n"):
-                # Set room to be north of current room
-                self.change_room(self._room.north_of(), "s")
-            elif(grid_value == "e"):
-                # Set room to be east of current room
-                self.change_room(self._room.east_of(), "w")
-            elif(grid_value == "s"):
-                # Set room to be south of current room
-                self.change_room(self._room.south_of(), "n")
-            elif(grid_value == "w"):
-                # Set room to be west of current room
-                self.change_room(self._room.west_of(), "e")
-        # Else it's a wall, do not move
+        if(room is not self._room):
+            self._map.pin(room)
+            self._map.unpin(self._room)
+            self._room = room
 
     # - change_room()
     # Change the room the player is in
@@ -382,7 +418,7 @@ class Player(Character):
         new_position = room.find_entrance(entrance)
         # Make sure the new room and entrance really exist first
         if(new_position != False):
-            self._room = room
+            self.set_room(room)
             self._position = new_position
             
 # - Enemy
@@ -392,6 +428,384 @@ class Enemy(Character):
     # Currently don't need code in here 
     pass
 
+# - PooledEnemy
+# Child of Enemy, a view of an enemy stored in an EnemyPool
+# Health, age and name are read from and written to the pool's arrays
+class PooledEnemy(Enemy):
+
+    # - __init__()
+    #
+    # self
+    # pool (EnemyPool) - The pool the enemy is stored in
+    # index (int) - The index of the enemy in the pool
+    def __init__(self, pool, index):
+
+        self._pool = pool
+        self._index = index
+
+        # Set attributes associated with Character object, the stats come from the pool
+        super().__init__(pool.name(index), age = pool.age(index), health = pool.health(index), weapon = pool.weapon(index), armour = pool.armour(index))
+
+    # - _health
+    # The enemy's health, read from and written to the pool so Character's methods work on it
+    #
+    # self
+    @property
+    def _health(self):
+
+        return(self._pool.health(self._index))
+
+    @_health.setter
+    def _health(self, value):
+
+        self._pool.set_health(self._index, value)
+
+    # - _age
+    # The enemy's age, read from and written to the pool
+    #
+    # self
+    @property
+    def _age(self):
+
+        return(self._pool.age(self._index))
+
+    @_age.setter
+    def _age(self, value):
+
+        self._pool.set_age(self._index, value)
+
+    # - _name
+    # The enemy's name, read from and written to the pool
+    #
+    # self
+    @property
+    def _name(self):
+
+        return(self._pool.name(self._index))
+
+    @_name.setter
+    def _name(self, value):
+
+        self._pool.set_name(self._index, value)
+
+    # - pool()
+    # Returns the pool the enemy is stored in
+    #
+    # self
+    def pool(self):
+
+        return(self._pool)
+
+    # - index()
+    # Returns the index of the enemy in the pool
+    #
+    # self
+    def index(self):
+
+        return(self._index)
+
+# - EnemyPool
+# Stores enemies as a struct of arrays, one entry in each array per enemy
+# Enemies only become objects (PooledEnemy views) when they are asked for, e.g. when a room with them is created
+class EnemyPool:
+
+    # Bits of an enemy's flags
+    WEAPON = 1 # Has a weapon
+    ARMOUR = 2 # Has armour
+
+    # - __init__()
+    # Initialise an empty pool
+    #
+    # self
+    # names (function) - Returns the name of the enemy at an index, defaults to "Enemy index"
+    # weapon_name (str) - Name of every pooled enemy's weapon
+    # armour_name (str) - Name of every pooled enemy's armour
+    def __init__(self, names = None, weapon_name = "Claws", armour_name = "Hide"):
+
+        self._names = names
+        self._weapon_name = weapon_name
+        self._armour_name = armour_name
+
+        # One entry per enemy
+        self._health = array("q")
+        self._age = array("q")
+        self._min_damage = array("q")
+        self._max_damage = array("q")
+        self._protection = array("q")
+        self._flags = bytearray()
+        self._room = array("q") # Index of the room the enemy is in, -1 if it isn't in a room
+
+        self._renamed = {} # Index -> name of enemies that have been renamed
+        self._rooms = {} # Room index -> list of the indexes of the enemies in it
+        self._views = weakref.WeakValueDictionary() # Index -> PooledEnemy of the enemies that are materialised
+
+    # - __len__()
+    # Returns the number of enemies in the pool, dead or alive
+    #
+    # self
+    def __len__(self):
+
+        return(len(self._health))
+
+    # - add()
+    # Adds an enemy to the pool, returns its index
+    #
+    # self
+    # health (int) - The health of the enemy
+    # age (int) - The age of the enemy
+    # damage ((min, max)) - The damage range of the enemy's weapon, None if it has no weapon
+    # protection (int) - The protection of the enemy's armour, None if it has no armour
+    # room (int) - The index of the room the enemy is in, e.g. row * columns + column, -1 for none
+    def add(self, health = 100, age = 18, damage = None, protection = None, room = -1):
+
+        index = len(self._health)
+
+        self._health.append(health)
+        self._age.append(age)
+
+        flags = 0
+        if(damage != None):
+            flags |= EnemyPool.WEAPON
+            self._min_damage.append(damage[0])
+            self._max_damage.append(damage[1])
+        else:
+            self._min_damage.append(0)
+            self._max_damage.append(0)
+        if(protection != None):
+            flags |= EnemyPool.ARMOUR
+            self._protection.append(protection)
+        else:
+            self._protection.append(0)
+        self._flags.append(flags)
+
+        self._room.append(room)
+        if(room != -1):
+            self._rooms.setdefault(room, []).append(index)
+
+        return(index)
+
+    # - name()
+    # Returns the name of the enemy at an index
+    #
+    # self
+    # index (int) - The index of the enemy
+    def name(self, index):
+
+        if(index in self._renamed):
+            return(self._renamed[index])
+        elif(self._names != None):
+            return(self._names(index))
+
+        return(f"Enemy {index}")
+
+    # - set_name()
+    # Renames the enemy at an index
+    #
+    # self
+    # index (int) - The index of the enemy
+    # name (str) - The new name
+    def set_name(self, index, name):
+
+        # Only store names that differ from the default
+        self._renamed.pop(index, None)
+        if(self.name(index) != name):
+            self._renamed[index] = name
+
+    # - health()
+    # Returns the health of the enemy at an index
+    #
+    # self
+    # index (int) - The index of the enemy
+    def health(self, index):
+
+        return(self._health[index])
+
+    # - set_health()
+    # Sets the health of the enemy at an index
+    #
+    # self
+    # index (int) - The index of the enemy
+    # health (int) - The new health
+    def set_health(self, index, health):
+
+        self._health[index] = health
+
+    # - age()
+    # Returns the age of the enemy at an index
+    #
+    # self
+    # index (int) - The index of the enemy
+    def age(self, index):
+
+        return(self._age[index])
+
+    # - set_age()
+    # Sets the age of the enemy at an index
+    #
+    # self
+    # index (int) - The index of the enemy
+    # age (int) - The new age
+    def set_age(self, index, age):
+
+        self._age[index] = age
+
+    # - is_alive()
+    # Returns whether the enemy at an index is alive
+    #
+    # self
+    # index (int) - The index of the enemy
+    def is_alive(self, index):
+
+        return(self._health[index] > 0)
+
+    # - weapon()
+    # Returns a new weapon for the enemy at an index, None if it has no weapon
+    #
+    # self
+    # index (int) - The index of the enemy
+    def weapon(self, index):
+
+        if(self._flags[index] & EnemyPool.WEAPON):
+            return(items.Weapon(self._weapon_name, self._min_damage[index], self._max_damage[index]))
+
+        return(None)
+
+    # - armour()
+    # Returns new armour for the enemy at an index, None if it has no armour
+    #
+    # self
+    # index (int) - The index of the enemy
+    def armour(self, index):
+
+        if(self._flags[index] & EnemyPool.ARMOUR):
+            return(items.Armour(self._armour_name, self._protection[index]))
+
+        return(None)
+
+    # - room()
+    # Returns the index of the room the enemy at an index is in, -1 if it isn't in a room
+    #
+    # self
+    # index (int) - The index of the enemy
+    def room(self, index):
+
+        return(self._room[index])
+
+    # - set_room()
+    # Moves the enemy at an index to another room
+    #
+    # self
+    # index (int) - The index of the enemy
+    # room (int) - The index of the room, -1 for none
+    def set_room(self, index, room):
+
+        old_room = self._room[index]
+        if(old_room == room):
+            return
+
+        # Move it between the room lists
+        if(old_room != -1):
+            in_room = self._rooms[old_room]
+            in_room.remove(index)
+            if(in_room == []):
+                del self._rooms[old_room]
+        if(room != -1):
+            self._rooms.setdefault(room, []).append(index)
+
+        self._room[index] = room
+
+    # - in_room()
+    # Returns a new list of the indexes of the living enemies in a room
+    #
+    # self
+    # room (int) - The index of the room
+    def in_room(self, room):
+
+        return([index for index in self._rooms.get(room, []) if self._health[index] > 0])
+
+    # - occupied()
+    # Returns a new list of the indexes of the rooms that have enemies in them, dead or alive
+    #
+    # self
+    def occupied(self):
+
+        return(list(self._rooms))
+
+    # - enemies_in()
+    # Returns a new list of the living enemies in a room as PooledEnemy views, see in_room() for their indexes
+    #
+    # self
+    # room (int) - The index of the room
+    def enemies_in(self, room):
+
+        return([self.enemy(index) for index in self.in_room(room)])
+
+    # - enemy()
+    # Returns the enemy at an index as a PooledEnemy, the same object is returned while it is in use
+    #
+    # self
+    # index (int) - The index of the enemy
+    def enemy(self, index):
+
+        enemy = self._views.get(index)
+
+        if(enemy == None):
+            enemy = PooledEnemy(self, index)
+            self._views[index] = enemy
+
+        return(enemy)
+
+    # - owns()
+    # Returns whether an enemy is a view of this pool
+    #
+    # self
+    # enemy (Character) - The enemy to check
+    def owns(self, enemy):
+
+        return((type(enemy) == PooledEnemy) and (enemy.pool() is self))
+
+    # - views_in_use()
+    # Returns the number of enemies that are PooledEnemy objects, see enemy()
+    #
+    # self
+    def views_in_use(self):
+
+        return(len(self._views))
+
+    # - alive()
+    # Returns the number of living enemies
+    #
+    # self
+    def alive(self):
+
+        if(np != None):
+            return(int(np.count_nonzero(np.frombuffer(self._health, dtype = np.int64) > 0)))
+
+        return(sum(1 for health in self._health if health > 0))
+
+    # - heal()
+    # Heals every living enemy at once, e.g. once a game tick
+    #
+    # self
+    # amount (int) - Health to give each living enemy
+    # maximum (int) - Most health an enemy can be healed to, None for no limit
+    def heal(self, amount, maximum = None):
+
+        if(np != None):
+            # Views of the arrays, changed in place
+            health = np.frombuffer(self._health, dtype = np.int64)
+            alive = health > 0
+            health[alive] += amount
+            if(maximum != None):
+                np.minimum(health, np.where(alive, maximum, health), out = health)
+            return
+
+        for index in range(len(self._health)):
+            if(self._health[index] > 0):
+                self._health[index] += amount
+                if((maximum != None) and (self._health[index] > maximum)):
+                    self._health[index] = maximum
+
 # - Main
 # Used for testing code associated with this module so this code should only run when it is main
 if(__name__ == "__main__"):
@@ -0,0 +1,358 @@
+'''
+
+    combat.py
+
+    Estimates the outcome of battles between characters in Dracula's Castle
+
+'''
+
+# - Imports
+
+# -- Libraries
+# (Modules others have made)
+import random # Fallback random values
+from collections import Counter # Count remaining health
+from functools import lru_cache # Cache exact solutions
+from concurrent.futures import ThreadPoolExecutor # Estimate without blocking the GUI
+
+# NumPy is optional, without it fights are simulated one at a time
+try:
+    import numpy as np
+except(ImportError):
+    np = None
+
+# - Constants
+
+FIGHTS = 100000 # Default number of fights to simulate
+MAX_TURNS = 1000 # Turns before a fight is called a draw
+CACHE_SIZE = 1024 # Number of exact solutions to keep
+
+# Thread used to estimate in the background
+_executor = None
+
+# - Functions
+
+# - stats()
+# Returns the combat stats of a character as (health, min damage, max damage, protection)
+# Damage is None if the character has no weapon, protection is None if the character has no armour
+#
+# character (characters.Character) - The character to get the stats of
+def stats(character):
+
+    # Get weapon stats
+    if(character.weapon() != None):
+        min_damage, max_damage = character.weapon().get_damage()
+    else:
+        min_damage, max_damage = None, None
+
+    # Get armour stats
+    if(character.armour() != None):
+        protection = character.armour().get_protection()
+    else:
+        protection = None
+
+    return(character.health(), min_damage, max_damage, protection)
+
+# - estimate()
+# Simulates many fights between the player and an enemy, the player attacks first like in app.Game.attack()
+# Returns a dict of the win/loss/draw probabilities, expected turns and the distribution of the player's remaining health
+#
+# player (characters.Character) - The character that attacks first
+# enemy (characters.Character) - The character being attacked
+# fights (int) - The number of fights to simulate
+# seed (int) - Seed for the random values
+# max_turns (int) - Turns before a fight is called a draw
+def estimate(player, enemy, fights = FIGHTS, seed = None, max_turns = MAX_TURNS):
+
+    player_stats = stats(player)
+    enemy_stats = stats(enemy)
+
+    # Use NumPy if we have it
+    if(np != None):
+        return(_estimate_numpy(player_stats, enemy_stats, fights, seed, max_turns))
+    else:
+        return(_estimate_python(player_stats, enemy_stats, fights, seed, max_turns))
+
+# - estimate_async()
+# Runs estimate() on a background thread, returns a concurrent.futures.Future
+# The callback runs on the background thread, GUI code should hand the result back with after()
+#
+# player (characters.Character) - The character that attacks first
+# enemy (characters.Character) - The character being attacked
+# callback (function) - Called with the result when it is ready
+# fights (int) - The number of fights to simulate
+def estimate_async(player, enemy, callback = None, fights = FIGHTS):
+
+    global _executor
+
+    # Start the thread the first time it is needed
+    if(_executor == None):
+        _executor = ThreadPoolExecutor(max_workers = 1)
+
+    future = _executor.submit(estimate, player, enemy, fights)
+
+    # Pass the result on when it's done
+    if(callback != None):
+        future.add_done_callback(lambda done: callback(done.result()))
+
+    return(future)
+
+# - exact()
+# Solves a fight between the player and an enemy exactly, the player attacks first like in app.Game.attack()
+# Returns a dict in the same form as estimate(), solutions are cached so repeated matchups are free
+# Raises ValueError if a character could heal the other, the fight may then never end and must be estimated
+#
+# player (characters.Character) - The character that attacks first
+# enemy (characters.Character) - The character being attacked
+def exact(player, enemy):
+
+    result = solve(stats(player), stats(enemy))
+
+    # Copy so callers can't change the cached result
+    result = dict(result)
+    result["health_remaining"] = dict(result["health_remaining"])
+
+    return(result)
+
+# - damage_distribution()
+# Returns the distribution of damage done by one swing as a tuple of (damage, probability) pairs
+# The weapon does uniform damage between min and max, the armour then stops a uniform amount between zero and protection
+# Raises ValueError if the damage could be negative
+#
+# min_damage, max_damage (int) - The damage range of the weapon, None if there is no weapon
+# protection (int) - The protection of the armour, None if there is no armour
+@lru_cache(maxsize = CACHE_SIZE)
+def damage_distribution(min_damage, max_damage, protection):
+
+    # No weapon, no damage
+    if(min_damage == None):
+        return(((0, 1.0),))
+
+    # Armour clamps damage at zero, without it a negative damage would heal
+    if((protection == None) and (min_damage < 0)):
+        raise ValueError("weapon can heal without armour, use estimate() instead")
+
+    weapon_chance = 1 / (max_damage - min_damage + 1)
+    distribution = Counter()
+
+    # Uniform damage minus uniform protection, clamped at zero
+    if(protection == None):
+        for damage in range(min_damage, max_damage + 1):
+            distribution[damage] += weapon_chance
+    else:
+        armour_chance = weapon_chance / (protection + 1)
+        for damage in range(min_damage, max_damage + 1):
+            for protected in range(protection + 1):
+                distribution[max(damage - protected, 0)] += armour_chance
+
+    return(tuple(sorted(distribution.items())))
+
+# - solve()
+# Solves a fight exactly from the stats of each character, see stats()
+# Dynamic program over (player health, enemy health), every turn either lowers the total health or repeats
+#
+# player_stats (tuple) - (health, min damage, max damage, protection) of the character attacking first
+# enemy_stats (tuple) - (health, min damage, max damage, protection) of the character being attacked
+@lru_cache(maxsize = CACHE_SIZE)
+def solve(player_stats, enemy_stats):
+
+    player_health, enemy_health = player_stats[0], enemy_stats[0]
+
+    # Fights that are over before they begin
+    if(enemy_health <= 0):
+        return({"win_probability": 1.0, "loss_probability": 0.0, "draw_probability": 0.0, "expected_turns": 0.0, "health_remaining": {player_health: 1.0}})
+    if(player_health <= 0):
+        return({"win_probability": 0.0, "loss_probability": 1.0, "draw_probability": 0.0, "expected_turns": 0.0, "health_remaining": {0: 1.0}})
+
+    # Damage done by the player to the enemy, and by the enemy to the player
+    player_damage = damage_distribution(player_stats[1], player_stats[2], enemy_stats[3])
+    enemy_damage = damage_distribution(enemy_stats[1], enemy_stats[2], player_stats[3])
+
+    # Chance of a turn where nobody is hurt
+    player_miss = dict(player_damage).get(0, 0.0)
+    enemy_miss = dict(enemy_damage).get(0, 0.0)
+    stall = player_miss * enemy_miss
+
+    # Neither character can ever hurt the other
+    if(stall >= 1):
+        return({"win_probability": 0.0, "loss_probability": 0.0, "draw_probability": 1.0, "expected_turns": float("inf"), "health_remaining": {player_health: 1.0}})
+
+    # Chance of entering each state at the start of a turn, and after the player hits (the enemy still alive)
+    turn_start = [[0.0] * (enemy_health + 1) for row in range(player_health + 1)]
+    player_hit = [[0.0] * (enemy_health + 1) for row in range(player_health + 1)]
+    turn_start[player_health][enemy_health] = 1.0
+
+    wins = Counter() # Remaining player health -> chance of winning with it
+    loss = 0.0
+    turns = 0.0
+
+    # Work down through the total health, no turn can raise it
+    for total in range(player_health + enemy_health, 1, -1):
+
+        # Health pairs with this total
+        states = [(health, total - health) for health in range(max(1, total - enemy_health), min(player_health, total - 1) + 1)]
+
+        # The enemy hits back after every player hit
+        for health, other in states:
+            chance = player_hit[health][other]
+            if(chance == 0):
+                continue
+            for damage, damage_chance in enemy_damage:
+                if(damage >= health):
+                    loss += chance * damage_chance
+                else:
+                    turn_start[health - damage][other] += chance * damage_chance
+
+        # The player attacks at the start of every turn
+        for health, other in states:
+            chance = turn_start[health][other]
+            if(chance == 0):
+                continue
+
+            # Turns where nobody is hurt repeat the state, so it is visited 1 / (1 - stall) times
+            visits = chance / (1 - stall)
+            turns += visits
+
+            for damage, damage_chance in player_damage:
+                if(damage >= other):
+                    # Enemy killed
+                    wins[health] += visits * damage_chance
+                elif(damage > 0):
+                    # Enemy hurt, the enemy hits back
+                    player_hit[health][other - damage] += visits * damage_chance
+                else:
+                    # Enemy missed, the enemy hits back, missing would repeat the state
+                    for hit, hit_chance in enemy_damage:
+                        if(hit >= health):
+                            loss += visits * damage_chance * hit_chance
+                        elif(hit > 0):
+                            turn_start[health - hit][other] += visits * damage_chance * hit_chance
+
+    health_remaining = dict(sorted(wins.items()))
+    if(loss > 0):
+        health_remaining[0] = loss
+        health_remaining = dict(sorted(health_remaining.items()))
+
+    return({
+        "win_probability": sum(wins.values()),
+        "loss_probability": loss,
+        "draw_probability": 0.0,
+        "expected_turns": turns,
+        "health_remaining": health_remaining
+    })
+
+# - _result()
+# Builds the result dict of an estimate
+#
+# fights (int) - The number of fights simulated
+# wins, losses (int) - The number of fights won/lost by the player
+# turns (int) - The total number of turns taken by fights that ended
+# health (Counter) - Remaining player health -> number of fights
+def _result(fights, wins, losses, turns, health):
+
+    return({
+        "fights": fights,
+        "win_probability": wins / fights,
+        "loss_probability": losses / fights,
+        "draw_probability": (fights - wins - losses) / fights,
+        "expected_turns": turns / max(wins + losses, 1),
+        "health_remaining": {value: count / fights for value, count in sorted(health.items())}
+    })
+
+# - _estimate_python()
+# Simulates fights one at a time
+def _estimate_python(player_stats, enemy_stats, fights, seed, max_turns):
+
+    rng = random.Random(seed)
+    health = Counter()
+    wins = 0
+    losses = 0
+    turns = 0
+
+    # Attack damage from one character to another, as characters.Character.attack()
+    def swing(attacker, defender):
+
+        if(attacker[1] == None):
+            return(0)
+
+        damage = rng.randint(attacker[1], attacker[2])
+        # Armour can only stop damage, not heal
+        if(defender[3] != None):
+            damage = max(damage - rng.randint(0, defender[3]), 0)
+
+        return(damage)
+
+    for fight in range(fights):
+
+        player_health = player_stats[0]
+        enemy_health = enemy_stats[0]
+
+        for turn in range(1, max_turns + 1):
+
+            # Player attacks
+            enemy_health = max(enemy_health - swing(player_stats, enemy_stats), 0)
+            if(enemy_health <= 0):
+                wins += 1
+                turns += turn
+                break
+
+            # Enemy attacks back
+            player_health = max(player_health - swing(enemy_stats, player_stats), 0)
+            if(player_health <= 0):
+                losses += 1
+                turns += turn
+                break
+
+        health[player_health] += 1
+
+    return(_result(fights, wins, losses, turns, health))
+
+# - _estimate_numpy()
+# Simulates every fight at once, one turn at a time
+def _estimate_numpy(player_stats, enemy_stats, fights, seed, max_turns):
+
+    rng = np.random.default_rng(seed)
+
+    player_health = np.full(fights, player_stats[0], dtype = np.int64)
+    enemy_health = np.full(fights, enemy_stats[0], dtype = np.int64)
+    turns = np.zeros(fights, dtype = np.int64)
+    active = np.arange(fights) # Fights that have not ended
+
+    # Attack damage from one character to another for n fights, as characters.Character.attack()
+    def swing(attacker, defender, n):
+
+        if(attacker[1] == None):
+            return(np.zeros(n, dtype = np.int64))
+
+        damage = rng.integers(attacker[1], attacker[2], size = n, endpoint = True)
+        # Armour can only stop damage, not heal
+        if(defender[3] != None):
+            damage = np.maximum(damage - rng.integers(0, defender[3], size = n, endpoint = True), 0)
+
+        return(damage)
+
+    for turn in range(1, max_turns + 1):
+
+        if(active.size == 0):
+            break
+
+        # Player attacks
+        enemy_health[active] = np.maximum(enemy_health[active] - swing(player_stats, enemy_stats, active.size), 0)
+        won = enemy_health[active] <= 0
+        turns[active[won]] = turn
+        active = active[~won]
+
+        # Enemy attacks back
+        player_health[active] = np.maximum(player_health[active] - swing(enemy_stats, player_stats, active.size), 0)
+        lost = player_health[active] <= 0
+        turns[active[lost]] = turn
+        active = active[~lost]
+
+    # Count the outcomes
+    ended = turns > 0
+    wins = int(np.count_nonzero(enemy_health <= 0))
+    losses = int(np.count_nonzero(ended)) - wins
+    values, counts = np.unique(player_health, return_counts = True)
+    health = Counter(dict(zip(values.tolist(), counts.tolist())))
+
+    return(_result(fights, wins, losses, int(turns[ended].sum()), health))
@@ -0,0 +1,226 @@
+'''
+
+    generator.py
+
+    Procedurally generates large castles for Dracula's Castle
+
+'''
+
+# - Imports
+
+# -- Libraries
+# (Modules others have made)
+import random # Generate random castles
+import functools # Name rooms
+from array import array # Compact arrays of room data
+from collections import deque # Breadth first search
+
+# -- Components
+# (Modules I have made)
+import rooms # Maps/Rooms
+import characters # Enemies
+
+# - Constants
+
+# Entrance bits of a room's entrance mask
+N = rooms.ENTRANCE_BITS["n"]
+S = rooms.ENTRANCE_BITS["s"]
+E = rooms.ENTRANCE_BITS["e"]
+W = rooms.ENTRANCE_BITS["w"]
+
+# Names given to generated rooms
+ROOM_NAMES = [
+    "Dressing Room", "Bathroom", "Sun Room", "Kitchen", "Pantry",
+    "Bedroom", "Back Hall", "Passage", "Scullery", "Tower",
+    "Hallway", "Main Hall", "Corridor", "Cellar", "Drawing Room",
+    "Library", "Lounge", "Gallery", "Chapel", "Armoury"
+]
+
+# - Functions
+
+# - generate_layout()
+# Generates the entrances of a rows x columns castle where every room can be reached from every other
+# Returns a bytearray of entrance masks (N/S/E/W bits), the room at [row, column] is at row * columns + column
+#
+# rows, columns (int) - The size of the castle
+# loops (float) - Chance of keeping a door that isn't needed to connect the castle, more loops means more routes
+# rng (random.Random) - Random number generator to use
+def generate_layout(rows, columns, loops = 0.05, rng = random):
+
+    masks = bytearray(rows * columns)
+
+    # Every door that could exist, east doors are even and south doors are odd
+    doors = [index * 2 for index in range(rows * columns) if (index % columns) != columns - 1]
+    doors.extend(index * 2 + 1 for index in range(rows * columns - columns))
+    rng.shuffle(doors)
+
+    # Union find over rooms, rooms in the same set are connected
+    parents = array("l", range(rows * columns))
+
+    # Returns the set a room is in
+    def find(room):
+
+        while(parents[room] != room):
+            # Path halving
+            parents[room] = parents[parents[room]]
+            room = parents[room]
+
+        return(room)
+
+    # Randomised Kruskal's, keep doors that join unconnected sets
+    for door in doors:
+
+        room = door >> 1
+        if(door & 1):
+            other = room + columns
+        else:
+            other = room + 1
+
+        room_set = find(room)
+        other_set = find(other)
+
+        if(room_set != other_set):
+            parents[room_set] = other_set
+        elif(rng.random() >= loops):
+            # Already connected, skip most of these doors
+            continue
+
+        # Open the door on both sides
+        if(door & 1):
+            masks[room] |= S
+            masks[other] |= N
+        else:
+            masks[room] |= E
+            masks[other] |= W
+
+    return(masks)
+
+# - distances()
+# Returns an array of the number of rooms between a room and every other room, -1 where a room can't be reached
+#
+# masks (bytearray) - Entrance masks, see generate_layout()
+# rows, columns (int) - The size of the castle
+# start (int) - The index of the room to measure from
+def distances(masks, rows, columns, start):
+
+    distance = array("l", [-1]) * (rows * columns)
+    distance[start] = 0
+    queue = deque([start])
+
+    # Offsets of the room through each entrance
+    steps = ((N, -columns), (S, columns), (E, 1), (W, -1))
+
+    # Breadth first search
+    while(queue):
+        room = queue.popleft()
+        mask = masks[room]
+        for bit, step in steps:
+            if(mask & bit):
+                other = room + step
+                if(distance[other] == -1):
+                    distance[other] = distance[room] + 1
+                    queue.append(other)
+
+    return(distance)
+
+# - generate_map()
+# Generates a castle as a rooms.Map, the boss room is the room furthest from the start room
+#
+# rows, columns (int) - The size of the castle
+# seed (int) - Seed for the castle, the same seed always generates the same castle
+# loops (float) - Chance of keeping a door that isn't needed to connect the castle
+# start ([row, column]) - The position of the start room, defaults to the middle of the bottom row
+# lazy (bool) - Whether to return a rooms.LazyMap that only creates rooms as they are visited
+# cache_size (int) - Most rooms a lazy map keeps in memory before spilling them to disk, see rooms.LazyMap
+# room_size ((rows, columns)) - Number of cells in each room, defaults to rooms.Room.ROWS x rooms.Room.COLUMNS
+# enemies (characters.EnemyPool) - Pool of enemies placed by room index, see generate_enemies()
+def generate_map(rows, columns, seed = None, loops = 0.05, start = None, lazy = False, cache_size = None, room_size = None, enemies = None):
+
+    rng = random.Random(seed)
+
+    # Default start room
+    if(start == None):
+        start = [rows - 1, columns // 2]
+
+    masks = generate_layout(rows, columns, loops, rng)
+    start_index = start[0] * columns + start[1]
+
+    # Check every room can be reached and find the furthest
+    distance = distances(masks, rows, columns, start_index)
+    if(min(distance) == -1):
+        raise RuntimeError("generated castle is not connected")
+    boss_index = max(range(rows * columns), key = distance.__getitem__)
+    boss = [boss_index // columns, boss_index % columns]
+
+    # Rooms are named from their index
+    names = functools.partial(room_name, columns)
+
+    if(room_size == None):
+        room_size = (rooms.Room.ROWS, rooms.Room.COLUMNS)
+
+    # Only create rooms as they are visited
+    if(lazy):
+        return(rooms.LazyMap(masks, rows, columns, start, boss, names, cache_size, room_size = room_size, enemies = enemies))
+
+    # Create rooms from the masks
+    grid = []
+    for row in range(rows):
+        grid.append([room(masks, row * columns + column, names, room_size) for column in range(columns)])
+
+    # Add the pooled enemies to their rooms by index, they become objects when a room's enemies are asked for
+    if(enemies != None):
+        for index in enemies.occupied():
+            if(0 <= index < rows * columns):
+                grid[index // columns][index % columns].add_pooled_enemies(enemies, enemies.in_room(index))
+
+    return(rooms.Map(grid, grid[start[0]][start[1]], grid[boss[0]][boss[1]]))
+
+# - generate_enemies()
+# Returns a characters.EnemyPool of enemies placed in random rooms of a castle
+#
+# rows (int) - Number of rows of rooms
+# columns (int) - Number of columns of rooms
+# count (int) - Number of enemies
+# seed (int) - Seed of the random enemies, None for a random castle
+# start ([row, column]) - The position of the start room, no enemies are placed in it, defaults to the middle of the bottom row
+def generate_enemies(rows, columns, count, seed = None, start = None):
+
+    rng = random.Random(seed)
+
+    # Default start room
+    if(start == None):
+        start = [rows - 1, columns // 2]
+    start_index = start[0] * columns + start[1]
+
+    pool = characters.EnemyPool()
+    for _ in range(count):
+        # Any room but the start room
+        room_index = rng.randrange(rows * columns - 1)
+        if(room_index >= start_index):
+            room_index += 1
+        pool.add(health = rng.randint(20, 60), age = rng.randint(100, 500), damage = (rng.randint(1, 5), rng.randint(6, 15)), room = room_index)
+
+    return(pool)
+
+# - room_name()
+# Returns the name of the room at an index
+#
+# columns (int) - The number of columns in the castle
+# index (int) - The index of the room
+def room_name(columns, index):
+
+    # Spread the names out so neighbours are rarely named the same
+    return(f"{ROOM_NAMES[(index * 7919) % len(ROOM_NAMES)]} {index // columns}-{index % columns}")
+
+# - room()
+# Creates the room at an index of the entrance masks
+#
+# masks (bytearray) - Entrance masks, see generate_layout()
+# index (int) - The index of the room
+# names (function) - Returns the name of the room at an index
+# room_size ((rows, columns)) - Number of cells in the room
+def room(masks, index, names, room_size = (rooms.Room.ROWS, rooms.Room.COLUMNS)):
+
+    mask = masks[index]
+
+    return(rooms.Room(names(index), n = bool(mask & N), s = bool(mask & S), e = bool(mask & E), w = bool(mask & W), rows = room_size[0], columns = room_size[1]))
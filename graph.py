@@ -0,0 +1,243 @@
+'''
+
+    graph.py
+
+    Room graph of Dracula's Castle, finds how far every room is from a target room
+
+'''
+
+# - Imports
+
+# -- Libraries
+# (Modules others have made)
+import collections # Breadth first search and cached distances
+from array import array # Compact distance fields
+
+# - Classes
+
+# - Graph
+# Directed graph of the rooms of a map, a room has an edge to every room one of its entrances leads to
+# Rooms in the map have the id row * columns + column, rooms outside it (e.g. the crypt) are numbered after them
+# Distance fields are cached per target room and kept up to date as entrances are added
+# Only rooms in the map tell the graph when their entrances change, call update_room() after changing a room outside the map
+# The graph listens to the map until close() is called
+class Graph:
+
+    # Most distance fields to keep
+    CACHE_SIZE = 16
+
+    # - __init__()
+    # Builds the graph of a map, listening to the map for changed entrances
+    #
+    # self
+    # game_map (rooms.Map) - The map
+    # cache_size (int) - Most distance fields to keep, defaults to Graph.CACHE_SIZE
+    def __init__(self, game_map, cache_size = None):
+
+        # There must be room for the field being worked out
+        if((cache_size != None) and (cache_size < 1)):
+            raise ValueError("cache_size must be at least 1")
+
+        self._map = game_map
+        self._columns = game_map.columns()
+        self._cache_size = Graph.CACHE_SIZE if cache_size == None else cache_size
+        self._out = [] # Id -> set of the ids of the rooms its entrances lead to
+        self._in = [] # Id -> set of the ids of the rooms that lead to it
+        self._extra = {} # Room -> id, rooms outside the map
+        self._extra_rooms = [] # Rooms outside the map in id order
+        self._fields = collections.OrderedDict() # Target id -> distance field, from least to most recently used
+
+        # Add the edges of every room from the map's connectivity, rooms aren't created for it
+        offsets, neighbours, extra = game_map.csr()
+        for room_id in range(len(offsets) - 1):
+            self._out.append(set(neighbours[offsets[room_id]:offsets[room_id + 1]]))
+            self._in.append(set())
+        for room_id, out in enumerate(self._out):
+            for neighbour in out:
+                self._in[neighbour].add(room_id)
+
+        size = game_map.rows() * self._columns
+        for extra_id, room in enumerate(extra):
+            self._extra[room] = size + extra_id
+            self._extra_rooms.append(room)
+
+        game_map.add_listener(self.entrance_changed)
+
+    # - close()
+    # Stops listening to the map, the graph is no longer kept up to date
+    #
+    # self
+    def close(self):
+
+        self._map.remove_listener(self.entrance_changed)
+        self._fields.clear()
+
+    # - __len__()
+    # Returns the number of rooms in the graph
+    #
+    # self
+    def __len__(self):
+
+        return(len(self._out))
+
+    # - id_of()
+    # Returns the id of a room, rooms outside the map are added to the graph
+    #
+    # self
+    # room (rooms.Room) - The room
+    def id_of(self, room):
+
+        if(room.map_key() != None):
+            return(room.map_key()[0] * self._columns + room.map_key()[1])
+
+        room_id = self._extra.get(room)
+
+        if(room_id == None):
+            room_id = len(self._out)
+            self._extra[room] = room_id
+            self._extra_rooms.append(room)
+            self._out.append(set())
+            self._in.append(set())
+            # Grow the cached fields, the room can't reach any target yet
+            for field in self._fields.values():
+                field.append(-1)
+            self.update_room(room)
+
+        return(room_id)
+
+    # - room_of()
+    # Returns the room with an id
+    #
+    # self
+    # room_id (int) - The id of the room
+    def room_of(self, room_id):
+
+        size = self._map.rows() * self._columns
+
+        if(room_id >= size):
+            return(self._extra_rooms[room_id - size])
+
+        return(self._map.room_at(room_id // self._columns, room_id % self._columns))
+
+    # - neighbours()
+    # Returns the ids of the rooms a room leads to
+    #
+    # self
+    # room_id (int) - The id of the room
+    def neighbours(self, room_id):
+
+        return(self._out[room_id])
+
+    # - update_room()
+    # Works out the edges of a room from its entrances again, updating the cached distance fields
+    # Added edges can only shorten distances, so they are relaxed; a removed edge drops the fields it may have been on the shortest path of
+    #
+    # self
+    # room (rooms.Room) - The room
+    def update_room(self, room):
+
+        room_id = self.id_of(room)
+        old = self._out[room_id]
+        new = set(self.id_of(neighbour) for neighbour in room.neighbours().values())
+
+        if(old == new):
+            return
+
+        self._out[room_id] = new
+
+        for removed in old - new:
+            self._in[removed].discard(room_id)
+            for target, field in list(self._fields.items()):
+                if((field[removed] != -1) and (field[room_id] == field[removed] + 1)):
+                    del self._fields[target]
+
+        for added in new - old:
+            self._in[added].add(room_id)
+            for field in self._fields.values():
+                if((field[added] != -1) and ((field[room_id] == -1) or (field[added] + 1 < field[room_id]))):
+                    field[room_id] = field[added] + 1
+                    self.relax(field, room_id)
+
+    # - relax()
+    # Spreads a shortened distance back along the edges into a room
+    #
+    # self
+    # field (array) - The distance field
+    # room_id (int) - The id of the room whose distance was shortened
+    def relax(self, field, room_id):
+
+        queue = collections.deque([room_id])
+
+        while(queue):
+            current = queue.popleft()
+            distance = field[current] + 1
+            for previous in self._in[current]:
+                if((field[previous] == -1) or (distance < field[previous])):
+                    field[previous] = distance
+                    queue.append(previous)
+
+    # - entrance_changed()
+    # Listener for the map, called when an entrance of a room is changed
+    #
+    # self
+    # room (rooms.Room) - The room that changed
+    # entrance_name (str) - The name of the entrance that changed
+    def entrance_changed(self, room, entrance_name):
+
+        self.update_room(room)
+
+    # - distances()
+    # Returns the distance field of a target room, the number of moves from each room id to the target, -1 if it can't be reached
+    # Worked out with a breadth first search backwards along the edges and cached until an edge it relies on is removed
+    #
+    # self
+    # target (rooms.Room) - The target room, e.g. the player's room or the boss room
+    def distances(self, target):
+
+        target_id = self.id_of(target)
+        field = self._fields.get(target_id)
+
+        if(field != None):
+            # Most recently used
+            self._fields.move_to_end(target_id)
+            return(field)
+
+        field = array("l", [-1]) * len(self._out)
+        field[target_id] = 0
+        self.relax(field, target_id)
+
+        self._fields[target_id] = field
+        if(len(self._fields) > self._cache_size):
+            self._fields.popitem(last = False)
+
+        return(field)
+
+    # - distance()
+    # Returns the number of moves from one room to another, -1 if it can't be reached
+    #
+    # self
+    # room (rooms.Room) - The room to start from
+    # target (rooms.Room) - The target room
+    def distance(self, room, target):
+
+        return(self.distances(target)[self.id_of(room)])
+
+    # - next_step()
+    # Returns the name of an entrance of a room that leads one move closer to a target room, None if there is none
+    #
+    # self
+    # room (rooms.Room) - The room to start from
+    # target (rooms.Room) - The target room
+    def next_step(self, room, target):
+
+        field = self.distances(target)
+        distance = field[self.id_of(room)]
+
+        if(distance <= 0):
+            return(None)
+
+        for entrance_name, neighbour in room.neighbours().items():
+            if(field[self.id_of(neighbour)] == distance - 1):
+                return(entrance_name)
+
+        return(None)
@@ -12,23 +12,100 @@
 # - Imports
 
 import random # Produce pseudo-random results
+import contextlib # Batch changes to inventories
+import bisect # Keep items sorted by rank
+import itertools # Find items by position
 import tkinter as tk # GUI
 from tkinter import ttk # Refined GUI elements
+import types # Read only empty indexes
+import refresh # Coalesce GUI refreshes
+
+# - Constants
+
+# Index shared by every empty inventory, an inventory gets its own indexes when the first item is added
+EMPTY = types.MappingProxyType({})
 
 # - Classes
 
+# Prototype class, the immutable part of an item shared by every item of the same kind
+class Prototype:
+
+    __slots__ = ("_item_type", "_name", "_stats")
+
+    _registry = {} # (item type, name, stats) -> the prototype of that kind of item
+
+    # - get()
+    # Returns the prototype of a kind of item, creating it the first time it is asked for
+    #
+    # item_type (type) - The type of item, e.g. Weapon
+    # name (str) - The name of the item
+    # stats (tuple) - The item type's stats, e.g. (min damage, max damage)
+    @staticmethod
+    def get(item_type, name, stats = ()):
+
+        signature = (item_type, name, stats)
+        prototype = Prototype._registry.get(signature)
+
+        if(prototype == None):
+            prototype = Prototype(item_type, name, stats)
+            Prototype._registry[signature] = prototype
+
+        return(prototype)
+
+    # - __init__()
+    # Initialise Prototype Object, use get() so prototypes are shared
+    #
+    # self
+    # item_type (type) - The type of item
+    # name (str) - The name of the item
+    # stats (tuple) - The item type's stats
+    def __init__(self, item_type, name, stats):
+
+        self._item_type = item_type
+        self._name = name
+        self._stats = stats
+
+    # - __reduce__()
+    # Unpickled prototypes are looked up in the registry, so they are shared again
+    #
+    # self
+    def __reduce__(self):
+
+        return(Prototype.get, (self._item_type, self._name, self._stats))
+
+    # - name()
+    # Returns the name of the kind of item
+    #
+    # self
+    def name(self):
+
+        return(self._name)
+
+    # - stats()
+    # Returns the stats of the kind of item
+    #
+    # self
+    def stats(self):
+
+        return(self._stats)
+
 # The base Item class
+# Items only hold what can change, the rest is in a Prototype shared with every item of the same kind
 class Item:
 
+    __slots__ = ("_prototype", "_useable")
+
     # - __init__()
     # Initialise Item Object
     #
     # self
     # name (str) - The name of the item
-    def __init__(self, name, useable = False):
+    # useable (bool) - Whether the item can be used
+    # stats (tuple) - Stats of the item, used by child classes
+    def __init__(self, name, useable = False, stats = ()):
 
         # Set item attributes
-        self._name = name
+        self._prototype = Prototype.get(type(self), name, stats)
         self._useable = useable
 
     # - name()
@@ -36,7 +113,14 @@ class Item:
     #
     # self
     def name(self):
-        return(self._name)
+        return(self._prototype.name())
+
+    # - prototype()
+    # Returns the prototype the item shares with every item of the same kind
+    #
+    # self
+    def prototype(self):
+        return(self._prototype)
 
     # - useable()
     # Returns whether the item is usable or not
@@ -54,9 +138,35 @@ class Item:
 
         self._useable = state
 
+    # - description()
+    # Returns a description of the item to show in an inventory, e.g. "Weapon (1, 4)"
+    #
+    # self
+    def description(self):
+
+        return(f"{type(self).__name__} ")
+
+    # - rank()
+    # Returns how good the item is, inventories sort items of the same type by it
+    #
+    # self
+    def rank(self):
+
+        return(0)
+
+    # - stack_key()
+    # Returns what identifies the kind of item when inventories stack items, None if the item doesn't stack
+    #
+    # self
+    def stack_key(self):
+
+        return(None)
+
 # Weapon class, child of Item
 class Weapon(Item):
 
+    __slots__ = ()
+
     # - __init__()
     # Initialise Weapon Object
     #
@@ -65,12 +175,8 @@ class Weapon(Item):
     # damage (list [min, max]) - The min and max damage
     def __init__(self, name, min_dam, max_dam):
 
-        # Set weapon attributes
-        self._min_damage = min_dam
-        self._max_damage = max_dam
-
-        # Set attributes associated with parent item
-        super().__init__(name, True)
+        # Set attributes associated with parent item, the damage is a stat
+        super().__init__(name, True, (min_dam, max_dam))
 
     # - attack_damage()
     # Returns attack damage
@@ -79,7 +185,7 @@ class Weapon(Item):
     def attack_damage(self):
 
         # Get random value between max and min damage
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = random.randint(*self._prototype.stats())
 
         return(damage)
 
@@ -89,11 +195,29 @@ class Weapon(Item):
     # self
     def get_damage(self):
 
-        return(self._min_damage, self._max_damage)
+        return(self._prototype.stats())
+
+    # - description()
+    # Returns a description of the weapon with min/max attack values
+    #
+    # self
+    def description(self):
+
+        return(f"{type(self).__name__} {self.get_damage()}")
+
+    # - rank()
+    # Returns the max damage of the weapon
+    #
+    # self
+    def rank(self):
+
+        return(self._prototype.stats()[1])
 
 # Armour class, child of item
 class Armour(Item):
 
+    __slots__ = ()
+
     # - __init__()
     # Initialise Armour Object
     #
@@ -102,11 +226,8 @@ class Armour(Item):
     # protection (int) - Amount of damage the armour will protect from
     def __init__(self, name, protection):
 
-        # Set armour attributes
-        self._protection = protection
-
-        # Set attributes associated with parent item
-        super().__init__(name, True)
+        # Set attributes associated with parent item, the protection is a stat
+        super().__init__(name, True, (protection,))
 
     # - protection()
     # Returns amount of damage to be protected, random between no protection and all set protection
@@ -115,7 +236,7 @@ class Armour(Item):
     def protection(self):
 
         # Get random value between zero and protection
-        protection = random.randint(0, self._protection)
+        protection = random.randint(0, self._prototype.stats()[0])
 
         return(protection)
 
@@ -125,11 +246,29 @@ class Armour(Item):
     # self
     def get_protection(self):
 
-        return(self._protection)
+        return(self._prototype.stats()[0])
+
+    # - description()
+    # Returns a description of the armour with its protection value
+    #
+    # self
+    def description(self):
+
+        return(f"{type(self).__name__} ({self.get_protection()})")
+
+    # - rank()
+    # Returns the protection of the armour
+    #
+    # self
+    def rank(self):
+
+        return(self.get_protection())
 
 # Potion class, child of Item
 class Potion(Item):
 
+    __slots__ = ()
+
     # - __init__()
     # Initialise Potion Object
     #
@@ -138,11 +277,8 @@ class Potion(Item):
     # health_effect (init) - Amount of health the item will give the user
     def __init__(self, name, health_effect):
 
-        # Set potion attributes
-        self._health_effect = health_effect
-
-        # Set attributes associated with parent item
-        super().__init__(name, True)
+        # Set attributes associated with parent item, the health effect is a stat
+        super().__init__(name, True, (health_effect,))
 
     # - health_effect()
     # Get the amount of health this potion will effect
@@ -150,11 +286,37 @@ class Potion(Item):
     # self
     def health_effect(self):
 
-        return(self._health_effect)
+        return(self._prototype.stats()[0])
+
+    # - description()
+    # Returns a description of the potion with its health effect
+    #
+    # self
+    def description(self):
+
+        return(f"{type(self).__name__} ({self.health_effect()})")
+
+    # - rank()
+    # Returns the health effect of the potion
+    #
+    # self
+    def rank(self):
+
+        return(self.health_effect())
+
+    # - stack_key()
+    # Returns what identifies the kind of potion, potions with the same prototype stack
+    #
+    # self
+    def stack_key(self):
+
+        return(self._prototype)
 
 # Key class, child of Item
 class Key(Item):
 
+    __slots__ = ("_callback",)
+
     # - __init__()
     # Initialise Key Object
     #
@@ -199,12 +361,22 @@ class Inventory:
     # use_name (str) - The name of the button associated with the use command
     def __init__(self, use_command = None, use_name = "USE"):
 
-        # Set inventory attributes
-        self._items = [] # List of item objects stored by inventory
+        # Set inventory attributes, most rooms' inventories stay empty so they share EMPTY until an item is added
+        self._items = EMPTY # Handle -> item, the stacks of items stored by inventory in the order they were added
+        self._counts = EMPTY # Handle -> number of items in the stack
+        self._total = 0 # Number of items in every stack
+        self._stacks = EMPTY # Stack key -> handle of the stack of items that stack, see Item.stack_key()
+        self._handles = EMPTY # id(item) -> list of handles of the item, for items that don't stack
+        self._types = None # Type -> {handle: item} of the items of that type, built when first needed, see type_indexes()
+        self._ranked = None # Type -> sorted list of (-rank, handle) of the items of that type, best first, see Item.rank()
+        self._next_handle = 0 # Handle given to the next item added
         self._use_command = use_command
         self._use_name = use_name
         self._gui = None # Store GUI object (Frame)
+        self._views = () # Other GUI objects showing the inventory, e.g. InventoryBrowser
         self._position = 0 # Store where in the list of items the GUI is viewing
+        self._batch_depth = 0 # Number of batch() blocks the inventory is in
+        self._batch_changed = False # Whether the inventory has changed during the batch
 
     # - set_use_command()
     # Set the use command associated with the inventory
@@ -237,6 +409,12 @@ class Inventory:
                               ipadx = 5,
                               ipady = 5)
 
+        # Labels in the item frame, reconfigured rather than recreated
+        self._empty_label = tk.Label(self._item_frame, text = "Inventory is Empty!")
+        self._name_label = tk.Label(self._item_frame)
+        self._description_label = tk.Label(self._item_frame)
+        self._showing_item = None # Whether the item labels or the empty label are packed
+
         # Create a frame for the controls to be displayed in
         self._control_frame = tk.Frame(self._gui)
         self._control_frame.pack(fill = tk.X)
@@ -282,21 +460,18 @@ class Inventory:
     # self
     def gui_refresh(self):
         
-        # Holds the description of the item, e.g. 30 defense
-        description_text = ""
-
         # First check that a GUI exists, if it doesn't then we can skip all this code
         if(self._gui is not None):
 
-            # Remove all widgets in the item frame
-            for widget in self._item_frame.winfo_children():
-                widget.destroy()
-
             # Check that there are items in the Inventory
-            if(self._items == []):
+            if(self._items == {}):
 
                 # There are no items so we will tell the user this
-                tk.Label(self._item_frame, text = "Inventory is Empty!").pack(pady = 20)
+                if(self._showing_item != False):
+                    self._name_label.pack_forget()
+                    self._description_label.pack_forget()
+                    self._empty_label.pack(pady = 20)
+                    self._showing_item = False
                 # Check and set the button states for no item
                 self.check_buttons(None)
 
@@ -305,32 +480,91 @@ class Inventory:
 
                 # Try and get the item at the specified position
                 try:
-                    current_item = self._items[self._position]
-                except:
+                    current_item = self.item_at(self._position)
+                except(IndexError):
                     # If we can't get the specified position we will get the item at position zero
                     # Since the list isn't empty, we've already checked that, we know there will be an item at zero
                     # An alternative would to be move up one position and recurse, this could cause lag if the position is way off though
-                    current_item = self._items[0]
+                    current_item = self.item_at(0)
 
                 # Check and set the button states
                 self.check_buttons(current_item)
 
-                # Display item info
-                tk.Label(self._item_frame, text = current_item.name()).pack(anchor = tk.W, pady = (10, 0))
+                # Show the item labels
+                if(self._showing_item != True):
+                    self._empty_label.pack_forget()
+                    self._name_label.pack(anchor = tk.W, pady = (10, 0))
+                    self._description_label.pack(anchor = tk.W)
+                    self._showing_item = True
 
-                # Compute item description
-                if(type(current_item) == Armour):
-                    # If armour describe with protection value
-                    description_text = f"({current_item.get_protection()})"
-                elif(type(current_item) == Weapon):
-                    # If weapon describe with min/max attack values
-                    description_text = current_item.get_damage()
-                elif(type(current_item) == Potion):
-                    # If potion describe with health effect
-                    description_text = f"({current_item.health_effect()})"
+                # Display item info, with the number in the stack
+                count = self._counts[self.handle(current_item)]
+                if(count > 1):
+                    self._name_label.config(text = f"{current_item.name()} x{count}")
+                else:
+                    self._name_label.config(text = current_item.name())
 
                 # Display item description
-                tk.Label(self._item_frame, text = f"{type(current_item).__name__} {description_text}").pack(anchor = tk.W)
+                self._description_label.config(text = current_item.description())
+
+    # - request_refresh()
+    # Asks for the GUI to be refreshed once the Tk event loop is idle, see refresh.request()
+    #
+    # self
+    def request_refresh(self):
+
+        # Wait for the end of the batch
+        if(self._batch_depth > 0):
+            self._batch_changed = True
+            return
+
+        refresh.request(self, self._gui)
+
+        # Refresh other views too
+        for view in self._views:
+            view.request_refresh()
+
+    # - add_view()
+    # Adds a GUI object to refresh when the inventory changes
+    # It must have request_refresh(), stack_added(handle), stack_removed(handle, item) and stacks_cleared() methods
+    #
+    # self
+    # view (object) - The view to add, e.g. InventoryBrowser
+    def add_view(self, view):
+
+        self._views = self._views + (view,)
+
+    # - remove_view()
+    # Stops refreshing a GUI object when the inventory changes
+    #
+    # self
+    # view (object) - The view to remove
+    def remove_view(self, view):
+
+        self._views = tuple(other for other in self._views if other is not view)
+
+    # - batch()
+    # Context manager that holds back GUI refreshes until the end of the block, e.g.
+    #     with inventory.batch():
+    #         inventory.add_item(item)
+    #         inventory.drop_item(other_item)
+    # The GUI is refreshed once at the end if anything changed, blocks can be nested
+    #
+    # self
+    @contextlib.contextmanager
+    def batch(self):
+
+        self._batch_depth += 1
+
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+
+            # Refresh once at the end of the outermost block
+            if((self._batch_depth == 0) and self._batch_changed):
+                self._batch_changed = False
+                self.request_refresh()
 
     # - check_buttons()
     # Checks and sets the states of the control buttons
@@ -388,25 +622,270 @@ class Inventory:
         self._position += 1
         self.gui_refresh()
 
+    # - __getstate__()
+    # Returns the state of the inventory to pickle, the index of handles by id is rebuilt when unpickled
+    #
+    # self
+    def __getstate__(self):
+
+        state = dict(self.__dict__)
+        del state["_handles"]
+        # Views are GUI objects, they aren't kept
+        del state["_views"]
+        # The type indexes are rebuilt when needed
+        del state["_types"]
+        del state["_ranked"]
+        # Empty indexes are shared, they are put back when unpickled
+        for name in ("_items", "_counts", "_stacks"):
+            if(state[name] is EMPTY):
+                del state[name]
+
+        return(state)
+
+    # - __setstate__()
+    # Restores the state of a pickled inventory
+    #
+    # self
+    # state (dict) - The state returned by __getstate__()
+    def __setstate__(self, state):
+
+        self._items = self._counts = self._stacks = EMPTY
+        self.__dict__.update(state)
+
+        self._views = ()
+        self._types = None
+        self._ranked = None
+        self._handles = EMPTY if (self._items is EMPTY) else {}
+        for handle, item in self._items.items():
+            if(item.stack_key() == None):
+                self._handles.setdefault(id(item), []).append(handle)
+
+    # - __len__()
+    # Returns the number of items in the inventory, counting every item in a stack
+    #
+    # self
+    def __len__(self):
+
+        return(self._total)
+
     # - items()
-    # Return a list of the items in the inventory
+    # Return a new list of the items in the inventory, the item of a stack is repeated for every item in it
     #
     # self
     def items(self):
 
-        return(self._items)
+        invent_items = []
+        for handle, item in self._items.items():
+            invent_items.extend([item] * self._counts[handle])
+
+        return(invent_items)
+
+    # - stacks()
+    # Return a new list of (item, count) for every stack in the inventory, in the order they were added
+    # Items that don't stack are in a stack of their own
+    #
+    # self
+    def stacks(self):
+
+        return([(item, self._counts[handle]) for handle, item in self._items.items()])
+
+    # - stack_count()
+    # Returns the number of stacks in the inventory
+    #
+    # self
+    def stack_count(self):
+
+        return(len(self._items))
+
+    # - handles()
+    # Return a new list of the handles of the stacks in the inventory, in the order they were added
+    #
+    # self
+    def handles(self):
+
+        return(list(self._items))
+
+    # - has_handle()
+    # Returns whether a stack with a handle is in the inventory
+    #
+    # self
+    # handle (int) - The handle, see add_item()
+    def has_handle(self, handle):
+
+        return(handle in self._items)
+
+    # - types()
+    # Returns a new list of the types of items in the inventory
+    #
+    # self
+    def types(self):
+
+        return([item_type for item_type, typed in self.type_indexes()[0].items() if typed != {}])
+
+    # - use_name()
+    # Returns the name of the button associated with the use command
+    #
+    # self
+    def use_name(self):
+
+        return(self._use_name)
+
+    # - item()
+    # Returns the item of the stack with a handle
+    #
+    # self
+    # handle (int) - The handle of the stack, see add_item()
+    def item(self, handle):
+
+        return(self._items[handle])
+
+    # - count()
+    # Returns the number of items in the stack with a handle
+    #
+    # self
+    # handle (int) - The handle of the stack, see add_item()
+    def count(self, handle):
+
+        return(self._counts[handle])
+
+    # - item_at()
+    # Returns the item of the stack at a position in the inventory, raises IndexError if there is no stack there
+    #
+    # self
+    # position (int) - The position of the stack
+    def item_at(self, position):
+
+        if((position < 0) or (position >= len(self._items))):
+            raise IndexError("inventory position out of range")
+
+        return(next(itertools.islice(self._items.values(), position, None)))
+
+    # - handle()
+    # Returns the handle of the stack an item is in, None if it isn't in the inventory
+    #
+    # self
+    # item (Item) - The item to find, any item with the same stack key is found for items that stack
+    def handle(self, item):
+
+        stack_key = item.stack_key()
+
+        if(stack_key != None):
+            return(self._stacks.get(stack_key))
+
+        handles = self._handles.get(id(item))
+
+        if(handles == None):
+            return(None)
+
+        return(handles[-1])
+
+    # - of_type()
+    # Returns a new list of the items of a type, one for each stack, in the order they were added
+    #
+    # self
+    # item_type (type) - The type of item, e.g. Weapon, subclasses are not included
+    def of_type(self, item_type):
+
+        return(list(self.type_indexes()[0].get(item_type, {}).values()))
+
+    # - ranked()
+    # Returns a new list of the items of a type sorted by rank, best first, e.g. weapons by max damage
+    # One item for each stack, items of the same rank are in the order they were added
+    #
+    # self
+    # item_type (type) - The type of item, e.g. Weapon
+    def ranked(self, item_type):
+
+        return([self._items[handle] for rank, handle in self.type_indexes()[1].get(item_type, [])])
+
+    # - best()
+    # Returns the highest ranked item of a type, the first added if there is a tie, None if there are none
+    #
+    # self
+    # item_type (type) - The type of item, e.g. Weapon
+    def best(self, item_type):
+
+        ranked = self.type_indexes()[1].get(item_type)
+
+        if(not ranked):
+            return(None)
+
+        return(self._items[ranked[0][1]])
+
+    # - type_indexes()
+    # Returns the (per type, ranked) indexes, building them from the items the first time they are needed
+    # Once built they are kept up to date as items are added and dropped
+    #
+    # self
+    def type_indexes(self):
+
+        if(self._types == None):
+            self._types = {}
+            self._ranked = {}
+            for handle, item in self._items.items():
+                self.index_type(handle, item)
+
+        return(self._types, self._ranked)
+
+    # - index_type()
+    # Adds a new stack to the type indexes
+    #
+    # self
+    # handle (int) - The handle of the stack
+    # item (Item) - The item of the stack
+    def index_type(self, handle, item):
+
+        self._types.setdefault(type(item), {})[handle] = item
+        bisect.insort(self._ranked.setdefault(type(item), []), (-item.rank(), handle))
 
     # - add_item()
-    # Add item to the inventory
+    # Add item to the inventory, returns the handle of its stack which stays the same until the stack is empty
+    # Items that stack are added to the stack of the same kind if there is one, see Item.stack_key()
     #
     # self
     # new_item (Item) - A new item object to store in the inventory
-    def add_item(self, new_item):
+    # count (int) - Number of the item to add
+    def add_item(self, new_item, count = 1):
+
+        stack_key = new_item.stack_key()
+        handle = None
+        if(stack_key != None):
+            handle = self._stacks.get(stack_key)
+
+        if(handle != None):
+            # Add to the stack
+            self._counts[handle] += count
+        else:
+            # The first item, stop sharing the empty indexes
+            if(self._items is EMPTY):
+                self._items = {}
+                self._counts = {}
+                self._stacks = {}
+                self._handles = {}
+
+            handle = self._next_handle
+            self._next_handle += 1
+
+            # Store the new item and index it
+            self._items[handle] = new_item
+            self._counts[handle] = count
+            if(stack_key != None):
+                self._stacks[stack_key] = handle
+            else:
+                self._handles.setdefault(id(new_item), []).append(handle)
+            if(self._types != None):
+                self.index_type(handle, new_item)
+
+            # Tell the views about the new stack
+            for view in self._views:
+                view.stack_added(handle)
+
+        self._total += count
 
-        # Append the new item
-        self._items.append(new_item)
         # Refresh the GUI if applicable
-        self.gui_refresh()
+        self.request_refresh()
+
+        return(handle)
 
     # - add_items()
     # Add multiple items to the inventory
@@ -415,28 +894,103 @@ class Inventory:
     # new_items (list of Items) - List of items to add to the inventory
     def add_items(self, new_items):
 
-        # For every item in the list
-        for item in new_items:
-            # Add the item to the inventory
-            self.add_item(item)
-
-        # Refresh the GUI if applicable
-        self.gui_refresh()
+        # Refresh once for all of the items
+        with self.batch():
+            # For every item in the list
+            for item in new_items:
+                # Add the item to the inventory
+                self.add_item(item)
 
     # - drop_item()
-    # Remove the item from the inventory
+    # Remove the item from the inventory, one item is taken from its stack
     # 
     # self
     # item (Item) - The item to be removed from the inventory
     def drop_item(self, item):
 
-        # Drop the item from the list
-        self._items.remove(item)
-        # Move position up by one, if position is not already zero
-        if(self._position != 0):
-            self._position -= 1
+        handle = self.handle(item)
+
+        # Same error as removing it from a list
+        if(handle == None):
+            raise ValueError("item is not in the inventory")
+
+        self.drop_handle(handle)
+
+    # - drop_handle()
+    # Remove items from the stack with a handle, the stack is removed once it is empty
+    #
+    # self
+    # handle (int) - The handle of the stack, see add_item()
+    # count (int) - Number of items to remove, defaults to one
+    def drop_handle(self, handle, count = 1):
+
+        count = min(count, self._counts[handle])
+        self._counts[handle] -= count
+        self._total -= count
+
+        # Remove empty stacks
+        if(self._counts[handle] == 0):
+
+            # Drop the item and remove it from the indexes
+            item = self._items.pop(handle)
+            del self._counts[handle]
+
+            stack_key = item.stack_key()
+            if(stack_key != None):
+                del self._stacks[stack_key]
+            else:
+                handles = self._handles[id(item)]
+                handles.remove(handle)
+                if(handles == []):
+                    del self._handles[id(item)]
+
+            if(self._types != None):
+                del self._types[type(item)][handle]
+                ranked = self._ranked[type(item)]
+                del ranked[bisect.bisect_left(ranked, (-item.rank(), handle))]
+
+            # Tell the views the stack has gone
+            for view in self._views:
+                view.stack_removed(handle, item)
+
+            # Move position up by one, if position is not already zero
+            if(self._position != 0):
+                self._position -= 1
+
         # Refresh the GUI if applicable
-        self.gui_refresh()
+        self.request_refresh()
+
+    # - drop_items()
+    # Remove multiple items from the inventory
+    #
+    # self
+    # old_items (list of Items) - List of items to remove from the inventory
+    def drop_items(self, old_items):
+
+        # Refresh once for all of the items
+        with self.batch():
+            for item in old_items:
+                self.drop_item(item)
+
+    # - transfer()
+    # Moves items from this inventory to another
+    #
+    # self
+    # other (Inventory) - The inventory to move the items to
+    # moved_items (list of Items) - The items to move, defaults to every item
+    def transfer(self, other, moved_items = None):
+
+        # Each inventory refreshes once
+        with self.batch(), other.batch():
+            if(moved_items == None):
+                # Move whole stacks
+                for item, count in self.stacks():
+                    other.add_item(item, count)
+                self.drop_all()
+            else:
+                for item in moved_items:
+                    self.drop_item(item)
+                    other.add_item(item)
 
     # - drop_all()
     # Removes all items in inventory
@@ -444,10 +998,19 @@ class Inventory:
     # self
     def drop_all(self):
 
-        # Set items to empty list
-        self._items = []
+        # Empty the items and indexes
+        self._items = EMPTY
+        self._counts = EMPTY
+        self._total = 0
+        self._stacks = EMPTY
+        self._handles = EMPTY
+        self._types = None
+        self._ranked = None
+        # Tell the views every stack has gone
+        for view in self._views:
+            view.stacks_cleared()
         # Refresh the GUI if applicable
-        self.gui_refresh()
+        self.request_refresh()
 
     # - use()
     # Uses the current item if a use command is set
@@ -455,18 +1018,351 @@ class Inventory:
     # self
     def use(self):
 
-        # Get current item
-        item = self._items[self._position]
+        # Use the current item
+        self.use_item(self.item_at(self._position))
+
+    # - use_handle()
+    # Uses an item from the stack with a handle, see use_item()
+    #
+    # self
+    # handle (int) - The handle of the stack, see add_item()
+    def use_handle(self, handle):
 
-        # If there is a use command then run it with the item as an argument
-        if(self._use_command is not None):
-            self._use_command(item)
+        self.use_item(self._items[handle])
 
-        # Remove the item from the inventory
-        self.drop_item(item)
-        # Refresh the GUI if applicable
+    # - use_item()
+    # Uses an item in the inventory if a use command is set, taking it from its stack
+    #
+    # self
+    # item (Item) - The item to use
+    def use_item(self, item):
+
+        # Refresh once, the use command may change the inventory too
+        with self.batch():
+
+            # If there is a use command then run it with the item as an argument
+            if(self._use_command is not None):
+                self._use_command(item)
+
+            # Remove the item from the inventory
+            self.drop_item(item)
+
+# InventoryBrowser class, a scrolling list of the items in an inventory
+# Only the visible rows are drawn, a fixed set of row labels is reconfigured as the list scrolls
+# The sorted list is only rebuilt when the sort or filter changes, the inventory tells the browser as stacks are added and removed
+class InventoryBrowser:
+
+    # Constants
+    ROWS = 8 # Number of rows shown at once
+    SELECTED = "grey75" # Background of the selected row
+    ALL_TYPES = "All" # Type filter that shows every type
+
+    # Sort orders, name -> key of an item, None to keep the order the items were added
+    SORTS = {
+        "Added": None,
+        "Name": lambda item: item.name().lower(),
+        "Type": lambda item: (type(item).__name__, item.name().lower()),
+        "Best": lambda item: -item.rank()
+    }
+
+    # - __init__()
+    # Initialise InventoryBrowser Object
+    #
+    # self
+    # parent (Tkinter) - The parent frame/root object the browser is displayed in
+    # inventory (Inventory) - The inventory to browse
+    # rows (int) - Number of rows shown at once
+    def __init__(self, parent, inventory, rows = ROWS):
+
+        self._inventory = inventory
+        self._rows = rows
+        self._view = [] # (sort key, handle) of the items that pass the filter, in sort order, kept up to date as stacks are added and removed
+        self._top = 0 # Position in the view of the first row shown
+        self._selected = None # Handle of the selected item
+        self._drawn = [None] * rows # (text, selected) drawn in each row, only changed rows are reconfigured
+        self._drawn_footer = None # (count text, use button state) drawn
+
+        # Create frame to hold the browser and pack it
+        self._gui = tk.Frame(parent)
+        self._gui.pack(fill = tk.BOTH, expand = True)
+
+        # Sort, filter and jump controls
+        self._control_frame = tk.Frame(self._gui)
+        self._control_frame.pack(fill = tk.X)
+
+        self._sort = tk.StringVar(value = "Added")
+        sort_box = ttk.Combobox(self._control_frame, textvariable = self._sort, values = list(InventoryBrowser.SORTS), state = "readonly", width = 6)
+        sort_box.pack(side = tk.LEFT)
+        sort_box.bind("<<ComboboxSelected>>", lambda event: self.reset())
+
+        self._type = tk.StringVar(value = InventoryBrowser.ALL_TYPES)
+        self._type_box = ttk.Combobox(self._control_frame, textvariable = self._type, state = "readonly", width = 7)
+        self._type_box.pack(side = tk.LEFT)
+        self._type_box.bind("<<ComboboxSelected>>", lambda event: self.reset())
+
+        self._filter = tk.StringVar()
+        self._filter.trace_add("write", lambda *args: self.reset())
+        ttk.Entry(self._control_frame, textvariable = self._filter, width = 10).pack(side = tk.LEFT, fill = tk.X, expand = True)
+
+        self._jump = tk.StringVar()
+        self._jump_box = ttk.Combobox(self._control_frame, textvariable = self._jump, state = "readonly", width = 7)
+        self._jump_box.pack(side = tk.LEFT)
+        self._jump_box.bind("<<ComboboxSelected>>", lambda event: self.jump_to_type(self._jump.get()))
+
+        # The rows and their scrollbar
+        list_frame = tk.Frame(self._gui)
+        list_frame.pack(fill = tk.BOTH, expand = True)
+
+        self._scrollbar = ttk.Scrollbar(list_frame, orient = tk.VERTICAL, command = self.scroll)
+        self._scrollbar.pack(side = tk.RIGHT, fill = tk.Y)
+
+        self._labels = []
+        for row in range(rows):
+            label = tk.Label(list_frame, anchor = tk.W)
+            label.pack(fill = tk.X)
+            label.bind("<Button-1>", lambda event, row = row: self.select_row(row))
+            # Mouse wheel, Button-4/5 on X11
+            label.bind("<MouseWheel>", lambda event: self.scroll("scroll", -1 if event.delta > 0 else 1, "units"))
+            label.bind("<Button-4>", lambda event: self.scroll("scroll", -1, "units"))
+            label.bind("<Button-5>", lambda event: self.scroll("scroll", 1, "units"))
+            self._labels.append(label)
+        self._background = self._labels[0].cget("background")
+
+        # Count of items shown and use button
+        bottom_frame = tk.Frame(self._gui)
+        bottom_frame.pack(fill = tk.X)
+
+        self._count_label = tk.Label(bottom_frame, anchor = tk.W)
+        self._count_label.pack(side = tk.LEFT, fill = tk.X, expand = True)
+
+        self._use_button = ttk.Button(bottom_frame, text = inventory.use_name(), state = tk.DISABLED, command = self.use)
+        self._use_button.pack(side = tk.RIGHT)
+
+        # Refresh when the inventory changes, until the browser is destroyed
+        inventory.add_view(self)
+        self._gui.bind("<Destroy>", self.destroyed)
+
+        # Build the view and draw it
+        self.reset()
+
+    # - request_refresh()
+    # Asks for the browser to be refreshed once the Tk event loop is idle, see refresh.request()
+    #
+    # self
+    def request_refresh(self):
+
+        refresh.request(self, self._gui)
+
+    # - destroyed()
+    # Stops browsing the inventory once the browser is destroyed
+    #
+    # self
+    # event (tkinter.Event) - The destroy event
+    def destroyed(self, event):
+
+        if(event.widget == self._gui):
+            self._inventory.remove_view(self)
+
+    # - gui_refresh()
+    # Updates the type choices and draws the visible rows, the view itself is kept up to date by the inventory
+    #
+    # self
+    def gui_refresh(self):
+
+        # Types that can be filtered and jumped to
+        types = sorted(item_type.__name__ for item_type in self._inventory.types())
+        self._type_box.config(values = [InventoryBrowser.ALL_TYPES] + types)
+        self._jump_box.config(values = types)
+
+        # Forget the selection if the item has gone
+        if((self._selected != None) and (self._inventory.has_handle(self._selected) == False)):
+            self._selected = None
+
+        self.draw()
+
+    # - reset()
+    # Works out which items pass the filter and their order again, showing the top of the list
+    # Used when the sort or filter changes
+    #
+    # self
+    def reset(self):
+
+        self._view = sorted(self.entry(handle, self._inventory.item(handle)) for handle in self._inventory.handles() if self.shown(self._inventory.item(handle)))
+        self._top = 0
         self.gui_refresh()
 
+    # - entry()
+    # Returns the (sort key, handle) of a stack in the view, ties are broken by handle so they keep the order they were added
+    #
+    # self
+    # handle (int) - The handle of the stack
+    # item (Item) - The item of the stack
+    def entry(self, handle, item):
+
+        key = InventoryBrowser.SORTS[self._sort.get()]
+
+        if(key == None):
+            return((handle, handle))
+
+        return((key(item), handle))
+
+    # - shown()
+    # Returns whether an item passes the current filter, see passes()
+    #
+    # self
+    # item (Item) - The item to check
+    def shown(self, item):
+
+        return(self.passes(item, self._type.get(), self._filter.get().lower()))
+
+    # - stack_added()
+    # Called by the inventory when a stack is added, puts it in its place in the view
+    #
+    # self
+    # handle (int) - The handle of the stack
+    def stack_added(self, handle):
+
+        item = self._inventory.item(handle)
+
+        if(self.shown(item)):
+            bisect.insort(self._view, self.entry(handle, item))
+
+    # - stack_removed()
+    # Called by the inventory when a stack is removed, takes it out of the view
+    #
+    # self
+    # handle (int) - The handle of the stack
+    # item (Item) - The item of the stack
+    def stack_removed(self, handle, item):
+
+        if(self.shown(item)):
+            entry = self.entry(handle, item)
+            position = bisect.bisect_left(self._view, entry)
+            if((position < len(self._view)) and (self._view[position] == entry)):
+                del self._view[position]
+
+    # - stacks_cleared()
+    # Called by the inventory when every stack is removed
+    #
+    # self
+    def stacks_cleared(self):
+
+        self._view = []
+
+    # - passes()
+    # Returns whether an item passes the filter
+    #
+    # item (Item) - The item to check
+    # type_name (str) - The name of the type to show, or ALL_TYPES
+    # text (str) - Lower case text the item's name must contain
+    @staticmethod
+    def passes(item, type_name, text):
+
+        if((type_name != InventoryBrowser.ALL_TYPES) and (type(item).__name__ != type_name)):
+            return(False)
+
+        return(text in item.name().lower())
+
+    # - draw()
+    # Draws the visible rows, only reconfiguring rows that have changed
+    #
+    # self
+    def draw(self):
+
+        total = len(self._view)
+
+        # Keep the top row in range
+        self._top = max(0, min(self._top, total - self._rows))
+
+        for row, label in enumerate(self._labels):
+
+            position = self._top + row
+            if(position < total):
+                handle = self._view[position][1]
+                item = self._inventory.item(handle)
+                count = self._inventory.count(handle)
+                if(count > 1):
+                    drawn = (f"{item.name()} x{count}  {item.description()}", handle == self._selected)
+                else:
+                    drawn = (f"{item.name()}  {item.description()}", handle == self._selected)
+            else:
+                drawn = ("", False)
+
+            # Only reconfigure rows that have changed
+            if(drawn != self._drawn[row]):
+                label.config(text = drawn[0], background = InventoryBrowser.SELECTED if drawn[1] else self._background)
+                self._drawn[row] = drawn
+
+        # Scrollbar shows the fraction of the view on screen
+        if(total == 0):
+            self._scrollbar.set(0, 1)
+        else:
+            self._scrollbar.set(self._top / total, min(self._top + self._rows, total) / total)
+
+        # Only selected useable items can be used
+        if((self._selected != None) and self._inventory.item(self._selected).useable()):
+            footer = (f"{total} of {self._inventory.stack_count()} stacks", tk.ACTIVE)
+        else:
+            footer = (f"{total} of {self._inventory.stack_count()} stacks", tk.DISABLED)
+
+        if(footer != self._drawn_footer):
+            self._count_label.config(text = footer[0])
+            self._use_button.config(state = footer[1])
+            self._drawn_footer = footer
+
+    # - scroll()
+    # Scrolls the rows, called by the scrollbar and the mouse wheel
+    #
+    # self
+    # action (str) - "moveto" or "scroll"
+    # amount (str) - Fraction of the view to move to, or number of units/pages to scroll
+    # unit (str) - "units" (rows) or "pages"
+    def scroll(self, action, amount, unit = "units"):
+
+        if(action == "moveto"):
+            self._top = int(float(amount) * len(self._view))
+        elif(unit == "pages"):
+            self._top += int(amount) * self._rows
+        else:
+            self._top += int(amount)
+
+        self.draw()
+
+    # - jump_to_type()
+    # Scrolls to the first item of a type in the view
+    #
+    # self
+    # type_name (str) - The name of the type, e.g. "Weapon"
+    def jump_to_type(self, type_name):
+
+        for position, (key, handle) in enumerate(self._view):
+            if(type(self._inventory.item(handle)).__name__ == type_name):
+                self._top = position
+                self.draw()
+                return
+
+    # - select_row()
+    # Selects the item in a row
+    #
+    # self
+    # row (int) - The row clicked
+    def select_row(self, row):
+
+        if(self._top + row < len(self._view)):
+            self._selected = self._view[self._top + row][1]
+            self.draw()
+
+    # - use()
+    # Uses the selected item
+    #
+    # self
+    def use(self):
+
+        if(self._selected != None):
+            handle = self._selected
+            self._selected = None
+            self._inventory.use_handle(handle)
+
 # - Main
 # Used for testing code associated with this module so this code should only run when it is main
 if(__name__ == "__main__"):
@@ -487,4 +1383,10 @@ if(__name__ == "__main__"):
     invent.gui(root)
     invent.gui_refresh()
 
+    # Browse a large inventory
+    window = tk.Toplevel(root)
+    big_invent = Inventory(print)
+    big_invent.add_items([Weapon(f"Sword #{i}", 1, i % 100) for i in range(50000)] + [Potion(f"Potion #{i}", i % 50) for i in range(50000)])
+    InventoryBrowser(window, big_invent)
+
     root.mainloop()
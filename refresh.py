@@ -0,0 +1,54 @@
+'''
+
+    refresh.py
+
+    Coalesces GUI refreshes in Dracula's Castle, objects are refreshed at most once per Tk idle cycle
+
+'''
+
+# - Variables
+
+_pending = {} # id(object) -> (object, widget), objects waiting to be refreshed in the order they were requested
+_flush = None # The scheduled flush, None if there isn't one
+
+# - Functions
+
+# - request()
+# Marks an object as needing its gui_refresh() called, the refresh happens once the Tk event loop is idle
+# Requesting again before then does nothing, so many changes from one user action cost one refresh
+#
+# obj (object) - The object to refresh, must have a gui_refresh() method
+# widget (tkinter) - The object's GUI widget, None if the object has no GUI
+def request(obj, widget):
+
+    global _flush
+
+    # Nothing to refresh without a GUI
+    if(widget == None):
+        return
+
+    _pending[id(obj)] = (obj, widget)
+
+    # Schedule a flush if one isn't already, on the root window as a Toplevel may be destroyed before it runs
+    if(_flush == None):
+        _flush = widget._root().after_idle(flush)
+
+# - pending()
+# Returns whether any refreshes are waiting
+def pending():
+
+    return(_pending != {})
+
+# - flush()
+# Refreshes every object waiting to be refreshed now, objects whose GUI has been destroyed are skipped
+def flush():
+
+    global _flush
+
+    _flush = None
+
+    # Refreshing may request more refreshes, keep going until there are none
+    while(_pending != {}):
+        obj, widget = _pending.pop(next(iter(_pending)))
+        if(widget.winfo_exists()):
+            obj.gui_refresh()
@@ -13,8 +13,43 @@
 
 import tkinter as tk # GUI
 from tkinter import ttk # Refined GUI elements
+import collections # Ordered room cache
+import dbm # Store spilled rooms
+import io # Pickle spilled rooms
+import os # Store paths
+import pickle # Serialise spilled rooms
+import shutil # Remove temporary stores
+import tempfile # Temporary stores
+import weakref # Remove stores of maps that are no longer used
+import random # Pick free entrances
+from array import array # Compact connectivity arrays
 import items # Item management
 
+# - Constants
+
+# Entrance bits of a room's entrance mask, see LazyMap
+ENTRANCE_BITS = {
+    "n": 1,
+    "s": 2,
+    "e": 4,
+    "w": 8
+}
+ALL_ENTRANCES = 15 # Mask of a room with every entrance used
+
+# Codes of the cells of a room, see Room.cells()
+CELL_OPEN = 0
+CELL_WALL = 1
+CELL_MIDDLE = 2
+CELL_DOORS = {"n": 3, "s": 4, "e": 5, "w": 6} # Entrances to the neighbouring room
+CELL_LINKS = {"n": 7, "s": 8, "e": 9, "w": 10} # Entrances linked to another room
+
+# Change in (row, column) of the room through each entrance
+ENTRANCE_STEPS = {"n": (-1, 0), "s": (1, 0), "e": (0, 1), "w": (0, -1)}
+
+# Entrance name of each door/link code
+DOOR_NAMES = {code: name for name, code in CELL_DOORS.items()}
+LINK_NAMES = {code: name for name, code in CELL_LINKS.items()}
+
 # - Classes
 
 # - Map
@@ -22,6 +57,23 @@ import items # Item management
 # Version: 1.1
 class Map:
 
+    # Moves as (row, column) arguments to characters.Player.move(), and their index in a room's transition table
+    MOVES = {
+        (0, 0): 0,
+        (-1, 0): 1,
+        (1, 0): 2,
+        (0, -1): 3,
+        (0, 1): 4
+    }
+
+    # The entrance a player arrives at when leaving through an entrance
+    OPPOSITES = {
+        "n": "s",
+        "s": "n",
+        "e": "w",
+        "w": "e"
+    }
+
     # - __init__()
     # Initialise a map object
     #
@@ -35,6 +87,8 @@ class Map:
         self._start_room = start_room
         self._boss_room = boss_room
 
+        self.setup()
+
         # Row iteration counter
         row_num = 0
 
@@ -56,6 +110,17 @@ class Map:
             # Iterate row num
             row_num += 1
 
+    # - setup()
+    # Initialises the state every kind of map has, called by the __init__() of Map and its children
+    #
+    # self
+    def setup(self):
+
+        self._transitions = {} # id(cells) -> (cells, transition table), rooms sharing cells share a table
+        self._listeners = [] # Functions called with (room, entrance name) when an entrance changes
+        self._free = None # List of (room index, entrance name) of every free entrance, built when first needed
+        self._free_positions = {} # (room index, entrance name) -> position in the free entrance list
+
     # - grid()
     # Returns the map grid representation
     #
@@ -64,6 +129,32 @@ class Map:
 
         return(self._map)
 
+    # - rows()
+    # Returns the number of rows of rooms in the map
+    #
+    # self
+    def rows(self):
+
+        return(len(self._map))
+
+    # - columns()
+    # Returns the number of columns of rooms in the map
+    #
+    # self
+    def columns(self):
+
+        return(len(self._map[0]))
+
+    # - room_at()
+    # Returns the room at a row and column of the map
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def room_at(self, row, column):
+
+        return(self._map[row][column])
+
     # - start_room()
     # Returns the room position that the player starts in
     #
@@ -80,6 +171,886 @@ class Map:
 
         return(self._boss_room)
 
+    # - entrances_at()
+    # Returns the entrances of the room at a row and column, as Room.entrances()
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def entrances_at(self, row, column):
+
+        return(self.room_at(row, column).entrances())
+
+    # - exits_at()
+    # Returns a dictionary of where each exit of the room at a row and column leads, worked out from entrances_at() so no room is created
+    # Doors lead to a (row, column) inside the map, linked entrances to the linked Room
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def exits_at(self, row, column):
+
+        exits = {}
+        rows = self.rows()
+        columns = self.columns()
+
+        for entrance_name, entrance_value in self.entrances_at(row, column).items():
+            if(type(entrance_value) == Room):
+                exits[entrance_name] = entrance_value
+            elif(entrance_value):
+                # Doors only lead somewhere inside the map
+                neighbour_row = row + ENTRANCE_STEPS[entrance_name][0]
+                neighbour_column = column + ENTRANCE_STEPS[entrance_name][1]
+                if((0 <= neighbour_row < rows) and (0 <= neighbour_column < columns)):
+                    exits[entrance_name] = (neighbour_row, neighbour_column)
+
+        return(exits)
+
+    # - room_in_memory()
+    # Returns the room at a row and column if it is in memory, None if it isn't, without creating it
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def room_in_memory(self, row, column):
+
+        return(self.room_at(row, column))
+
+    # - csr()
+    # Returns the connectivity of the map as compressed sparse rows, (offsets, neighbours, extra rooms)
+    # The room with id i leads to the ids neighbours[offsets[i]:offsets[i + 1]]
+    # Rooms in the map have the id row * columns + column, rooms outside it that are linked to (e.g. the crypt) are numbered after them in the extra rooms list
+    #
+    # self
+    def csr(self):
+
+        rows = self.rows()
+        columns = self.columns()
+        size = rows * columns
+
+        offsets = array("l", [0])
+        neighbours = array("l")
+        extra = [] # Rooms outside the map in id order
+        extra_ids = {} # Room -> id of rooms outside the map
+
+        room_id = 0
+        while(room_id < size + len(extra)):
+
+            # Rooms outside the map only lead anywhere through links
+            if(room_id < size):
+                exits = self.exits_at(*divmod(room_id, columns))
+            else:
+                room = extra[room_id - size]
+                exits = {entrance_name: room.entrances()[entrance_name] for entrance_name in room.exits()}
+
+            start = len(neighbours)
+            for entrance_name in ENTRANCE_BITS:
+                destination = exits.get(entrance_name)
+
+                if(destination == None):
+                    continue
+                elif(type(destination) == tuple):
+                    neighbour = destination[0] * columns + destination[1]
+                elif(destination.map_key() != None):
+                    neighbour = destination.map_key()[0] * columns + destination.map_key()[1]
+                else:
+                    neighbour = extra_ids.get(destination)
+                    if(neighbour == None):
+                        neighbour = size + len(extra)
+                        extra_ids[destination] = neighbour
+                        extra.append(destination)
+
+                # Each neighbour once
+                if(neighbour not in neighbours[start:]):
+                    neighbours.append(neighbour)
+
+            offsets.append(len(neighbours))
+            room_id += 1
+
+        return(offsets, neighbours, extra)
+
+    # - add_listener()
+    # Adds a function to call with (room, entrance name) when an entrance of a room in the map changes, e.g. graph.Graph
+    #
+    # self
+    # listener (function) - The function
+    def add_listener(self, listener):
+
+        self._listeners.append(listener)
+
+    # - remove_listener()
+    # Stops calling a function when an entrance changes, see add_listener()
+    #
+    # self
+    # listener (function) - The function
+    def remove_listener(self, listener):
+
+        if(listener in self._listeners):
+            self._listeners.remove(listener)
+
+    # - entrance_changed()
+    # Called by a room in the map when one of its entrances is changed, tells the listeners
+    #
+    # self
+    # room (Room) - The room that changed
+    # entrance_name (str) - The name of the entrance that changed
+    def entrance_changed(self, room, entrance_name):
+
+        # Keep the free entrance index up to date
+        if(self._free != None):
+            slot = (room.map_key()[0] * self.columns() + room.map_key()[1], entrance_name)
+            if(room.entrances()[entrance_name]):
+                self.remove_free(slot)
+            elif(slot not in self._free_positions):
+                self._free_positions[slot] = len(self._free)
+                self._free.append(slot)
+
+        for listener in self._listeners:
+            listener(room, entrance_name)
+
+    # - free_entrances()
+    # Returns the number of free entrances, entrances of rooms in the map that lead nowhere
+    #
+    # self
+    def free_entrances(self):
+
+        return(len(self.free_index()))
+
+    # - free_index()
+    # Returns the list of (room index, entrance name) of every free entrance, building it the first time
+    # Worked out with entrances_at(), so lazy maps don't create any rooms
+    # The first call looks at every room, O(rooms), later calls and updates are O(1)
+    #
+    # self
+    def free_index(self):
+
+        if(self._free == None):
+            self._free = []
+            for row in range(self.rows()):
+                for column in range(self.columns()):
+                    for entrance_name, entrance_value in self.entrances_at(row, column).items():
+                        if(not entrance_value):
+                            self._free_positions[(row * self.columns() + column, entrance_name)] = len(self._free)
+                            self._free.append((row * self.columns() + column, entrance_name))
+
+        return(self._free)
+
+    # - remove_free()
+    # Removes an entrance from the free entrance index, by moving the last entrance into its place
+    #
+    # self
+    # slot ((room index, entrance name)) - The entrance
+    def remove_free(self, slot):
+
+        position = self._free_positions.pop(slot, None)
+
+        if(position != None):
+            last = self._free.pop()
+            if(last != slot):
+                self._free[position] = last
+                self._free_positions[last] = position
+
+    # - random_free_entrance()
+    # Returns (room, entrance name) of a free entrance picked uniformly at random, None if every entrance is used
+    # The first call builds the free entrance index, which is O(rooms), see free_index()
+    #
+    # self
+    # rng (random.Random) - Random numbers, defaults to the random module
+    def random_free_entrance(self, rng = random):
+
+        free = self.free_index()
+
+        if(free == []):
+            return(None)
+
+        index, entrance_name = free[rng.randrange(len(free))]
+
+        return((self.room_at(index // self.columns(), index % self.columns()), entrance_name))
+
+    # - pin()
+    # Keeps a room in memory until it is unpinned, see LazyMap.pin()
+    # Every room is kept in memory, so there is nothing to do
+    #
+    # self
+    # room (Room) - The room to pin
+    def pin(self, room):
+
+        pass
+
+    # - unpin()
+    # Lets a pinned room be evicted again, see LazyMap.unpin()
+    #
+    # self
+    # room (Room) - The room to unpin
+    def unpin(self, room):
+
+        pass
+
+    # - add_enemy_source()
+    # Adds an object that keeps track of enemies by room index, see LazyMap.add_enemy_source()
+    # Every room is kept in memory, so rooms already hold all of their enemies
+    #
+    # self
+    # source (object) - The enemy source
+    def add_enemy_source(self, source):
+
+        pass
+
+    # - move()
+    # Returns the (room, position) a player ends up in after moving from a position in a room
+    #
+    # self
+    # room (Room) - The room the player is in
+    # position ([row, column]) - The position of the player in the room
+    # row (int) - The amount to move the player in x
+    # column (int) - The amount to move the player in y, as characters.Player.move()
+    def move(self, room, position, row, column):
+
+        # Look up single steps in the room's table, work anything else out
+        if((row, column) in Map.MOVES):
+            cells, table = self.transitions(room)
+            entry = table[(position[0] * room.columns() + position[1]) * len(Map.MOVES) + Map.MOVES[(row, column)]]
+        else:
+            entry = Map.transition(room.cells(), room.rows(), room.columns(), position[0], position[1], row, column)
+
+        # Wall, do not move
+        if(entry == None):
+            return(room, position)
+
+        target, where = entry
+
+        # Moving within the room
+        if(target == None):
+            return(room, [where[0], where[1]])
+
+        # Moving through an entrance into the neighbouring or linked room
+        target = room.neighbour(target)
+
+        # Make sure the new room and entrance really exist first
+        new_position = target.find_entrance(where)
+        if(new_position != False):
+            return(target, new_position)
+
+        return(room, position)
+
+    # - transitions()
+    # Returns (cells, table) where table holds the transition() of every cell and move in the room
+    # The table is compiled once per set of cells, a room only gets new cells when Room.add_entrance() changes them
+    #
+    # self
+    # room (Room) - The room to get the transition table of
+    def transitions(self, room):
+
+        cells = room.cells()
+        compiled = self._transitions.get(id(cells))
+
+        # Compile if no table has been compiled for these cells
+        if((compiled == None) or (compiled[0] is not cells)):
+            table = []
+            # For every cell in every row
+            for row_num in range(room.rows()):
+                for column_num in range(room.columns()):
+                    # For every move
+                    for row, column in Map.MOVES:
+                        table.append(Map.transition(cells, room.rows(), room.columns(), row_num, column_num, row, column))
+
+            compiled = (cells, table)
+            self._transitions[id(cells)] = compiled
+
+        return(compiled)
+
+    # - transition()
+    # Works out what moving from a cell of a room does
+    # Returns None if the move is blocked, (None, (row, column)) to move within the room,
+    # (entrance, "m") to jump to a linked room, or (entrance, arrival entrance) e.g. ("n", "s") to go to the neighbouring room
+    #
+    # cells (bytes) - The cells of the room, see Room.cells()
+    # rows, columns (int) - The size of the room
+    # row_num, column_num (int) - The cell moved from
+    # row, column (int) - The move, as characters.Player.move()
+    @staticmethod
+    def transition(cells, rows, columns, row_num, column_num, row, column):
+
+        # Calculate the new row and column
+        new_row = row_num + row
+        new_column = column_num - column
+
+        # Tried to access an area outside of the room, check no move in case this is a door
+        if((new_row < 0) or (new_column < 0) or (new_row >= rows) or (new_column >= columns)):
+            new_row = row_num
+            new_column = column_num
+
+        cell = cells[new_row * columns + new_column]
+
+        if((cell == CELL_OPEN) or (cell == CELL_MIDDLE)):
+            # Not wall, thus move
+            return(None, (new_row, new_column))
+        elif(cell in LINK_NAMES):
+            # The entrance is linked to a room, we are jumping rooms
+            return(LINK_NAMES[cell], "m")
+        elif(cell in DOOR_NAMES):
+            # Cell is an entrance, we need to move rooms
+            return(DOOR_NAMES[cell], Map.OPPOSITES[DOOR_NAMES[cell]])
+
+        # Else it's a wall, do not move
+        return(None)
+
+# - LazyMap
+# Child of Map, rooms are stored as entrance masks and only become Room objects when they are first accessed
+# With a cache size, the least recently accessed rooms are spilled to disk and restored when accessed again
+class LazyMap(Map):
+
+    # Fewest rooms that can be cached, the player's current and previous rooms are pinned in memory, see pin()
+    MIN_CACHE_SIZE = 4
+
+    # - __init__()
+    # Initialise a lazy map object
+    #
+    # self
+    # masks (bytearray) - Entrance mask of every room, see ENTRANCE_BITS, the room at [row, column] is at row * columns + column, kept up to date as entrances change
+    # rows (int) - Number of rows of rooms
+    # columns (int) - Number of columns of rooms
+    # start_room ([row, column]) - The position of the room in which the player starts in the map
+    # boss_room ([row, column]/Room) - The position of the final room, or a room outside of the map
+    # names (function) - Returns the name of the room at an index, defaults to "Room row-column"
+    # cache_size (int) - Most rooms to keep in memory, None to keep every room that has been accessed
+    # store (str) - Path of the database evicted rooms are spilled to, defaults to a temporary file
+    # room_size ((rows, columns)) - Number of cells in each room, defaults to Room.ROWS x Room.COLUMNS
+    # enemies (characters.EnemyPool) - Pool of enemies placed by room index, added to each room by index as it is created, see Room.add_pooled_enemies()
+    def __init__(self, masks, rows, columns, start_room, boss_room, names = None, cache_size = None, store = None, room_size = None, enemies = None):
+
+        # Check the cache can hold the rooms the game needs
+        if((cache_size != None) and (cache_size < LazyMap.MIN_CACHE_SIZE)):
+            raise ValueError(f"cache_size must be at least {LazyMap.MIN_CACHE_SIZE}")
+
+        self._masks = masks
+        self._rows = rows
+        self._columns = columns
+        self._names = names
+        self._room_size = room_size or (Room.ROWS, Room.COLUMNS)
+        self._pool = enemies # Pool of enemies added to rooms by index
+        self._enemy_sources = [enemies] if enemies != None else [] # Objects that keep track of enemies outside of rooms
+        self._rooms = collections.OrderedDict() # Index -> Room, the rooms in memory from least to most recently accessed
+        self._start_position = start_room
+        self._boss_position = boss_room
+        self._cache_size = cache_size
+        self._store_path = store
+        self._store = None # Database of spilled rooms, opened when the first room is spilled
+        self._store_directory = None # Temporary directory holding the database, if one was made
+        self._finalizer = None # Closes and removes the store once the map is garbage collected, if close() isn't called first
+        self._spilled = set() # Indexes of the rooms in the store
+        self._pinned = set() # Indexes of rooms that are never evicted, e.g. linked rooms
+        self._held = {} # Index -> number of pins of rooms held with pin(), they aren't evicted until unpinned
+        self._external = {} # id -> [object, number of references], objects referenced by spilled rooms that are kept in memory
+        self._closed = False # Whether close() has been called, closed maps can't create or spill rooms
+
+        self.setup()
+
+    # - grid()
+    # Returns a lazy view of the map grid, rooms are created as they are indexed
+    #
+    # self
+    def grid(self):
+
+        return(LazyGrid(self))
+
+    # - rows()
+    # Returns the number of rows of rooms in the map
+    #
+    # self
+    def rows(self):
+
+        return(self._rows)
+
+    # - columns()
+    # Returns the number of columns of rooms in the map
+    #
+    # self
+    def columns(self):
+
+        return(self._columns)
+
+    # - room_at()
+    # Returns the room at a row and column of the map, creating it if it has not been accessed before
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def room_at(self, row, column):
+
+        self.check_open()
+
+        # Negative positions count from the end, like a list
+        if(row < 0):
+            row += self._rows
+        if(column < 0):
+            column += self._columns
+        if((row < 0) or (row >= self._rows) or (column < 0) or (column >= self._columns)):
+            raise IndexError("room position out of range")
+
+        index = row * self._columns + column
+        room = self._rooms.get(index)
+
+        if(room == None):
+            # Create the room on first access
+            room = self.create_room(row, column)
+            # Restore it if it has been spilled
+            if(index in self._spilled):
+                self.restore(index, room)
+            self._rooms[index] = room
+            # Make room
+            if(self._cache_size != None):
+                self.evict()
+        else:
+            # Most recently accessed
+            self._rooms.move_to_end(index)
+
+        return(room)
+
+    # - create_room()
+    # Creates the room at a row and column from its entrance mask
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def create_room(self, row, column):
+
+        index = row * self._columns + column
+        mask = self._masks[index]
+
+        # Name the room
+        if(self._names != None):
+            name = self._names(index)
+        else:
+            name = f"Room {row}-{column}"
+
+        room = Room(name,
+                    n = bool(mask & ENTRANCE_BITS["n"]),
+                    s = bool(mask & ENTRANCE_BITS["s"]),
+                    e = bool(mask & ENTRANCE_BITS["e"]),
+                    w = bool(mask & ENTRANCE_BITS["w"]),
+                    rows = self._room_size[0],
+                    columns = self._room_size[1])
+        room.set_map(self, [row, column])
+
+        # Pooled enemies are added by index, they only become objects when the room's enemies are asked for
+        if(self._pool != None):
+            indexes = self._pool.in_room(index)
+            if(indexes != []):
+                room.add_pooled_enemies(self._pool, indexes)
+
+        # Add the enemies the other sources have in the room
+        for source in self._enemy_sources:
+            if(source is not self._pool):
+                for enemy in source.enemies_in(index):
+                    room.add_enemy(enemy)
+
+        return(room)
+
+    # - add_enemy_source()
+    # Adds an object that keeps track of enemies by room index, e.g. a scheduler.Scheduler
+    # Its enemies_in(index) gives the enemies added to a room as it is created, and its owns(enemy) the enemies left out of spilled rooms
+    #
+    # self
+    # source (object) - The enemy source
+    def add_enemy_source(self, source):
+
+        self._enemy_sources.append(source)
+
+    # - rooms_created()
+    # Returns the number of rooms in memory
+    #
+    # self
+    def rooms_created(self):
+
+        return(len(self._rooms))
+
+    # - cache_order()
+    # Returns a new list of the [row, column] of the rooms in memory, from least to most recently accessed
+    #
+    # self
+    def cache_order(self):
+
+        return([[index // self._columns, index % self._columns] for index in self._rooms])
+
+    # - held()
+    # Returns a new list of the [row, column] of the rooms held in memory with pin()
+    #
+    # self
+    def held(self):
+
+        return([[index // self._columns, index % self._columns] for index in self._held])
+
+    # - spilled()
+    # Returns the number of rooms in the store
+    #
+    # self
+    def spilled(self):
+
+        return(len(self._spilled))
+
+    # - spilled_size()
+    # Returns the number of bytes the room at a row and column takes in the store, None if it isn't spilled
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def spilled_size(self, row, column):
+
+        index = row * self._columns + column
+
+        if(index not in self._spilled):
+            return(None)
+
+        return(len(self._store[str(index)]))
+
+    # - room_in_memory()
+    # Returns the room at a row and column if it is in memory, None if it isn't
+    # Unlike room_at() the room isn't created, restored or marked as recently accessed
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def room_in_memory(self, row, column):
+
+        return(self._rooms.get(row * self._columns + column))
+
+    # - entrances_at()
+    # Returns the entrances of the room at a row and column, worked out from its mask if it isn't in memory
+    # The masks are kept up to date as entrances change and linked rooms are never evicted, so no room is created
+    #
+    # self
+    # row (int) - The row of the room
+    # column (int) - The column of the room
+    def entrances_at(self, row, column):
+
+        index = row * self._columns + column
+        room = self._rooms.get(index)
+
+        if(room != None):
+            return(room.entrances())
+
+        mask = self._masks[index]
+
+        return({entrance_name: bool(mask & bit) for entrance_name, bit in ENTRANCE_BITS.items()})
+
+    # - free_index()
+    # Returns the list of (room index, entrance name) of every free entrance, see Map.free_index()
+    # Built straight from the masks, which are kept up to date as entrances change, rooms with every entrance used are skipped
+    #
+    # self
+    def free_index(self):
+
+        if(self._free == None):
+            self._free = []
+            for index, mask in enumerate(self._masks):
+                if(mask != ALL_ENTRANCES):
+                    for entrance_name, bit in ENTRANCE_BITS.items():
+                        if(not (mask & bit)):
+                            self._free_positions[(index, entrance_name)] = len(self._free)
+                            self._free.append((index, entrance_name))
+
+        return(self._free)
+
+    # - entrance_changed()
+    # Called by a room in the map when one of its entrances is changed, its mask is updated to match
+    # Rooms linked to other rooms hold references to them, so both are pinned in memory
+    #
+    # self
+    # room (Room) - The room that changed
+    # entrance_name (str) - The name of the entrance that changed
+    def entrance_changed(self, room, entrance_name):
+
+        linked = room.entrances()[entrance_name]
+
+        # Keep the mask up to date, spilled rooms only store how they differ from it
+        index = room.map_key()[0] * self._columns + room.map_key()[1]
+        if(linked):
+            self._masks[index] |= ENTRANCE_BITS[entrance_name]
+        else:
+            self._masks[index] &= ~ENTRANCE_BITS[entrance_name]
+
+        if(type(linked) == Room):
+            for pinned in (room, linked):
+                # Only rooms in this map can be evicted
+                if(pinned.map_key() != None):
+                    self._pinned.add(pinned.map_key()[0] * self._columns + pinned.map_key()[1])
+
+        super().entrance_changed(room, entrance_name)
+
+    # - pin()
+    # Keeps a room in memory until it is unpinned, e.g. while the player is in it
+    # Pins are counted, a room pinned twice must be unpinned twice
+    #
+    # self
+    # room (Room) - The room to pin
+    def pin(self, room):
+
+        # Only rooms in this map can be evicted
+        if(room.map_key() != None):
+            index = room.map_key()[0] * self._columns + room.map_key()[1]
+            self._held[index] = self._held.get(index, 0) + 1
+
+    # - unpin()
+    # Lets a pinned room be evicted again once every pin has been removed
+    #
+    # self
+    # room (Room) - The room to unpin
+    def unpin(self, room):
+
+        if(room.map_key() != None):
+            index = room.map_key()[0] * self._columns + room.map_key()[1]
+            if(self._held.get(index, 0) > 1):
+                self._held[index] -= 1
+            else:
+                self._held.pop(index, None)
+
+        # Rooms unpinned may now be over the cache size
+        if(self._cache_size != None):
+            self.evict()
+
+    # - evict()
+    # Spills the least recently accessed rooms until the cache is no longer over its size
+    #
+    # self
+    def evict(self):
+
+        while(len(self._rooms) > self._cache_size):
+
+            # Find the least recently accessed room that isn't pinned
+            for index in self._rooms:
+                if((index not in self._pinned) and (index not in self._held)):
+                    break
+            else:
+                # Every room is pinned
+                return
+
+            self.spill(index, self._rooms.pop(index))
+
+    # - spill()
+    # Writes the state of a room to the store, rooms that are as they were created are not written
+    # Enemies from an enemy source are not written, the source adds them again when the room is created
+    #
+    # self
+    # index (int) - The index of the room
+    # room (Room) - The room to spill
+    def spill(self, index, room):
+
+        self.check_open()
+
+        mask = self._masks[index]
+
+        # Entrances that have been changed since the room was created
+        entrances = {name: value for name, value in room.entrances().items() if value != bool(mask & ENTRANCE_BITS[name])}
+
+        # Enemies that no source keeps track of
+        enemies = [enemy for enemy in room.created_enemies() if not any(source.owns(enemy) for source in self._enemy_sources)]
+
+        if((entrances == {}) and (len(room.inventory()) == 0) and (enemies == [])):
+            return
+
+        # Open the store
+        if(self._store == None):
+            if(self._store_path == None):
+                self._store_directory = tempfile.mkdtemp(prefix = "draculas-castle-")
+                self._store_path = os.path.join(self._store_directory, "rooms")
+            self._store = dbm.open(self._store_path, "n")
+            self._finalizer = weakref.finalize(self, LazyMap.remove_store, self._store, self._store_directory)
+
+        data = io.BytesIO()
+        pickler = pickle.Pickler(data)
+        pickler.persistent_id = self.persistent_id
+        pickler.dump({
+                "entrances": entrances,
+                "items": room.inventory().stacks(),
+                "enemies": enemies
+            })
+
+        self._store[str(index)] = data.getvalue()
+        self._spilled.add(index)
+
+    # - restore()
+    # Restores the state of a spilled room to a newly created room
+    #
+    # self
+    # index (int) - The index of the room
+    # room (Room) - The newly created room
+    def restore(self, index, room):
+
+        unpickler = pickle.Unpickler(io.BytesIO(self._store[str(index)]))
+        unpickler.persistent_load = self.persistent_load
+        state = unpickler.load()
+
+        del self._store[str(index)]
+        self._spilled.discard(index)
+
+        for entrance_name, entrance_value in state["entrances"].items():
+            room.add_entrance(entrance_name, entrance_value)
+        with room.inventory().batch():
+            for item, count in state["items"]:
+                room.inventory().add_item(item, count)
+        for enemy in state["enemies"]:
+            room.add_enemy(enemy)
+
+    # - persistent_id()
+    # Returns how a spilled room refers to an object that must not be copied, None to copy it
+    # Rooms are referred to by index, keys (which call back into the game) and widgets stay in memory
+    #
+    # self
+    # obj (object) - The object being spilled
+    def persistent_id(self, obj):
+
+        if(type(obj) == Room):
+            if(obj.map_key() != None):
+                return(("room", obj.map_key()[0], obj.map_key()[1]))
+        elif(not isinstance(obj, (items.Key, tk.Misc))):
+            return(None)
+
+        # Keep the object in memory, counting the references to it
+        self._external.setdefault(id(obj), [obj, 0])[1] += 1
+        return(("object", id(obj)))
+
+    # - kept_objects()
+    # Returns the number of objects kept in memory for spilled rooms, see persistent_id()
+    #
+    # self
+    def kept_objects(self):
+
+        return(len(self._external))
+
+    # - persistent_load()
+    # Returns the object a spilled room referred to, see persistent_id()
+    #
+    # self
+    # persistent_id (tuple) - The reference
+    def persistent_load(self, persistent_id):
+
+        if(persistent_id[0] == "room"):
+            return(self.room_at(persistent_id[1], persistent_id[2]))
+
+        # Let the object go once no spilled room refers to it
+        external = self._external[persistent_id[1]]
+        external[1] -= 1
+        if(external[1] == 0):
+            del self._external[persistent_id[1]]
+
+        return(external[0])
+
+    # - close()
+    # Closes the store, removing it if it was a temporary file, spilled rooms are lost
+    # The map can't be used to create rooms once it is closed, room_at() raises ValueError
+    # Maps that aren't closed have their store closed when they are garbage collected or the program exits
+    #
+    # self
+    def close(self):
+
+        if(self._finalizer != None):
+            self._finalizer()
+            self._finalizer = None
+
+        self._store = None
+        self._store_directory = None
+        self._spilled.clear()
+        self._external.clear()
+        self._closed = True
+
+    # - closed()
+    # Returns whether the map has been closed
+    #
+    # self
+    def closed(self):
+
+        return(self._closed)
+
+    # - check_open()
+    # Raises ValueError if the map has been closed, like using a closed file
+    #
+    # self
+    def check_open(self):
+
+        if(self._closed):
+            raise ValueError("map is closed")
+
+    # - remove_store()
+    # Closes a store, removing the temporary directory holding it if there is one
+    # Doesn't refer to a map so it can run once the map has been garbage collected
+    #
+    # store (dbm) - The store
+    # directory (str) - The temporary directory, None if the store wasn't a temporary file
+    @staticmethod
+    def remove_store(store, directory):
+
+        store.close()
+
+        if(directory != None):
+            shutil.rmtree(directory, ignore_errors = True)
+
+    # - start_room()
+    # Returns the room that the player starts in
+    #
+    # self
+    def start_room(self):
+
+        return(self.room_at(*self._start_position))
+
+    # - boss_room()
+    # Returns the room the player ends in
+    #
+    # self
+    def boss_room(self):
+
+        # The boss room may be outside the map
+        if(type(self._boss_position) == Room):
+            return(self._boss_position)
+
+        return(self.room_at(*self._boss_position))
+
+# - LazyGrid
+# A read only view of the grid of a LazyMap, indexing it returns a LazyRow
+class LazyGrid:
+
+    # - __init__()
+    #
+    # self
+    # game_map (LazyMap) - The map to view
+    def __init__(self, game_map):
+
+        self._map = game_map
+
+    def __len__(self):
+
+        return(self._map.rows())
+
+    def __getitem__(self, row):
+
+        # Stop iteration at the end of the grid
+        if((row >= self._map.rows()) or (row < -self._map.rows())):
+            raise IndexError("row out of range")
+
+        return(LazyRow(self._map, row))
+
+# - LazyRow
+# A read only view of a row of a LazyMap, indexing it returns the room
+class LazyRow:
+
+    # - __init__()
+    #
+    # self
+    # game_map (LazyMap) - The map to view
+    # row (int) - The row to view
+    def __init__(self, game_map, row):
+
+        self._map = game_map
+        self._row = row
+
+    def __len__(self):
+
+        return(self._map.columns())
+
+    def __getitem__(self, column):
+
+        return(self._map.room_at(self._row, column))
+
 # - Room
 # Holds attributes of a room, e.g. entrances, inventory
 # Version: 0.1
@@ -88,6 +1059,15 @@ class Room:
     # Constants
     HEIGHT = 400
     WIDTH = 400
+    ROWS = 7 # Default number of rows of cells
+    COLUMNS = 7 # Default number of columns of cells
+    MIN_SIZE = 5 # Fewest rows/columns of cells, enough for the entrances, walls and middle
+
+    # States of an entrance, see layout()
+    DOOR = 1
+    LINK = 2
+
+    _templates = {} # (rows, columns, obstacles, entrance states) -> shared (cells, entrance index), see template()
 
     # - __init__()
     # Initialise a room object
@@ -95,7 +1075,9 @@ class Room:
     # self
     # name (str) - Name of the room
     # n, s, e, w (bool/Room) - Stores
-    def __init__(self, name, n = False, s = False, e = False, w = False):
+    # rows, columns (int) - Number of cells in the room
+    # obstacles (list of (row, column)) - Cells inside the walls of the room that are walls too
+    def __init__(self, name, n = False, s = False, e = False, w = False, rows = ROWS, columns = COLUMNS, obstacles = ()):
 
         # Set Room attributes
         self._name = name # Name of the room
@@ -106,16 +1088,28 @@ class Room:
                 "e": e,
                 "w": w
             }
-        self._gui = None # Stores GUI object associated with room
+        self._gui = None # Stores RoomView object associated with room
         self._map = None # Map object associated with the room, set when Map object is initialised
         self._map_key = None # Where in the grid representation of the map the room is found, set by Map object
         self._inventory = items.Inventory(use_name = "PICK UP") # Room inventory
-        self._player = None # The player's canvas object
         self._enemies = [] # Enemies in the room
-        self._grid = [] # Grid represenation of this specific room with entrances added
+        self._pooled = None # (pool, indexes) of pooled enemies in the room that aren't objects yet, see add_pooled_enemies()
+        self._rows = rows # Rows of cells
+        self._columns = columns # Columns of cells
+        self._obstacles = tuple(sorted(set((row, column) for row, column in obstacles))) # Interior walls
+        self._cells = b"" # Cell codes of the room with entrances added, shared by rooms with the same layout
+        self._entrance_index = {} # Entrance name -> (row, column) of the entrance in the cells
 
         self.check_entrances()
 
+    # - name()
+    # Returns the name of the room
+    #
+    # self
+    def name(self):
+
+        return(self._name)
+
     # - check_entrances()
     # Checks if entrances are linked to specific rooms
     #
@@ -125,30 +1119,112 @@ class Room:
         # Refresh grid
         self.grid_refresh()
 
-        for entrance_name, entrance_value in self._entrances.items():
-            # If a room object is stored in the entrance_var
-            if(type(entrance_value) == Room):
-                # Find the entrance key
-                map_key = self.find_entrance(entrance_name)
-                # Insert the object into the map
-                self._grid[map_key[0]][map_key[1]] = entrance_value
-
     # - grid_refresh()
     # Refresh the grid
     #
     # self
     def grid_refresh(self):
 
-        # Compute grid
-        self._grid = [
-                [0, 0, self._entrances["n"], "n", self._entrances["n"], 0, 0],
-                [0, 1, 1, not self._entrances["n"], 1, 1, 0],
-                [self._entrances["w"], 1, 0, 0, 0, 1, self._entrances["e"]],
-                ["w", not self._entrances["w"], 0, "m", 0, not self._entrances["e"], "e"],
-                [self._entrances["w"], 1, 0, 0, 0, 1, self._entrances["e"]],
-                [0, 1, 1, not self._entrances["s"], 1, 1, 0,],
-                [0, 0, self._entrances["s"], "s", self._entrances["s"], 0, 0]
-            ] # Grid represenation of this specific room with entrances added
+        # State of each entrance, linked to a room, a door or nothing
+        states = []
+        for entrance_value in self._entrances.values():
+            if(type(entrance_value) == Room):
+                states.append(Room.LINK)
+            elif(entrance_value):
+                states.append(Room.DOOR)
+            else:
+                states.append(0)
+
+        # Rooms with the same layout share the same cells and entrance index
+        self._cells, self._entrance_index = Room.template(self._rows, self._columns, self._obstacles, *states)
+
+    # - template()
+    # Returns the shared (cells, entrance index) of rooms with a layout, built the first time it is asked for
+    # Neither should be modified
+    #
+    # rows, columns (int) - Number of cells in the room
+    # obstacles (tuple) - Sorted (row, column) of interior walls
+    # n, s, e, w (int) - The state of each entrance, see layout()
+    @staticmethod
+    def template(rows, columns, obstacles, n, s, e, w):
+
+        signature = (rows, columns, obstacles, n, s, e, w)
+        template = Room._templates.get(signature)
+
+        if(template == None):
+            # Compute cells, immutable as they are shared
+            cells = bytes(Room.layout(rows, columns, obstacles, n, s, e, w))
+
+            # Index the position of every entrance that isn't linked to a room
+            entrance_index = {}
+            for index, cell in enumerate(cells):
+                if(cell in DOOR_NAMES):
+                    entrance_index[DOOR_NAMES[cell]] = (index // columns, index % columns)
+                elif(cell == CELL_MIDDLE):
+                    entrance_index["m"] = (index // columns, index % columns)
+
+            template = (cells, entrance_index)
+            Room._templates[signature] = template
+
+        return(template)
+
+    # - layout()
+    # Returns the cell codes of a room, row by row, as a bytearray
+    # Each entrance sits in the middle of its side behind a gap in a ring of walls, the middle of the room is "m"
+    # Raises ValueError if the room is too small or an obstacle is not inside the ring of walls
+    #
+    # rows, columns (int) - Number of cells in the room
+    # obstacles (tuple) - (row, column) of interior walls
+    # n, s, e, w (int) - The state of each entrance, 0 for none, Room.DOOR or Room.LINK
+    @staticmethod
+    def layout(rows, columns, obstacles, n, s, e, w):
+
+        if((rows < Room.MIN_SIZE) or (columns < Room.MIN_SIZE)):
+            raise ValueError(f"rooms must be at least {Room.MIN_SIZE}x{Room.MIN_SIZE} cells")
+
+        cells = bytearray(rows * columns)
+        middle_row = rows // 2
+        middle_column = columns // 2
+
+        # Ring of walls one cell in from the edge
+        for column in range(1, columns - 1):
+            cells[columns + column] = CELL_WALL
+            cells[(rows - 2) * columns + column] = CELL_WALL
+        for row in range(1, rows - 1):
+            cells[row * columns + 1] = CELL_WALL
+            cells[row * columns + columns - 2] = CELL_WALL
+
+        # (name, state, entrance cell, gap in the ring, step to the cells either side of the entrance)
+        sides = (
+                ("n", n, middle_column, columns + middle_column, 1),
+                ("s", s, (rows - 1) * columns + middle_column, (rows - 2) * columns + middle_column, 1),
+                ("e", e, middle_row * columns + columns - 1, middle_row * columns + columns - 2, columns),
+                ("w", w, middle_row * columns, middle_row * columns + 1, columns)
+            )
+
+        for name, state, cell, gap, step in sides:
+            if(state == Room.LINK):
+                # The entrance and the cells either side jump to the linked room
+                cells[cell - step] = cells[cell] = cells[cell + step] = CELL_LINKS[name]
+                cells[gap] = CELL_OPEN
+            elif(state == Room.DOOR):
+                # Walls either side of the entrance
+                cells[cell] = CELL_DOORS[name]
+                cells[cell - step] = cells[cell + step] = CELL_WALL
+                cells[gap] = CELL_OPEN
+            else:
+                # Closed off by the ring, still where players arrive through it
+                cells[cell] = CELL_DOORS[name]
+
+        # Obstacles must be inside the ring and leave the middle clear
+        for row, column in obstacles:
+            if((row < 2) or (row > rows - 3) or (column < 2) or (column > columns - 3) or ((row, column) == (middle_row, middle_column))):
+                raise ValueError(f"obstacle {(row, column)} is not inside the room")
+            cells[row * columns + column] = CELL_WALL
+
+        cells[middle_row * columns + middle_column] = CELL_MIDDLE
+
+        return(cells)
 
     # - add_entrance()
     # Changes an entrance value
@@ -163,6 +1239,10 @@ class Room:
         # Check all entrances
         self.check_entrances()
 
+        # Tell the map
+        if(self._map != None):
+            self._map.entrance_changed(self, entrance_name)
+
     # - entrances()
     # Returns dict of entrances
     #
@@ -171,13 +1251,47 @@ class Room:
 
         return(self._entrances)
 
+    # - cells()
+    # Returns the cell codes of the room, the cell at [row, column] is at row * columns() + column
+    # See the CELL_ constants, the bytes may be shared with other rooms
+    #
+    # self
+    def cells(self):
+
+        return(self._cells)
+
+    # - rows()
+    # Returns the number of rows of cells in the room
+    #
+    # self
+    def rows(self):
+
+        return(self._rows)
+
+    # - columns()
+    # Returns the number of columns of cells in the room
+    #
+    # self
+    def columns(self):
+
+        return(self._columns)
+
     # - grid()
-    # Returns the room's grid
+    # Returns the room's grid, a tuple of row tuples holding 0 (open), 1 (wall), entrance names, "m" and linked rooms
+    # Worked out from cells() when asked for
     #
     # self
     def grid(self):
 
-        return(self._grid)
+        # Value of each cell code
+        values = {CELL_OPEN: 0, CELL_WALL: 1, CELL_MIDDLE: "m"}
+        values.update(DOOR_NAMES)
+        values.update({code: self._entrances[name] for code, name in LINK_NAMES.items()})
+
+        return(tuple(
+                tuple(values[cell] for cell in self._cells[row * self._columns:(row + 1) * self._columns])
+                for row in range(self._rows)
+            ))
 
     # - inventory()
     # Returns the room's inventory object
@@ -189,12 +1303,43 @@ class Room:
 
     # - enemies()
     # Returns list of enemies in the room
+    # Pooled enemies become characters.PooledEnemy views the first time this is called, e.g. when the player enters
     # 
     # self
     def enemies(self):
 
+        if(self._pooled != None):
+            pool, indexes = self._pooled
+            self._pooled = None
+            self._enemies.extend(pool.enemy(index) for index in indexes if pool.is_alive(index))
+
+        return(self._enemies)
+
+    # - created_enemies()
+    # Returns the list of enemies in the room that are objects, pooled enemies that enemies() hasn't been called for are left out
+    #
+    # self
+    def created_enemies(self):
+
         return(self._enemies)
 
+    # - add_pooled_enemies()
+    # Adds enemies from a characters.EnemyPool by index, they only become objects when enemies() is called
+    #
+    # self
+    # pool (characters.EnemyPool) - The pool
+    # indexes (list) - The indexes of the enemies in the pool
+    def add_pooled_enemies(self, pool, indexes):
+
+        # Turn any earlier enemies from another pool into objects first
+        if((self._pooled != None) and (self._pooled[0] is not pool)):
+            self.enemies()
+
+        if(self._pooled == None):
+            self._pooled = (pool, list(indexes))
+        else:
+            self._pooled[1].extend(indexes)
+
     # - add_enemy()
     # Add enemy to list of enemies
     # 
@@ -215,6 +1360,14 @@ class Room:
         self._map = game_map
         self._map_key = map_key
 
+    # - map_key()
+    # Returns where in the grid representation of the map the room is found, None if it is not in a map
+    #
+    # self
+    def map_key(self):
+
+        return(self._map_key)
+
     # - find_entrance()
     # Returns the position of a selected entrance
     #
@@ -222,32 +1375,64 @@ class Room:
     # entrance (str): Name of the entrance to find
     def find_entrance(self, entrance):
 
-        # Iteration counters
-        row_num = 0
-        column_num = 0
+        # Look up the entrance in the index
+        position = self._entrance_index.get(entrance)
 
-        # For every row
-        for row in self._grid:
+        # If the entrance isn't in the index then there is no entrance return false
+        if(position == None):
+            return(False)
 
-            # Start at column zero
-            column_num = 0
-
-            # For every column in row
-            for column in row:
+        # Return a new list so the index can't be changed
+        return([position[0], position[1]])
 
-                # if column is the same as the entrance string
-                if(column == entrance):
-                    # Then return the position
-                    return([row_num, column_num])
+    # - neighbour()
+    # Returns the room through an entrance of this room
+    #
+    # self
+    # entrance (str) - The name of the entrance, e.g. "n"
+    def neighbour(self, entrance):
+
+        # Linked rooms come first
+        if(type(self._entrances.get(entrance)) == Room):
+            return(self._entrances[entrance])
+
+        if(entrance == "n"):
+            return(self.north_of())
+        elif(entrance == "s"):
+            return(self.south_of())
+        elif(entrance == "e"):
+            return(self.east_of())
+        elif(entrance == "w"):
+            return(self.west_of())
+
+    # - exits()
+    # Returns a list of the names of the entrances that lead to another room
+    #
+    # self
+    def exits(self):
 
-                # Iterate column num
-                column_num += 1
+        exits = []
 
-            # Iterate row num
-            row_num += 1
+        for entrance_name, entrance_value in self._entrances.items():
+            # Linked rooms can always be reached
+            if(type(entrance_value) == Room):
+                exits.append(entrance_name)
+            # Doors only lead somewhere inside the map
+            elif(entrance_value and (self._map != None)):
+                row = self._map_key[0] + ENTRANCE_STEPS[entrance_name][0]
+                column = self._map_key[1] + ENTRANCE_STEPS[entrance_name][1]
+                if((0 <= row < self._map.rows()) and (0 <= column < self._map.columns())):
+                    exits.append(entrance_name)
+
+        return(exits)
+
+    # - neighbours()
+    # Returns a dictionary of the rooms through each exit of this room, see exits()
+    #
+    # self
+    def neighbours(self):
 
-        # If we get to this point then there is no entrance return false
-        return(False)
+        return({entrance_name: self.neighbour(entrance_name) for entrance_name in self.exits()})
 
     # - north_of()
     # Returns the room north of this room
@@ -256,7 +1441,7 @@ class Room:
     def north_of(self):
 
         # Row up, same column
-        return(self._map.grid()[self._map_key[0] - 1][self._map_key[1]])
+        return(self._map.room_at(self._map_key[0] - 1, self._map_key[1]))
 
     # - south_of()
     # Returns the room sooth of this room
@@ -265,7 +1450,7 @@ class Room:
     def south_of(self):
 
         # Row down, same column
-        return(self._map.grid()[self._map_key[0] + 1][self._map_key[1]])
+        return(self._map.room_at(self._map_key[0] + 1, self._map_key[1]))
 
     # - east_of()
     # Returns the room north of this room
@@ -274,7 +1459,7 @@ class Room:
     def east_of(self):
 
         # Column right, same row
-        return(self._map.grid()[self._map_key[0]][self._map_key[1] + 1])
+        return(self._map.room_at(self._map_key[0], self._map_key[1] + 1))
 
     # - west_of()
     # Returns the room north of this room
@@ -283,7 +1468,7 @@ class Room:
     def west_of(self):
 
         # Column left, same row
-        return(self._map.grid()[self._map_key[0]][self._map_key[1] - 1])
+        return(self._map.room_at(self._map_key[0], self._map_key[1] - 1))
 
     # - middle()
     # Returns the coordinates of the centre of the room
@@ -291,95 +1476,259 @@ class Room:
     # self
     def middle(self):
 
-        return([round(len(self._grid[0]) / 2), round(len(self._grid) / 2)])
+        return([round(self._columns / 2), round(self._rows / 2)])
 
     # - gui()
-    # Creates the gui object
+    # Creates the gui object, a RoomView showing this room
     #
     # self
     # parent (tkinter)
-    # height (int)
-    # width (int)
     def gui(self, parent):
 
-        height = Room.HEIGHT
-        width = Room.WIDTH
+        self._gui = RoomView(parent)
+        self._gui.show(self)
+
+    # - draw_player()
+    # Draw's the player onto the map
+    #
+    # self
+    # player (characters.Player): The player object to draw
+    def draw_player(self, player):
+
+        self._gui.draw_player(player)
+
+# - RoomView
+# A canvas that rooms are drawn on, reused from room to room
+# Wall rectangles are kept and moved rather than recreated
+class RoomView:
+
+    # Wall rectangles of every set of cells drawn, id(cells) -> (cells, height, width, rectangles)
+    _walls = {}
+
+    # Animation timings (ms)
+    FRAME_TIME = 16 # Time between animation frames
+    MOVE_TIME = 80 # Time the player takes to move one cell
+
+    # - __init__()
+    # Initialise a room view
+    #
+    # self
+    # parent (tkinter) - The parent tkinter object
+    # height (int) - Height of the canvas
+    # width (int) - Width of the canvas
+    # animate (bool) - Whether the player slides between cells instead of jumping
+    def __init__(self, parent, height = Room.HEIGHT, width = Room.WIDTH, animate = False):
+
+        self._height = height
+        self._width = width
+        self._animate = animate
 
         # Initialise the canvas object
         self._gui = tk.Canvas(parent, height = height, width = width, bg = "grey")
         self._gui.pack(fill = tk.BOTH)
 
-        rows = len(self._grid) # Rows in grid
-        grid_height = height/rows # Calculate the height of each grid piece
+        self._room = None # Room being shown
+        self._cells = None # Cells the walls are drawn for
+        self._rows = 0 # Rows of cells shown
+        self._columns = 0 # Columns of cells shown
+        self._wall_items = [] # Canvas rectangles used for walls, some may be hidden
+        self._rectangles = [] # Coordinates of each wall rectangle shown
+        self._player = None # The player's canvas object
+        self._player_coords = None # Where the player's rectangle is drawn
+        self._player_target = None # Where the player's rectangle is moving to
+        self._player_room = None # Room the player was last drawn in
+        self._animation = None # Scheduled animation frame
+        self._animation_start = None # Where the player's rectangle was when the animation started
+        self._animation_progress = 0 # Fraction of the move animated
+
+        # Room name text
+        self._name = self._gui.create_text(width/2, height/2, text = "", fill = "white")
+
+    # - canvas()
+    # Returns the canvas object
+    #
+    # self
+    def canvas(self):
 
-        # Iteration counters
-        row_num = 0
-        column_num = 0
+        return(self._gui)
 
-        # For every row
-        for row in self._grid:
+    # - show()
+    # Shows a room on the canvas, only changing what differs from the room shown before
+    #
+    # self
+    # room (Room) - The room to show
+    def show(self, room):
 
-            # Start at zeroeth column
-            column_num = 0
-            columns = len(row) # Get columns in row
-            grid_width = width/columns # Calculate the width of each grid piece
+        cells = room.cells()
 
-            # For every column in this row
-            for column in row:
+        # Only redraw walls if the cells have changed
+        if(cells is not self._cells):
 
-                # If the column is non-zero and non-string
-                if((column != 0) and (type(column) != str) and (type(column) != Room)):
+            rectangles = self.walls(cells, room.rows(), room.columns())
 
-                    # Calculate coordinates
-                    x0 = column_num * grid_width
-                    y0 = row_num * grid_height
-                    x1 = x0 + grid_width
-                    y1 = y0 + grid_height
+            # Create any extra rectangles that are needed
+            while(len(self._wall_items) < len(rectangles)):
+                self._wall_items.append(self._gui.create_rectangle(0, 0, 0, 0, fill = "black", outline = "", state = tk.HIDDEN))
 
-                    # Generate rectangle
-                    self._gui.create_rectangle(x0, y0, x1, y1, fill = "black", outline = "")
+            # Move the rectangles that have changed
+            for i in range(len(rectangles)):
+                if(i >= len(self._rectangles)):
+                    self._gui.coords(self._wall_items[i], *rectangles[i])
+                    self._gui.itemconfigure(self._wall_items[i], state = tk.NORMAL)
+                elif(rectangles[i] != self._rectangles[i]):
+                    self._gui.coords(self._wall_items[i], *rectangles[i])
 
-                # Iterate column
-                column_num += 1
+            # Hide rectangles no longer needed
+            for i in range(len(rectangles), len(self._rectangles)):
+                self._gui.itemconfigure(self._wall_items[i], state = tk.HIDDEN)
 
-            # Iterate row
-            row_num += 1
+            self._cells = cells
+            self._rows = room.rows()
+            self._columns = room.columns()
+            self._rectangles = rectangles
+
+            # Keep the room name on top
+            self._gui.tag_raise(self._name)
+
+        # Update the room name
+        if((self._room == None) or (self._room.name() != room.name())):
+            self._gui.itemconfigure(self._name, text = room.name())
+
+        self._room = room
+
+    # - walls()
+    # Returns a list of (x0, y0, x1, y1) wall rectangles for the cells of a room, cached per set of cells
+    # Neighbouring wall cells are merged, runs of walls in a row and then identical runs in the rows below
+    #
+    # self
+    # cells (bytes) - The cells of the room, see Room.cells()
+    # rows, columns (int) - The size of the room
+    def walls(self, cells, rows, columns):
+
+        cached = RoomView._walls.get(id(cells))
+
+        # Work out the rectangles if they haven't been for these cells and canvas size
+        if((cached == None) or (cached[0] is not cells) or (cached[1:3] != (self._height, self._width))):
 
-        # Add room name to canvas
-        self._gui.create_text(width/2, height/2, text = self._name, fill = "white")
+            rectangles = []
+
+            grid_height = self._height/rows # Calculate the height of each grid piece
+            grid_width = self._width/columns # Calculate the width of each grid piece
+
+            # (first column, last column + 1) -> first row of runs of walls still being merged down
+            open_runs = {}
+
+            # For every row, and one past the end to close every run
+            for row_num in range(rows + 1):
+
+                runs = {}
+
+                if(row_num < rows):
+                    row = cells[row_num * columns:(row_num + 1) * columns]
+                    start = None
+
+                    # For every column in this row, and one past the end to close the last run
+                    for column_num in range(columns + 1):
+
+                        wall = (column_num < columns) and (row[column_num] == CELL_WALL)
+
+                        if(wall and (start == None)):
+                            # Run starts
+                            start = column_num
+                        elif((not wall) and (start != None)):
+                            # Run ends, carry on the same run from the row above
+                            run = (start, column_num)
+                            runs[run] = open_runs.pop(run, row_num)
+                            start = None
+
+                # Runs not carried on are finished
+                for (start, end), first_row in open_runs.items():
+                    rectangles.append((start * grid_width, first_row * grid_height, end * grid_width, row_num * grid_height))
+
+                open_runs = runs
+
+            cached = (cells, self._height, self._width, rectangles)
+            RoomView._walls[id(cells)] = cached
+
+        return(cached[3])
 
     # - draw_player()
-    # Draw's the player onto the map
+    # Draw's the player onto the map, moving the player's rectangle rather than recreating it
     #
     # self
     # player (characters.Player): The player object to draw
     def draw_player(self, player):
 
-        rows = len(self._grid) # Rows in grid
-        grid_height = Room.HEIGHT/rows # Calculate the height of each grid piece
-        columns = len(self._grid[0]) # Get columns in first row
-        grid_width = Room.WIDTH/columns # Calculate the width of each grid piece
-
-        # Check if player has already been draw
-        if(self._player != None):
-            # If so, remove it
-            self._gui.delete(self._player)
-            self._player = None
+        grid_height = self._height/self._rows # Calculate the height of each grid piece
+        grid_width = self._width/self._columns # Calculate the width of each grid piece
 
         # Get player position
         position = player.position()
-        
+
         # Calculate coordinates
         x0 = position[1] * grid_width
         y0 = position[0] * grid_height
-        x1 = x0 + grid_width
-        y1 = y0 + grid_height
+        target = (x0, y0, x0 + grid_width, y0 + grid_height)
+
+        # Check if player has already been drawn
+        if(self._player == None):
+            # Generate rectangle
+            self._player = self._gui.create_rectangle(*target, fill = "maroon", outline = "")
+            # Lower player below text
+            self._gui.tag_lower(self._player)
+            self._player_coords = target
+            self._player_target = target
+            self._player_room = self._room
+            return
+
+        # Nothing to do if the player hasn't moved
+        if((target == self._player_target) and (self._player_room == self._room)):
+            return
+
+        # Jump straight there if not animating, or if the room has changed
+        if((not self._animate) or (self._player_room != self._room)):
+            self.stop_animation()
+            self._gui.coords(self._player, *target)
+            self._player_coords = target
+        else:
+            # Slide from where the player is drawn now
+            self._animation_start = self._player_coords
+            self._animation_progress = 0
+            # Start the animation loop if it isn't running
+            if(self._animation == None):
+                self._animation = self._gui.after(RoomView.FRAME_TIME, self.animate)
+
+        self._player_target = target
+        self._player_room = self._room
+
+    # - animate()
+    # Moves the player's rectangle one fixed step towards its target, repeating until it arrives
+    #
+    # self
+    def animate(self):
 
-        # Generate rectangle
-        self._player = self._gui.create_rectangle(x0, y0, x1, y1, fill = "maroon", outline = "")
-        # Lower player below text
-        self._gui.tag_lower(self._player)
+        # Fixed timestep
+        self._animation_progress = min(self._animation_progress + RoomView.FRAME_TIME / RoomView.MOVE_TIME, 1)
+
+        # Interpolate between the start and the target
+        self._player_coords = tuple(start + (end - start) * self._animation_progress for start, end in zip(self._animation_start, self._player_target))
+        self._gui.coords(self._player, *self._player_coords)
+
+        # Keep going until the player has arrived
+        if(self._animation_progress < 1):
+            self._animation = self._gui.after(RoomView.FRAME_TIME, self.animate)
+        else:
+            self._animation = None
+
+    # - stop_animation()
+    # Stops the player's rectangle moving
+    #
+    # self
+    def stop_animation(self):
 
+        if(self._animation != None):
+            self._gui.after_cancel(self._animation)
+            self._animation = None
 
 # - Main
 # Used for testing code associated with this module so this code should only run when it is main
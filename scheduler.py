@@ -0,0 +1,284 @@
+'''
+
+    scheduler.py
+
+    Moves roaming enemies around Dracula's Castle, each enemy wakes at its own time so only due enemies do any work
+
+'''
+
+# - Imports
+
+# -- Libraries
+# (Modules others have made)
+import random # Random moves
+import heapq # Queue of wake times
+import itertools # Order of events
+
+# -- Components
+# (Modules I have made)
+import characters # Pooled enemies
+
+# - Classes
+
+# - Scheduler
+# Queue of enemies ordered by the time they next act, an enemy acts by moving through a random exit of its room
+# Can be added to a rooms.LazyMap as an enemy source, so roaming enemies are kept out of spilled rooms
+class Scheduler:
+
+    # Default (shortest, longest) time between an enemy's moves
+    INTERVAL = (2, 6)
+
+    # - __init__()
+    # Initialise an empty scheduler
+    #
+    # self
+    # game_map (rooms.Map) - The map the enemies roam
+    # on_move (function) - Called with (enemy, old room, new room) after an enemy moves, rooms that aren't in memory are None
+    # busy (function) - Called with an enemy, the enemy doesn't move while it returns True, e.g. during a battle
+    # avoid (list) - Rooms enemies never move into
+    # rng (random.Random) - Random numbers, defaults to the random module
+    def __init__(self, game_map, on_move = None, busy = None, avoid = (), rng = None):
+
+        self._map = game_map
+        self._on_move = on_move
+        self._busy = busy
+        self._avoid = [self.key_of(room) for room in avoid] # Keys of the rooms to avoid, see key_of()
+        self._rng = rng if rng != None else random
+        self._time = 0 # Time of the latest event
+        self._queue = [] # Heap of (time, order, enemy), an event is stale if order isn't the enemy's latest
+        self._order = itertools.count() # Breaks ties between events at the same time
+        self._scheduled = {} # id(enemy) -> [enemy, room key, latest order, interval]
+        self._located = {} # Room index -> list of the scheduled enemies in it, pooled enemies are located by their pool
+
+        # Lazy maps get scheduled enemies from the scheduler as rooms are created
+        game_map.add_enemy_source(self)
+
+    # - __len__()
+    # Returns the number of scheduled enemies
+    #
+    # self
+    def __len__(self):
+
+        return(len(self._scheduled))
+
+    # - time()
+    # Returns the time the scheduler has run until
+    #
+    # self
+    def time(self):
+
+        return(self._time)
+
+    # - add()
+    # Starts an enemy roaming from the room it is in
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy, must be in room's enemies
+    # room (rooms.Room) - The room the enemy is in
+    # interval ((shortest, longest)) - Time between the enemy's moves, defaults to Scheduler.INTERVAL
+    def add(self, enemy, room, interval = None):
+
+        if(enemy not in room.enemies()):
+            raise ValueError(f"{enemy.name()} is not in {room.name()}")
+
+        # Start again if it is already scheduled
+        self.remove(enemy)
+
+        self._scheduled[id(enemy)] = [enemy, None, None, interval or Scheduler.INTERVAL]
+        self.locate(enemy, self.key_of(room))
+        self.schedule(enemy)
+
+    # - remove()
+    # Stops an enemy roaming, its queued event is ignored when it comes up
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy
+    def remove(self, enemy):
+
+        if(self.owns(enemy)):
+            self.unlocate(enemy)
+            del self._scheduled[id(enemy)]
+
+    # - owns()
+    # Returns whether an enemy is scheduled
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy
+    def owns(self, enemy):
+
+        entry = self._scheduled.get(id(enemy))
+
+        return((entry != None) and (entry[0] is enemy))
+
+    # - enemies_in()
+    # Returns a new list of the living scheduled enemies in a room, used by rooms.LazyMap as it creates the room
+    #
+    # self
+    # room (int) - The index of the room
+    def enemies_in(self, room):
+
+        return([enemy for enemy in self._located.get(room, []) if enemy.is_alive()])
+
+    # - key_of()
+    # Returns how the scheduler refers to a room, (row, column) for rooms in the map and the Room itself for rooms outside it
+    # Rooms in the map are referred to by position as a lazy map may spill them and create them again
+    #
+    # self
+    # room (rooms.Room) - The room
+    def key_of(self, room):
+
+        if(room.map_key() != None):
+            return(tuple(room.map_key()))
+
+        return(room)
+
+    # - location()
+    # Returns the key of the room a scheduled enemy is in, see key_of()
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy
+    def location(self, enemy):
+
+        return(self._scheduled[id(enemy)][1])
+
+    # - room_of()
+    # Returns the room a scheduled enemy is in, None if the room isn't in memory, rooms are never created
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy
+    def room_of(self, enemy):
+
+        key = self.location(enemy)
+
+        if(type(key) == tuple):
+            return(self._map.room_in_memory(*key))
+
+        return(key)
+
+    # - exits_of()
+    # Returns a dictionary of the key of the room through each exit of a room, worked out without creating rooms
+    #
+    # self
+    # key ((row, column)/rooms.Room) - The key of the room, see key_of()
+    def exits_of(self, key):
+
+        # Rooms outside the map only lead anywhere through links
+        if(type(key) == tuple):
+            exits = self._map.exits_at(*key)
+        else:
+            exits = {entrance_name: key.entrances()[entrance_name] for entrance_name in key.exits()}
+
+        return({entrance_name: (destination if type(destination) == tuple else self.key_of(destination)) for entrance_name, destination in exits.items()})
+
+    # - locate()
+    # Records the room a scheduled enemy is in
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy
+    # key ((row, column)/rooms.Room) - The key of the room it is in, see key_of()
+    def locate(self, enemy, key):
+
+        if(type(key) == tuple):
+            index = key[0] * self._map.columns() + key[1]
+        else:
+            index = -1
+
+        self._scheduled[id(enemy)][1] = key
+
+        if(type(enemy) == characters.PooledEnemy):
+            enemy.pool().set_room(enemy.index(), index)
+        elif(index != -1):
+            self._located.setdefault(index, []).append(enemy)
+
+    # - unlocate()
+    # Forgets the room a scheduled enemy is in
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy
+    def unlocate(self, enemy):
+
+        key = self.location(enemy)
+
+        if((type(key) == tuple) and (type(enemy) != characters.PooledEnemy)):
+            index = key[0] * self._map.columns() + key[1]
+            located = self._located[index]
+            located.remove(enemy)
+            if(located == []):
+                del self._located[index]
+
+    # - schedule()
+    # Queues a scheduled enemy's next move
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy
+    def schedule(self, enemy):
+
+        entry = self._scheduled[id(enemy)]
+        entry[2] = next(self._order)
+
+        heapq.heappush(self._queue, (self._time + self._rng.uniform(*entry[3]), entry[2], enemy))
+
+    # - run()
+    # Moves every enemy due to act up to a time, in order, returns the number of enemies that acted
+    #
+    # self
+    # until (float) - The time to run until
+    def run(self, until):
+
+        acted = 0
+
+        while((self._queue != []) and (self._queue[0][0] <= until)):
+
+            time, order, enemy = heapq.heappop(self._queue)
+
+            # Skip events of enemies that have been removed or rescheduled
+            entry = self._scheduled.get(id(enemy))
+            if((entry == None) or (entry[2] != order)):
+                continue
+
+            self._time = time
+            self.act(enemy)
+            acted += 1
+
+        self._time = max(self._time, until)
+
+        return(acted)
+
+    # - act()
+    # Moves a scheduled enemy through a random exit of its room and queues its next move
+    # Rooms that aren't in memory aren't created, the enemy is added to them by the map when they are
+    # Enemies that have died or been taken out of their room stop roaming
+    #
+    # self
+    # enemy (characters.Enemy) - The enemy
+    def act(self, enemy):
+
+        key = self.location(enemy)
+        room = self.room_of(enemy)
+
+        if((not enemy.is_alive()) or ((room != None) and (enemy not in room.enemies()))):
+            self.remove(enemy)
+            return
+
+        if((self._busy == None) or (not self._busy(enemy))):
+
+            exits = self.exits_of(key)
+
+            if(exits != {}):
+                new_key = exits[self._rng.choice(list(exits))]
+
+                # Enemies that pick a room to avoid stay put
+                if(new_key not in self._avoid):
+                    if(room != None):
+                        room.enemies().remove(enemy)
+                    self.unlocate(enemy)
+                    self.locate(enemy, new_key)
+
+                    new_room = self.room_of(enemy)
+                    if(new_room != None):
+                        new_room.add_enemy(enemy)
+
+                    if(self._on_move != None):
+                        self._on_move(enemy, room, new_room)
+
+        self.schedule(enemy)
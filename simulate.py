@@ -0,0 +1,273 @@
+'''
+
+    simulate.py
+
+    Plays batches of Dracula's Castle games without a GUI to evaluate game balance
+
+'''
+
+# - Imports
+
+# -- Libraries
+# (Modules others have made)
+import argparse # Command line arguments
+import multiprocessing # Play games across all cores
+import os # Count cores
+import random # Seed games
+from collections import Counter # Count deaths
+
+# -- Components
+# (Modules I have made)
+import app # Game/Castle
+import items # Items/Inventories
+
+# - Policies
+# A policy takes a game and performs one action in it
+
+# - random_policy()
+# Picks up everything, uses everything and wanders randomly, always attacks
+#
+# game (app.Game) - The game to act in
+# pickups (list) - List the names of picked up items are appended to
+def random_policy(game, pickups):
+
+    # Always attack if in battle
+    if(game.enemy() != None):
+        game.attack()
+        return
+
+    # Pick up every item in the room
+    for item in list(game.current_room().inventory().items()):
+        pickups.append(item.name())
+        game.pick_up(item)
+
+    # Use a random useable item
+    useable = [item for item in game.player().inventory().items() if item.useable()]
+    if(useable != []):
+        game.use_item(random.choice(useable))
+
+    # Wander
+    game.move_player(random.choice("nsew"))
+
+# - scripted_policy()
+# Picks up everything, equips the best weapon/armour, drinks potions when hurt and retreats from losing battles
+#
+# game (app.Game) - The game to act in
+# pickups (list) - List the names of picked up items are appended to
+def scripted_policy(game, pickups):
+
+    player = game.player()
+    enemy = game.enemy()
+
+    # Battle
+    if(enemy != None):
+        # Retreat if the next enemy hit could incapacitate us (the boss room cannot be retreated from usefully)
+        if((enemy.weapon() != None) and (player.health() <= enemy.weapon().get_damage()[1]) and (game.current_room() != game.game_map().boss_room())):
+            game.retreat()
+        else:
+            game.attack()
+        return
+
+    # Pick up every item in the room
+    for item in list(game.current_room().inventory().items()):
+        pickups.append(item.name())
+        game.pick_up(item)
+
+    # Equip the best weapon/armour if it is better than what is held
+    weapon = player.inventory().best(items.Weapon)
+    if((weapon != None) and ((player.weapon() == None) or (weapon.get_damage()[1] > player.weapon().get_damage()[1]))):
+        game.use_item(weapon)
+    armour = player.inventory().best(items.Armour)
+    if((armour != None) and ((player.armour() == None) or (armour.get_protection() > player.armour().get_protection()))):
+        game.use_item(armour)
+
+    # Drink potions when hurt
+    for potion in player.inventory().of_type(items.Potion):
+        if(player.health() < 50):
+            game.use_item(potion)
+
+    # Wander
+    game.move_player(random.choice("nsew"))
+
+# Policies by name
+POLICIES = {
+    "random": random_policy,
+    "scripted": scripted_policy
+}
+
+# - Functions
+
+# - play()
+# Plays a single game to completion (or until max_turns) and returns its result
+#
+# seed (int) - The seed of the batch
+# index (int) - The index of the game in the batch, each game gets its own random stream
+# policy (str) - The name of the policy to play with
+# max_turns (int) - The maximum number of actions before the game is abandoned
+def play(seed, index, policy, max_turns):
+
+    # Every game is seeded independently so results do not depend on the number of processes
+    random.seed(f"{seed}-{index}")
+
+    game = app.Game(*app.create_castle())
+    act = POLICIES[policy]
+    pickups = []
+    turns = 0
+
+    # Play until the game is over
+    while((game.state() == app.Game.PLAYING) and (turns < max_turns)):
+        act(game, pickups)
+        turns += 1
+
+    return({
+        "state": game.state(),
+        "turns": turns,
+        "deaths": game.deaths(),
+        "pickups": pickups
+    })
+
+# - new_summary()
+# Returns an empty summary of a batch of games
+def new_summary():
+
+    return({
+        "games": 0,
+        "wins": 0,
+        "losses": 0,
+        "timeouts": 0,
+        "victory_turns": [], # Turns taken by every won game
+        "deaths": Counter(), # Enemy name -> times the player was incapacitated by it
+        "pickups": {} # Item name -> [times picked up, sum of pickup positions]
+    })
+
+# - add_result()
+# Adds the result of a single game to a summary
+#
+# summary (dict) - The summary to add to
+# result (dict) - The result returned by play()
+def add_result(summary, result):
+
+    summary["games"] += 1
+
+    # Count the outcome
+    if(result["state"] == app.Game.WON):
+        summary["wins"] += 1
+        summary["victory_turns"].append(result["turns"])
+    elif(result["state"] == app.Game.LOST):
+        summary["losses"] += 1
+    else:
+        summary["timeouts"] += 1
+
+    summary["deaths"].update(result["deaths"])
+
+    # Record where in the pickup order each item was found
+    for position, name in enumerate(result["pickups"]):
+        stats = summary["pickups"].setdefault(name, [0, 0])
+        stats[0] += 1
+        stats[1] += position
+
+# - merge()
+# Merges the second summary into the first
+#
+# summary (dict) - The summary to merge into
+# other (dict) - The summary to merge from
+def merge(summary, other):
+
+    summary["games"] += other["games"]
+    summary["wins"] += other["wins"]
+    summary["losses"] += other["losses"]
+    summary["timeouts"] += other["timeouts"]
+    summary["victory_turns"].extend(other["victory_turns"])
+    summary["deaths"].update(other["deaths"])
+
+    for name, (count, positions) in other["pickups"].items():
+        stats = summary["pickups"].setdefault(name, [0, 0])
+        stats[0] += count
+        stats[1] += positions
+
+# - play_chunk()
+# Plays a range of games and returns their summary, run by worker processes
+#
+# args (tuple) - (seed, start, stop, policy, max_turns)
+def play_chunk(args):
+
+    seed, start, stop, policy, max_turns = args
+    summary = new_summary()
+
+    for index in range(start, stop):
+        add_result(summary, play(seed, index, policy, max_turns))
+
+    return(summary)
+
+# - simulate()
+# Plays a batch of games across a pool of processes and returns the merged summary
+#
+# games (int) - Number of games to play
+# policy (str) - The name of the policy to play with
+# seed (int) - The seed of the batch
+# processes (int) - Number of worker processes, defaults to every core
+# max_turns (int) - The maximum number of actions before a game is abandoned
+def simulate(games, policy = "random", seed = 0, processes = None, max_turns = 5000):
+
+    if(processes == None):
+        processes = os.cpu_count() or 1
+
+    # Split the games into chunks, a few per process to balance the load
+    chunk_size = max(1, games // (processes * 4))
+    chunks = [(seed, start, min(start + chunk_size, games), policy, max_turns) for start in range(0, games, chunk_size)]
+
+    summary = new_summary()
+
+    # Play in this process if only one is wanted
+    if(processes == 1):
+        for chunk in chunks:
+            merge(summary, play_chunk(chunk))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            for chunk_summary in pool.imap_unordered(play_chunk, chunks):
+                merge(summary, chunk_summary)
+
+    return(summary)
+
+# - report()
+# Returns a printable report of a summary
+#
+# summary (dict) - The summary to report on
+def report(summary):
+
+    games = max(summary["games"], 1)
+    lines = [
+        f"Games: {summary['games']}",
+        f"Win rate: {summary['wins'] / games:.2%} (losses {summary['losses'] / games:.2%}, timeouts {summary['timeouts'] / games:.2%})"
+    ]
+
+    # Turns to victory
+    victory_turns = sorted(summary["victory_turns"])
+    if(victory_turns != []):
+        lines.append(f"Turns to victory: mean {sum(victory_turns) / len(victory_turns):.1f}, median {victory_turns[len(victory_turns) // 2]}, min {victory_turns[0]}, max {victory_turns[-1]}")
+
+    # Deaths per enemy
+    lines.append("Deaths per enemy (per game):")
+    for name, count in summary["deaths"].most_common():
+        lines.append(f"    {name}: {count / games:.3f}")
+
+    # Item pickup order, earliest first
+    lines.append("Item pickup order (mean position, pickup rate):")
+    pickups = sorted(summary["pickups"].items(), key = lambda pickup: pickup[1][1] / pickup[1][0])
+    for name, (count, positions) in pickups:
+        lines.append(f"    {name}: {positions / count:.1f}, {count / games:.2%}")
+
+    return("\n".join(lines))
+
+# - Main
+if(__name__ == "__main__"):
+
+    parser = argparse.ArgumentParser(description = "Play batches of Dracula's Castle games without a GUI")
+    parser.add_argument("-n", "--games", type = int, default = 1000, help = "number of games to play")
+    parser.add_argument("-p", "--policy", choices = sorted(POLICIES), default = "random", help = "policy the player follows")
+    parser.add_argument("-s", "--seed", type = int, default = 0, help = "seed of the batch")
+    parser.add_argument("-j", "--processes", type = int, default = None, help = "worker processes (default: every core)")
+    parser.add_argument("-t", "--max-turns", type = int, default = 5000, help = "actions before a game is abandoned")
+    args = parser.parse_args()
+
+    print(report(simulate(args.games, args.policy, args.seed, args.processes, args.max_turns)))
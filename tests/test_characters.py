@@ -0,0 +1,41 @@
+'''
+
+    Tests for characters.py
+
+'''
+
+# - Imports
+
+import generator
+
+# - Tests
+
+# Pooled enemies in a castle only become objects when their room's enemies are asked for
+def test_pooled_enemies_are_created_on_demand():
+
+    pool = generator.generate_enemies(20, 20, 5000, seed = 1)
+    game_map = generator.generate_map(20, 20, seed = 1, enemies = pool)
+    assert pool.views_in_use() == 0
+
+    room = game_map.room_at(3, 4)
+    enemies = room.enemies()
+    assert [enemy.index() for enemy in enemies] == pool.in_room(3 * 20 + 4)
+    assert pool.views_in_use() == len(enemies)
+
+    # Changes to a view are stored in the pool
+    enemies[0].take_damage(10 ** 6)
+    assert not pool.is_alive(enemies[0].index())
+
+# Rooms of a lazy castle hold their pooled enemies by index until the room's enemies are asked for
+def test_lazy_rooms_create_pooled_enemies_on_demand():
+
+    pool = generator.generate_enemies(50, 50, 5000, seed = 1)
+    game_map = generator.generate_map(50, 50, seed = 1, lazy = True, enemies = pool)
+
+    for index in range(10):
+        game_map.room_at(index, index)
+    assert pool.views_in_use() == 0
+
+    enemies = game_map.room_at(3, 4).enemies()
+    assert [enemy.index() for enemy in enemies] == pool.in_room(3 * 50 + 4)
+    assert pool.views_in_use() == len(enemies)
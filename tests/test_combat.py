@@ -0,0 +1,152 @@
+'''
+
+    Tests for combat.py
+
+'''
+
+# - Imports
+
+import itertools
+import pytest
+import characters
+import items
+import combat
+
+# - Helpers
+
+# - play_out()
+# Works out a fight by following the chance of every (player health, enemy health) state turn by turn
+# Returns (win, loss, expected turns, remaining health -> chance, draw), stops once almost no fights are still going
+#
+# player_stats, enemy_stats (tuple) - (health, min damage, max damage, protection), see combat.stats()
+# max_turns (int) - Turns before a fight is called a draw, None to play every fight out
+def play_out(player_stats, enemy_stats, max_turns = None):
+
+    player_damage = combat.damage_distribution(player_stats[1], player_stats[2], enemy_stats[3])
+    enemy_damage = combat.damage_distribution(enemy_stats[1], enemy_stats[2], player_stats[3])
+
+    states = {(player_stats[0], enemy_stats[0]): 1.0}
+    win, loss, turns = 0.0, 0.0, 0.0
+    health = {}
+    turn = 0
+
+    while((sum(states.values()) > 1e-13) and (turn != max_turns)):
+        turn += 1
+        turns += sum(states.values())
+        following = {}
+        for (player, enemy), chance in states.items():
+            for damage, damage_chance in player_damage:
+                if(damage >= enemy):
+                    win += chance * damage_chance
+                    health[player] = health.get(player, 0.0) + chance * damage_chance
+                    continue
+                for hit, hit_chance in enemy_damage:
+                    if(hit >= player):
+                        loss += chance * damage_chance * hit_chance
+                    else:
+                        state = (player - hit, enemy - damage)
+                        following[state] = following.get(state, 0.0) + chance * damage_chance * hit_chance
+        states = following
+
+    if(loss > 0):
+        health[0] = loss
+
+    return(win, loss, turns, health, sum(states.values()))
+
+# - Tests
+
+# Each swing's damage is the weapon's damage minus the armour's protection, clamped at zero
+def test_damage_distribution_matches_every_swing():
+
+    for min_damage, max_damage, protection in [(1, 4, None), (2, 9, 3), (0, 2, 5), (-2, 3, 1)]:
+        swings = {}
+        for damage, protected in itertools.product(range(min_damage, max_damage + 1), range((protection or 0) + 1)):
+            swings[max(damage - protected, 0)] = swings.get(max(damage - protected, 0), 0) + 1
+
+        total = sum(swings.values())
+        distribution = dict(combat.damage_distribution(min_damage, max_damage, protection))
+        assert set(distribution) == set(swings)
+        for damage, count in swings.items():
+            assert abs(distribution[damage] - count / total) < 1e-12
+
+# The exact solution agrees with following every fight turn by turn, including turns where nobody is hurt
+def test_solve_matches_playing_out():
+
+    matchups = [
+        ((20, 1, 4, None), (15, 2, 5, None)),
+        ((30, 2, 9, 3), (25, 1, 6, 2)),
+        ((12, 0, 3, 2), (10, 0, 4, 1)),
+        ((8, 3, 3, None), (40, None, None, None))
+    ]
+
+    for player_stats, enemy_stats in matchups:
+        solution = combat.solve(player_stats, enemy_stats)
+        win, loss, turns, health, draw = play_out(player_stats, enemy_stats)
+
+        assert abs(solution["win_probability"] - win) < 1e-9
+        assert abs(solution["loss_probability"] - loss) < 1e-9
+        assert abs(solution["expected_turns"] - turns) < 1e-6
+        assert set(solution["health_remaining"]) == set(health)
+        for remaining, chance in health.items():
+            assert abs(solution["health_remaining"][remaining] - chance) < 1e-9
+
+# Characters that can't hurt each other draw
+def test_solve_draws_without_damage():
+
+    solution = combat.solve((10, 0, 0, None), (10, None, None, 4))
+    assert solution["draw_probability"] == 1.0
+
+# Simulated fights agree with the exact solution within sampling error, with and without NumPy
+@pytest.mark.parametrize("numpy", [True, False])
+def test_estimate_matches_solve(numpy, monkeypatch):
+
+    if(not numpy):
+        monkeypatch.setattr(combat, "np", None)
+    elif(combat.np == None):
+        pytest.skip("NumPy is not installed")
+
+    fights = 20000
+    player = characters.Character("Player", health = 30, weapon = items.Weapon("Sword", 2, 9), armour = items.Armour("Mail", 3))
+    enemy = characters.Character("Bat", health = 25, weapon = items.Weapon("Claws", 1, 6), armour = items.Armour("Hide", 2))
+
+    estimate = combat.estimate(player, enemy, fights = fights, seed = 1)
+    exact = combat.exact(player, enemy)
+
+    # Four standard errors
+    for outcome in ("win_probability", "loss_probability"):
+        assert abs(estimate[outcome] - exact[outcome]) < 4 * (exact[outcome] * (1 - exact[outcome]) / fights) ** 0.5
+    assert estimate["draw_probability"] == 0
+    assert abs(estimate["expected_turns"] - exact["expected_turns"]) < 0.1
+    for remaining, chance in exact["health_remaining"].items():
+        assert abs(estimate["health_remaining"].get(remaining, 0) - chance) < 4 * (chance * (1 - chance) / fights) ** 0.5 + 1e-3
+
+# Fights still going after max_turns are draws, as are fights nobody can win
+@pytest.mark.parametrize("numpy", [True, False])
+def test_estimate_draws(numpy, monkeypatch):
+
+    if(not numpy):
+        monkeypatch.setattr(combat, "np", None)
+    elif(combat.np == None):
+        pytest.skip("NumPy is not installed")
+
+    # Some fights are still going after max_turns
+    fights = 20000
+    player = characters.Character("Player", health = 20, weapon = items.Weapon("Stick", 1, 4))
+    enemy = characters.Character("Bat", health = 20, weapon = items.Weapon("Claws", 1, 4))
+    estimate = combat.estimate(player, enemy, fights = fights, seed = 2, max_turns = 8)
+    win, loss, turns, health, draw = play_out(combat.stats(player), combat.stats(enemy), max_turns = 8)
+    assert 0.1 < draw < 0.9
+    for outcome, chance in (("win_probability", win), ("loss_probability", loss), ("draw_probability", draw)):
+        assert abs(estimate[outcome] - chance) < 4 * (chance * (1 - chance) / fights) ** 0.5
+
+    # Nothing can end before max_turns
+    estimate = combat.estimate(player, enemy, fights = 1000, seed = 2, max_turns = 4)
+    assert estimate["draw_probability"] == 1.0
+    assert estimate["expected_turns"] == 0
+
+    # Nobody can hurt anybody, however long the fight goes on
+    player = characters.Character("Player", health = 10)
+    enemy = characters.Character("Bat", health = 10)
+    estimate = combat.estimate(player, enemy, fights = 1000, seed = 3, max_turns = 50)
+    assert estimate["draw_probability"] == combat.exact(player, enemy)["draw_probability"] == 1.0
+    assert estimate["health_remaining"] == {10: 1.0}
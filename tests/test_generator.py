@@ -0,0 +1,45 @@
+'''
+
+    Tests for generator.py
+
+'''
+
+# - Imports
+
+import random
+import generator
+
+# - Tests
+
+# Every room of a generated layout can be reached, doors open on both sides and none lead off the map
+def test_layouts_are_connected_and_consistent():
+
+    for rows, columns, loops in [(1, 1, 0.05), (1, 9, 0.05), (9, 1, 0.5), (7, 13, 0), (20, 20, 0.2), (30, 17, 1)]:
+        masks = generator.generate_layout(rows, columns, loops, random.Random(rows * columns))
+
+        assert len(masks) == rows * columns
+        assert -1 not in generator.distances(masks, rows, columns, 0)
+
+        for row in range(rows):
+            for column in range(columns):
+                mask = masks[row * columns + column]
+
+                # Doors off the edge of the map
+                assert not ((row == 0) and (mask & generator.N))
+                assert not ((row == rows - 1) and (mask & generator.S))
+                assert not ((column == 0) and (mask & generator.W))
+                assert not ((column == columns - 1) and (mask & generator.E))
+
+                # Doors match the door of the room they lead to
+                if(row < rows - 1):
+                    assert bool(mask & generator.S) == bool(masks[(row + 1) * columns + column] & generator.N)
+                if(column < columns - 1):
+                    assert bool(mask & generator.E) == bool(masks[row * columns + column + 1] & generator.W)
+
+# A layout without loops is a spanning tree, with one door fewer than there are rooms
+def test_layouts_without_loops_are_trees():
+
+    masks = generator.generate_layout(12, 15, 0, random.Random(1))
+    doors = sum(bin(mask & (generator.S | generator.E)).count("1") for mask in masks)
+
+    assert doors == 12 * 15 - 1
@@ -0,0 +1,55 @@
+'''
+
+    Tests for graph.py
+
+'''
+
+# - Imports
+
+import random
+import generator
+import graph
+
+# - Tests
+
+# Distance fields kept up to date as entrances are opened and closed match those of a graph built from scratch
+def test_updated_fields_match_a_new_graph():
+
+    rng = random.Random(7)
+
+    for lazy in (False, True):
+        game_map = generator.generate_map(8, 8, seed = 8, lazy = lazy)
+        kept = graph.Graph(game_map, cache_size = 4)
+        targets = [game_map.room_at(rng.randrange(8), rng.randrange(8)) for _ in range(4)]
+
+        for _ in range(300):
+            room = game_map.room_at(rng.randrange(8), rng.randrange(8))
+            # Close entrances as often as they are opened, so edges are removed as well as added
+            room.add_entrance(rng.choice("nsew"), rng.random() < 0.5)
+
+            target = rng.choice(targets)
+            fresh = graph.Graph(game_map)
+            assert list(kept.distances(target)) == list(fresh.distances(target))
+            fresh.close()
+
+        kept.close()
+        if(lazy):
+            game_map.close()
+
+# Closed graphs stop listening to their map
+def test_closed_graphs_stop_listening():
+
+    game_map = generator.generate_map(4, 4, seed = 9, loops = 0)
+    closed = graph.Graph(game_map)
+    room = game_map.room_at(1, 1)
+    closed_entrance = [entrance_name for entrance_name, value in room.entrances().items() if not value][0]
+
+    # Open graphs follow the map
+    room.add_entrance(closed_entrance, True)
+    assert closed.id_of(room.neighbour(closed_entrance)) in closed.neighbours(closed.id_of(room))
+    room.add_entrance(closed_entrance, False)
+    assert closed.id_of(room.neighbour(closed_entrance)) not in closed.neighbours(closed.id_of(room))
+
+    closed.close()
+    room.add_entrance(closed_entrance, True)
+    assert closed.id_of(room.neighbour(closed_entrance)) not in closed.neighbours(closed.id_of(room))
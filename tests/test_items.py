@@ -0,0 +1,56 @@
+'''
+
+    Tests for items.py
+
+'''
+
+# - Imports
+
+import pickle
+import random
+import items
+
+# - Tests
+
+# The type indexes are built lazily and agree with the items however they are used
+def test_type_indexes_match_items():
+
+    rng = random.Random(1)
+    inventory = items.Inventory()
+    kinds = [items.Weapon(f"Sword {i}", 1, i) for i in range(5)] + [items.Potion(f"Potion {i}", i) for i in range(3)]
+
+    for step in range(500):
+        if((rng.random() < 0.6) or (len(inventory) == 0)):
+            inventory.add_item(rng.choice(kinds), rng.randint(1, 3))
+        else:
+            inventory.drop_item(rng.choice(inventory.items()))
+
+        # Build the indexes part way through
+        if(step == 100):
+            inventory.best(items.Weapon)
+
+        for item_type in (items.Weapon, items.Potion):
+            stacks = [item for item, count in inventory.stacks() if type(item) == item_type]
+            assert inventory.of_type(item_type) == stacks
+            assert inventory.ranked(item_type) == sorted(stacks, key = lambda item: -item.rank())
+            assert inventory.best(item_type) == (max(stacks, key = lambda item: item.rank()) if stacks else None)
+
+    inventory.drop_all()
+    assert (inventory.items() == []) and (inventory.best(items.Weapon) == None)
+
+# Empty inventories share their indexes, even after being pickled or emptied
+def test_empty_inventories_share_indexes():
+
+    inventory = items.Inventory()
+    assert inventory._items is items.EMPTY
+
+    inventory.add_item(items.Potion("Water", 5), 2)
+    assert inventory._items is not items.EMPTY
+    restored = pickle.loads(pickle.dumps(inventory))
+    assert [(item.name(), count) for item, count in restored.stacks()] == [("Water", 2)]
+
+    inventory.drop_all()
+    restored = pickle.loads(pickle.dumps(inventory))
+    assert (restored._items is items.EMPTY) and (len(restored) == 0)
+    restored.add_item(items.Weapon("Stick", 1, 4))
+    assert restored.best(items.Weapon).name() == "Stick"
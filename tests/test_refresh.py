@@ -0,0 +1,79 @@
+'''
+
+    Tests for refresh.py
+
+'''
+
+# - Imports
+
+import refresh
+
+# - Helpers
+
+# - Widget
+# Stands in for a Tk widget, idle callbacks are kept until the test runs them
+class Widget:
+
+    def __init__(self):
+
+        self.idle = []
+        self.exists = True
+
+    def _root(self):
+
+        return(self)
+
+    def after_idle(self, callback):
+
+        self.idle.append(callback)
+        return(f"after#{len(self.idle)}")
+
+    def winfo_exists(self):
+
+        return(self.exists)
+
+# - Counter
+# Counts its refreshes
+class Counter:
+
+    def __init__(self):
+
+        self.refreshes = 0
+
+    def gui_refresh(self):
+
+        self.refreshes += 1
+
+# - Tests
+
+# Many requests before the event loop is idle cost one flush and one refresh per object
+def test_requests_are_coalesced():
+
+    widget = Widget()
+    first, second = Counter(), Counter()
+
+    for _ in range(100):
+        refresh.request(first, widget)
+        refresh.request(second, widget)
+
+    assert refresh.pending()
+    assert len(widget.idle) == 1
+
+    widget.idle.pop()()
+    assert not refresh.pending()
+    assert (first.refreshes, second.refreshes) == (1, 1)
+
+# Objects without a GUI aren't queued, and objects whose GUI has been destroyed aren't refreshed
+def test_missing_and_destroyed_guis_are_skipped():
+
+    widget = Widget()
+    counter = Counter()
+
+    refresh.request(counter, None)
+    assert not refresh.pending()
+
+    refresh.request(counter, widget)
+    widget.exists = False
+    widget.idle.pop()()
+    assert not refresh.pending()
+    assert counter.refreshes == 0
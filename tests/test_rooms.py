@@ -0,0 +1,283 @@
+'''
+
+    Tests for rooms.py
+
+'''
+
+# - Imports
+
+import random
+import pytest
+import items
+import characters
+import rooms
+import generator
+import app
+
+# - Helpers
+
+# - churn()
+# Accesses every room of a lazy map, so every room that isn't pinned is evicted at some point
+#
+# game_map (rooms.LazyMap) - The map
+def churn(game_map):
+
+    for row in range(game_map.rows()):
+        for column in range(game_map.columns()):
+            game_map.room_at(row, column)
+
+# - Tests
+
+# Rooms the game holds stay in memory, so items dropped in them aren't lost
+def test_pinned_rooms_survive_eviction():
+
+    random.seed(1)
+    game_map = generator.generate_map(6, 6, seed = 2, lazy = True, cache_size = 4)
+    game = app.Game(game_map, items.Key("Key"), castle_items = [items.Potion(f"Potion {i}", 1) for i in range(200)])
+
+    room = game.current_room()
+    assert room is game_map.room_at(*room.map_key())
+
+    dropped = items.Potion("Dropped", 5)
+    room.inventory().add_item(dropped)
+    churn(game_map)
+
+    assert game.current_room() is game_map.room_at(*room.map_key())
+    assert dropped in game_map.room_at(*room.map_key()).inventory().items()
+    game_map.close()
+
+# Moving the player keeps its new and previous rooms and lets older rooms go
+def test_pins_follow_the_player():
+
+    random.seed(3)
+    game_map = generator.generate_map(6, 6, seed = 4, lazy = True, cache_size = 4)
+    game = app.Game(game_map, items.Key("Key"))
+
+    for _ in range(300):
+        game.move_player(random.choice("nsew"))
+        if(game.enemy() != None):
+            game.retreat()
+        churn(game_map)
+        for room in (game.current_room(), game.player().room()):
+            assert room is game_map.room_at(*room.map_key())
+
+    # Only the player's and the game's rooms are held
+    assert all(held in (game.current_room().map_key(), game.previous_room().map_key()) for held in game_map.held())
+    game_map.close()
+
+# Stacks are spilled and restored whole, however many items they hold
+def test_spill_keeps_stacks():
+
+    game_map = generator.generate_map(6, 6, seed = 2, lazy = True, cache_size = 4)
+    room = game_map.room_at(0, 0)
+    room.inventory().add_item(items.Potion("Water", 5), 100000)
+    room.inventory().add_item(items.Weapon("Stick", 1, 4))
+    room = None
+
+    churn(game_map)
+    size = game_map.spilled_size(0, 0)
+    assert (size != None) and (size < 1000)
+
+    restored = game_map.room_at(0, 0).inventory()
+    assert [(item.name(), count) for item, count in restored.stacks()] == [("Water", 100000), ("Stick", 1)]
+    game_map.close()
+
+# Changed entrances, items and enemies come back the same after every room has been spilled and restored
+def test_spill_round_trip():
+
+    rng = random.Random(5)
+    eager = generator.generate_map(6, 6, seed = 6)
+    lazy = generator.generate_map(6, 6, seed = 6, lazy = True, cache_size = 4)
+    key = items.Key("Key")
+
+    for turn in range(200):
+        row, column = rng.randrange(6), rng.randrange(6)
+        change = rng.randrange(4)
+        value = rng.random() < 0.5
+        entrance_name = rng.choice("nsew")
+        potion, count = items.Potion(rng.choice(["Water", "Blood", "Wine"]), 1), rng.randint(1, 3)
+        enemy_name = f"Bat {turn}"
+        for game_map in (eager, lazy):
+            room = game_map.room_at(row, column)
+            if(change == 0):
+                room.add_entrance(entrance_name, value)
+            elif(change == 1):
+                room.inventory().add_item(potion, count)
+            elif(change == 2):
+                room.add_enemy(characters.Enemy(enemy_name, health = 10))
+            else:
+                room.inventory().add_item(key)
+        churn(lazy)
+
+    assert lazy.spilled() > 0
+    for row in range(6):
+        for column in range(6):
+            expected, actual = eager.room_at(row, column), lazy.room_at(row, column)
+            assert actual.entrances() == expected.entrances()
+            assert [(item.name(), count) for item, count in actual.inventory().stacks()] == [(item.name(), count) for item, count in expected.inventory().stacks()]
+            assert [(enemy.name(), enemy.health()) for enemy in actual.enemies()] == [(enemy.name(), enemy.health()) for enemy in expected.enemies()]
+            assert all(item is key for item in actual.inventory().items() if type(item) == items.Key)
+    lazy.close()
+
+# The free entrance index always holds exactly the entrances that lead nowhere, once each
+def test_free_index_matches_entrances():
+
+    rng = random.Random(10)
+
+    for lazy in (False, True):
+        game_map = generator.generate_map(6, 6, seed = 11, lazy = lazy)
+        game_map.free_index()
+
+        for _ in range(300):
+            game_map.room_at(rng.randrange(6), rng.randrange(6)).add_entrance(rng.choice("nsew"), rng.random() < 0.5)
+
+            free = game_map.free_index()
+            assert len(set(free)) == len(free) == game_map.free_entrances()
+            assert sorted(free) == sorted((row * 6 + column, entrance_name) for row in range(6) for column in range(6) for entrance_name, entrance_value in game_map.entrances_at(row, column).items() if not entrance_value)
+
+        if(lazy):
+            game_map.close()
+
+# Unlocking the crypt when every entrance is in use fails cleanly
+def test_unlock_without_free_entrances():
+
+    game_map = generator.generate_map(3, 3, seed = 12)
+    game = app.Game(game_map, items.Key("Key"))
+
+    for row in range(3):
+        for column in range(3):
+            for entrance_name in "nsew":
+                game_map.room_at(row, column).add_entrance(entrance_name, True)
+
+    assert game_map.random_free_entrance() == None
+    game.unlock_boss_room()
+    assert game.log_history()[-1] == "The key fits no door, there is no way into the crypt!"
+
+# Closed maps refuse to create rooms rather than losing or overwriting spilled ones
+def test_closed_maps_refuse_rooms():
+
+    game_map = generator.generate_map(6, 6, seed = 2, lazy = True, cache_size = 4)
+    game_map.room_at(0, 0).inventory().add_item(items.Potion("Water", 5))
+    churn(game_map)
+
+    game_map.close()
+    assert game_map.closed()
+    with pytest.raises(ValueError):
+        game_map.room_at(0, 0)
+
+# Keys kept in memory for a spilled room are let go once the room is restored
+def test_restore_releases_kept_objects():
+
+    game_map = generator.generate_map(6, 6, seed = 2, lazy = True, cache_size = 4)
+    key = items.Key("Key")
+    game_map.room_at(0, 0).inventory().add_item(key)
+    churn(game_map)
+    assert game_map.kept_objects() == 1
+
+    assert key in game_map.room_at(0, 0).inventory().items()
+    assert game_map.kept_objects() == 0
+    game_map.close()
+
+# - old_move()
+# Returns the (room, position) the original Player.move() ended up in, reading Room.grid() cell by cell
+#
+# room (rooms.Room) - The room the player is in
+# position ([row, column]) - The position of the player in the room
+# row, column (int) - The move, as characters.Player.move()
+def old_move(room, position, row, column):
+
+    new_row = position[0] + row
+    new_column = position[1] - column
+
+    # Outside the grid, check no move in case this is a door
+    try:
+        grid_value = room.grid()[new_row][new_column]
+    except(IndexError):
+        return(old_move(room, position, 0, 0))
+    if((new_row < 0) or (new_column < 0)):
+        return(old_move(room, position, 0, 0))
+
+    if((grid_value == 0) or (grid_value == "m")):
+        return(room, [new_row, new_column])
+    elif(type(grid_value) == rooms.Room):
+        target, entrance = grid_value, "m"
+    elif(type(grid_value) == str):
+        target, entrance = {"n": (room.north_of, "s"), "e": (room.east_of, "w"), "s": (room.south_of, "n"), "w": (room.west_of, "e")}[grid_value]
+        target = target()
+    else:
+        return(room, position)
+
+    new_position = target.find_entrance(entrance)
+    if(new_position != False):
+        return(target, new_position)
+
+    return(room, position)
+
+# Moves through the transition table go where the original Player.move() went, in every room of the castle
+def test_moves_match_the_original_player_move():
+
+    castle_map, key, enemies, castle_items = app.create_castle()
+
+    # Link a room to the crypt, like unlocking it
+    crypt = castle_map.boss_room()
+    castle_map.room_at(0, 1).add_entrance("e", crypt)
+
+    castle = [castle_map.room_at(row, column) for row in range(castle_map.rows()) for column in range(castle_map.columns())] + [crypt]
+    for room in castle:
+        # Every cell a player can stand on, open cells inside the outer edge and the entrances they can arrive at
+        positions = [[row, column] for row in range(1, room.rows() - 1) for column in range(1, room.columns() - 1) if room.grid()[row][column] in (0, "m")]
+        positions.extend(room.find_entrance(entrance_name) for entrance_name in room.exits() if room.find_entrance(entrance_name) != False)
+        for position in positions:
+            for move in rooms.Map.MOVES:
+                assert castle_map.move(room, list(position), *move) == old_move(room, list(position), *move)
+
+# Rooms of other sizes put their entrances in the middle of each side and lead to the right entrance of their neighbour
+@pytest.mark.parametrize("rows, columns, obstacles", [(8, 10, ()), (64, 64, ((5, 5), (10, 40), (31, 20), (50, 50), (61, 61)))])
+def test_rooms_of_any_size(rows, columns, obstacles):
+
+    def room(name, **entrances):
+        return(rooms.Room(name, rows = rows, columns = columns, obstacles = obstacles, **entrances))
+
+    game_map = rooms.Map([
+            [room("North West", s = True, e = True), room("North East", s = True, w = True)],
+            [room("South West", n = True, e = True), room("South East", n = True, w = True)]
+        ], [0, 0], [1, 1])
+
+    middle_row, middle_column = rows // 2, columns // 2
+    entrances = {"n": [0, middle_column], "s": [rows - 1, middle_column], "e": [middle_row, columns - 1], "w": [middle_row, 0]}
+    # (step out of the room through the entrance, cell just inside it)
+    steps = {"n": ((-1, 0), [1, middle_column]), "s": ((1, 0), [rows - 2, middle_column]), "e": ((0, -1), [middle_row, columns - 2]), "w": ((0, 1), [middle_row, 1])}
+
+    for row in range(2):
+        for column in range(2):
+            current = game_map.room_at(row, column)
+            assert current.find_entrance("m") == [middle_row, middle_column]
+
+            for entrance_name, position in entrances.items():
+                assert current.find_entrance(entrance_name) == position
+
+                move, inside = steps[entrance_name]
+                if(current.entrances()[entrance_name]):
+                    # Stepping onto the entrance, or off the room from it, arrives at the opposite entrance of the neighbouring room
+                    target = current.neighbour(entrance_name)
+                    arrival = (target, target.find_entrance(rooms.Map.OPPOSITES[entrance_name]))
+                    assert game_map.move(current, inside, *move) == arrival
+                    assert game_map.move(current, position, *move) == arrival
+                else:
+                    # The ring of walls is closed, players inside it stay put
+                    inside = [inside[0] - move[0], inside[1] + move[1]]
+                    assert game_map.move(current, inside, *move) == (current, inside)
+
+            # Obstacles block moves into them
+            for obstacle in obstacles:
+                assert game_map.move(current, [obstacle[0] + 1, obstacle[1]], -1, 0) == (current, [obstacle[0] + 1, obstacle[1]])
+
+# Obstacles on the ring of walls, outside it or on the middle cell are refused, as are rooms too small for the ring
+def test_room_layout_errors():
+
+    for obstacle in [(1, 5), (5, 1), (10, 5), (0, 0), (6, 6)]:
+        with pytest.raises(ValueError):
+            rooms.Room("Room", rows = 12, columns = 12, obstacles = [obstacle])
+
+    with pytest.raises(ValueError):
+        rooms.Room("Room", rows = rooms.Room.MIN_SIZE - 1, columns = 12)
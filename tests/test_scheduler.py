@@ -0,0 +1,68 @@
+'''
+
+    Tests for scheduler.py
+
+'''
+
+# - Imports
+
+import random
+import items
+import characters
+import generator
+import scheduler
+import app
+
+# - Tests
+
+# Roaming doesn't create rooms, and every enemy is in exactly one room when its room is created
+def test_roaming_leaves_the_cache_alone():
+
+    rng = random.Random(1)
+    game_map = generator.generate_map(30, 30, seed = 2, lazy = True, cache_size = 8)
+    roaming = scheduler.Scheduler(game_map, rng = rng)
+
+    enemies = []
+    for i in range(200):
+        room = game_map.room_at(rng.randrange(30), rng.randrange(30))
+        enemy = characters.Enemy(f"Enemy {i}")
+        room.add_enemy(enemy)
+        roaming.add(enemy, room)
+        enemies.append(enemy)
+
+    cached = game_map.cache_order()
+    assert roaming.run(500) > 10000
+    assert game_map.cache_order() == cached
+
+    for enemy in enemies:
+        assert sum(other is enemy for other in game_map.room_at(*roaming.location(enemy)).enemies()) == 1
+    game_map.close()
+
+# The player's room stays the map's room while enemies roam a lazy map
+def test_roaming_keeps_the_players_room():
+
+    random.seed(5)
+    game_map = generator.generate_map(6, 6, seed = 3, lazy = True, cache_size = 4)
+    enemies = [characters.Enemy(f"Enemy {i}", health = 5) for i in range(20)]
+    game = app.Game(game_map, items.Key("Key"), enemies, roaming = True)
+
+    for _ in range(200):
+        game.tick(1)
+        if(game.enemy() != None):
+            game.attack()
+        room = game.current_room()
+        assert room is game_map.room_at(*room.map_key())
+    game_map.close()
+
+# Games without roaming enemies make no scheduler, and ticking them moves nothing
+def test_no_scheduler_without_roaming():
+
+    random.seed(6)
+    game_map = generator.generate_map(6, 6, seed = 3)
+    enemies = [characters.Enemy(f"Enemy {i}", health = 5) for i in range(20)]
+    game = app.Game(game_map, items.Key("Key"), enemies)
+    placed = [(row, column, list(game_map.room_at(row, column).enemies())) for row in range(6) for column in range(6)]
+
+    assert game.scheduler() == None
+    game.tick(100)
+    assert placed == [(row, column, game_map.room_at(row, column).enemies()) for row in range(6) for column in range(6)]